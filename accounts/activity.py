@@ -0,0 +1,145 @@
+# accounts/activity.py
+import logging
+import queue
+import random
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.buffered import BufferedFlusher, process_flusher
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY = "activity_log:{}"
+STATS_NAMES = ("dropped", "sampled_out", "flushed", "failed")
+
+
+class ActivityBuffer(BufferedFlusher):
+    """
+    Tampon des UserActivity : les requêtes déposent les activités dans une file
+    bornée, écrites ensuite par lots (bulk_create).
+
+    - vidage quand `batch_size` activités attendent, toutes les `flush_interval`
+      secondes et à l'arrêt du processus (core.buffered.BufferedFlusher) ;
+    - file pleine : l'activité est abandonnée et comptée dans `dropped`.
+
+    Les compteurs sont propres au processus (`stats`) ; chaque vidage ajoute leur
+    progression aux totaux du cache partagé (`shared_stats`, commande
+    `activity_log_stats`).
+    """
+
+    thread_name = "activity-buffer"
+
+    def __init__(self, max_size=10000, batch_size=200, flush_interval=2.0):
+        super().__init__(flush_interval)
+        self.queue = queue.Queue(maxsize=max_size)
+        self.batch_size = batch_size
+        self.counters = dict.fromkeys(STATS_NAMES, 0)
+        self._published = dict(self.counters)
+        self._counters_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def _count(self, name, value=1):
+        with self._counters_lock:
+            self.counters[name] += value
+
+    def add(self, activity):
+        try:
+            self.queue.put_nowait(activity)
+        except queue.Full:
+            self._count("dropped")
+            return False
+
+        self.after_add(self.queue.qsize() >= self.batch_size)
+        return True
+
+    def flush(self):
+        """Écrit tout ce qui attend dans la file ; retourne le nombre d'activités écrites."""
+        from .models import UserActivity
+
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = []
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    break
+                try:
+                    UserActivity.objects.bulk_create(batch, batch_size=self.batch_size)
+                except Exception:
+                    self._count("failed", len(batch))
+                    logger.exception("Écriture de %d activité(s) impossible", len(batch))
+                else:
+                    self._count("flushed", len(batch))
+                    written += len(batch)
+        self.publish_stats()
+        return written
+
+    def publish_stats(self):
+        """Ajoute aux totaux partagés (cache) ce que les compteurs ont pris depuis le dernier appel."""
+        with self._counters_lock:
+            deltas = {name: value - self._published[name] for name, value in self.counters.items()}
+            self._published = dict(self.counters)
+        for name, delta in deltas.items():
+            if delta:
+                try:
+                    _incr_by(STATS_KEY.format(name), delta)
+                except Exception:
+                    logger.exception("Publication des compteurs d'activité impossible")
+
+    def stats(self):
+        """Compteurs du processus : activités en attente, abandonnées, échantillonnées, écrites."""
+        with self._counters_lock:
+            return {"backlog": self.queue.qsize(), **self.counters}
+
+
+def _incr_by(key, delta):
+    """Incrément atomique côté cache, en recréant la clé si elle a été évincée."""
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+def shared_stats():
+    """Totaux de tous les processus depuis la dernière remise à zéro (cache partagé, voir core.W001)."""
+    values = cache.get_many([STATS_KEY.format(name) for name in STATS_NAMES])
+    return {name: values.get(STATS_KEY.format(name), 0) for name in STATS_NAMES}
+
+
+def reset_shared_stats():
+    cache.delete_many([STATS_KEY.format(name) for name in STATS_NAMES])
+
+
+get_activity_buffer = process_flusher(lambda: ActivityBuffer(
+    max_size=getattr(settings, "ACTIVITY_LOG_QUEUE_SIZE", 10000),
+    batch_size=getattr(settings, "ACTIVITY_LOG_BATCH_SIZE", 200),
+    flush_interval=getattr(settings, "ACTIVITY_LOG_FLUSH_INTERVAL", 2.0),
+))
+
+
+def is_sampled(activity_type):
+    """Tirage selon settings.ACTIVITY_LOG_SAMPLING ({type: taux entre 0 et 1}, 1 par défaut)."""
+    rate = getattr(settings, "ACTIVITY_LOG_SAMPLING", {}).get(activity_type, 1.0)
+    return rate >= 1 or random.random() < rate
+
+
+def record_activity(activity):
+    """
+    Enregistre une UserActivity non sauvegardée : écriture immédiate en mode
+    synchrone (ACTIVITY_LOG_SYNC, tests), sinon dépôt dans le tampon.
+    Retourne False si l'activité n'a pas été retenue (échantillonnage, file pleine).
+    """
+    if not is_sampled(activity.activity_type):
+        get_activity_buffer()._count("sampled_out")
+        return False
+    if getattr(settings, "ACTIVITY_LOG_SYNC", False):
+        activity.save()
+        return True
+    return get_activity_buffer().add(activity)
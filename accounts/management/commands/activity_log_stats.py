@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from accounts.activity import reset_shared_stats, shared_stats
+from core.checks import cache_is_shared
+
+
+class Command(BaseCommand):
+    help = "Affiche les compteurs du journal d'activité (écrites, échantillonnées, abandonnées, en échec)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Remet les compteurs à zéro après affichage")
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE("=== JOURNAL D'ACTIVITÉ ==="))
+        if not cache_is_shared():
+            self.stdout.write(self.style.WARNING(
+                "⚠️ Cache propre à chaque processus : les compteurs des serveurs ne sont pas visibles ici."
+            ))
+        stats = shared_stats()
+        total = stats["flushed"] + stats["sampled_out"] + stats["dropped"] + stats["failed"]
+        for name, label in (
+            ("flushed", "écrites"),
+            ("sampled_out", "écartées (échantillonnage)"),
+            ("dropped", "abandonnées (file pleine)"),
+            ("failed", "en échec d'écriture"),
+        ):
+            ratio = stats[name] / total if total else 0.0
+            self.stdout.write(f" - {label:<28} {stats[name]:<10} {ratio:.1%}")
+        if options["reset"]:
+            reset_shared_stats()
+            self.stdout.write(self.style.SUCCESS("\n✅ Compteurs remis à zéro."))
@@ -223,7 +223,13 @@ class UserActivity(models.Model):
     @classmethod
     def log_activity(cls, user, activity_type, title, description='',
                     content_object=None, metadata=None, request=None):
-        """Helper method to log user activities"""
+        """
+        Helper method to log user activities.
+        The activity is buffered and written in batches (accounts/activity.py):
+        the returned instance has no pk yet, unless ACTIVITY_LOG_SYNC is enabled.
+        """
+        from .activity import record_activity
+
         activity = cls(
             user=user,
             activity_type=activity_type,
@@ -240,7 +246,7 @@ class UserActivity(models.Model):
             activity.ip_address = cls.get_client_ip(request)
             activity.user_agent = request.META.get('HTTP_USER_AGENT', '')
 
-        activity.save()
+        record_activity(activity)
         return activity
 
     @staticmethod
@@ -19,128 +19,36 @@ def set_role_for_superuser(sender, instance, created, **kwargs):
 def notify_agency_admin_on_agent_join(sender, instance, created, **kwargs):
     """
     Notifier l'admin de l'agence lorsqu'un nouvel agent rejoint l'agence
+    (mis en file : le worker process_notifications résout le destinataire)
     """
-    from notifications.views import create_agency_notification
+    from notifications.outbox import enqueue_notification
 
     if created and instance.is_agent() and instance.agency:
-        # Trouver l'admin de l'agence
-        agency_admin = User.objects.filter(
-            agency=instance.agency,
-            role=User.Roles.AGENCY_ADMIN
-        ).first()
-
-        if agency_admin:
-            create_agency_notification(
-                agency=instance.agency,
-                notification_type='agent_joined',
-                recipient=agency_admin
-            )
+        enqueue_notification(instance.agency, 'agent_joined')
 
 
 @receiver(post_save, sender=Appointment)
 def create_appointment_notifications(sender, instance, created, **kwargs):
     """
-    Créer des notifications lors de la création ou modification d'un rendez-vous
+    Créer des notifications lors de la création ou modification d'un rendez-vous :
+    - création → demande pour l'agent et l'admin de l'agence
+    - confirmé / annulé / terminé → le client et l'admin de l'agence
     """
-    from notifications.views import create_appointment_notification
-
-    # Trouver l'admin de l'agence de l'agent
-    agency_admin = None
-    if instance.agent.agency:
-        agency_admin = User.objects.filter(
-            agency=instance.agent.agency,
-            role=User.Roles.AGENCY_ADMIN
-        ).first()
+    from notifications.outbox import enqueue_notification
 
     if created:
-        # Notification pour l'agent (demande de rendez-vous)
-        create_appointment_notification(
-            appointment=instance,
-            notification_type='appointment_request',
-            recipient=instance.agent
-        )
-
-        # Notification pour l'admin de l'agence
-        if agency_admin:
-            create_appointment_notification(
-                appointment=instance,
-                notification_type='appointment_request',
-                recipient=agency_admin
-            )
-    else:
-        # Vérifier si le statut a changé
-        if instance.status == 'confirmed':
-            # Notification pour le client (rendez-vous confirmé)
-            create_appointment_notification(
-                appointment=instance,
-                notification_type='appointment_confirmed',
-                recipient=instance.customer
-            )
-
-            # Notification pour l'admin de l'agence
-            if agency_admin:
-                create_appointment_notification(
-                    appointment=instance,
-                    notification_type='appointment_confirmed',
-                    recipient=agency_admin
-                )
-        elif instance.status == 'cancelled':
-            # Notification pour le client (rendez-vous annulé)
-            create_appointment_notification(
-                appointment=instance,
-                notification_type='appointment_cancelled',
-                recipient=instance.customer
-            )
-
-            # Notification pour l'admin de l'agence
-            if agency_admin:
-                create_appointment_notification(
-                    appointment=instance,
-                    notification_type='appointment_cancelled',
-                    recipient=agency_admin
-                )
-        elif instance.status == 'completed':
-            # Notification pour le client (rendez-vous terminé)
-            create_appointment_notification(
-                appointment=instance,
-                notification_type='appointment_completed',
-                recipient=instance.customer
-            )
-
-            # Notification pour l'admin de l'agence
-            if agency_admin:
-                create_appointment_notification(
-                    appointment=instance,
-                    notification_type='appointment_completed',
-                    recipient=agency_admin
-                )
+        enqueue_notification(instance, 'appointment_request')
+    elif instance.status in ('confirmed', 'cancelled', 'completed'):
+        enqueue_notification(instance, f'appointment_{instance.status}')
 
 
 @receiver(post_save, sender=Listing)
 def create_listing_notifications(sender, instance, created, **kwargs):
     """
     Créer des notifications lors de la création d'une annonce
+    (admin de l'agence + admins plateforme, résolus par le worker)
     """
-    from notifications.views import create_listing_notification
+    from notifications.outbox import enqueue_notification
 
     if created:
-        # Notification pour l'admin de l'agence
-        agency_admin = User.objects.filter(
-            agency=instance.agency,
-            role=User.Roles.AGENCY_ADMIN
-        ).first()
-        if agency_admin:
-            create_listing_notification(
-                listing=instance,
-                notification_type='listing_created',
-                recipient=agency_admin
-            )
-
-        # Notification pour l'admin plateforme
-        platform_admins = User.objects.filter(role=User.Roles.ADMIN_PLATFORM)
-        for admin in platform_admins:
-            create_listing_notification(
-                listing=instance,
-                notification_type='listing_created',
-                recipient=admin
-            )
+        enqueue_notification(instance, 'listing_created')
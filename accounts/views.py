@@ -4,11 +4,15 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 
 from .forms import SignUpForm, LoginForm, AgencyCreateForm
-from .models import User, Agency, Appointment
-from listings.models import Listing
+from .models import User, Agency, Appointment, UserActivity
+from listings.models import Listing, ListingViewCount
+from listings.view_counter import daily_views
 from saved_searches.models import SavedSearch
 from favorites.models import Favorite
+from agencies.stats import get_agency_stats
+from core.aggregates import count_by_choices
 from django.utils import timezone
+from django.db.models import Sum
 
 
 # === Helpers de rôle ===
@@ -36,7 +40,9 @@ def login_view(request):
     if request.method == 'POST':
         form = LoginForm(request, data=request.POST)
         if form.is_valid():
-            login(request, form.get_user())
+            user = form.get_user()
+            login(request, user)
+            UserActivity.log_activity(user, UserActivity.ActivityType.LOGIN, "Connexion", request=request)
             return redirect('dashboard')
     else:
         form = LoginForm()
@@ -45,10 +51,22 @@ def login_view(request):
 
 @login_required
 def logout_view(request):
+    UserActivity.log_activity(request.user, UserActivity.ActivityType.LOGOUT, "Déconnexion", request=request)
     logout(request)
     return redirect('login')
 
 
+def agency_dashboard_stats(agency):
+    """Compteurs du tableau de bord agence, lus depuis la ligne AgencyStats."""
+    agency_stats = get_agency_stats(agency)
+    return {
+        "total": agency_stats.total_listings,
+        "published": agency_stats.published_listings,
+        "draft": agency_stats.draft_listings,
+        "agents": agency_stats.users_count,
+    }
+
+
 # === Demande d'agence ===
 def agency_request(request):
     if request.method == 'POST':
@@ -72,18 +90,11 @@ def dashboard_agence(request, agency_id):
     agency_users = User.objects.filter(agency=agency)
     listings = Listing.objects.filter(agency=agency)
 
-    stats = {
-        "total": listings.count(),
-        "published": listings.filter(published=True).count(),
-        "draft": listings.filter(published=False).count(),
-        "agents": agency_users.count(),
-    }
-
     context = {
         "agency": agency,
         "agency_users": agency_users,
         "listings": listings,
-        "stats": stats,
+        "stats": agency_dashboard_stats(agency),
     }
     return render(request, "accounts/dashboard_agency.html", context)
 
@@ -107,22 +118,16 @@ def dashboard(request):
         agency = user.agency
         agency_users = User.objects.filter(agency=agency)
         listings = Listing.objects.filter(agency=agency)
-        stats = {
-            "total": listings.count(),
-            "published": listings.filter(published=True).count(),
-            "draft": listings.filter(published=False).count(),
-            "agents": agency_users.count(),
-        }
         return render(request, 'accounts/dashboard_agency.html', {
             'agency': agency,
             'agency_users': agency_users,
             'listings': listings,
-            'stats': stats,
+            'stats': agency_dashboard_stats(agency) if agency else {},
         })
 
     # Client simple
     else:
-        recent_listings = Listing.objects.filter(published=True).prefetch_related('photos').order_by('-created_at')[:6]
+        recent_listings = Listing.objects.filter(published=True).with_cover().order_by('-created_at')[:6]
         favorites = Favorite.objects.filter(user=user).select_related('listing')
         saved_searches = SavedSearch.objects.filter(user=user)
         return render(request, 'accounts/dashboard_customer.html', {
@@ -190,22 +195,38 @@ def agency_statistics(request, agency_id):
         messages.error(request, "Accès non autorisé.")
         return redirect('dashboard')
 
-    listings = Listing.objects.filter(agency=agency)
-    total_listings = listings.count()
-    published_listings = listings.filter(published=True).count()
-    draft_listings = listings.filter(published=False).count()
+    agency_stats = get_agency_stats(agency)
+    total_listings = agency_stats.total_listings
+    published_listings = agency_stats.published_listings
+    draft_listings = agency_stats.draft_listings
 
     if total_listings > 0:
         publication_rate = round((published_listings / total_listings) * 100)
     else:
         publication_rate = 0
 
+    # 👀 Vues des annonces (compteurs journaliers, 30 derniers jours)
+    agency_listings = Listing.objects.filter(agency=agency)
+    views_by_day = daily_views(agency_listings)
+    views_total = sum(row["views"] for row in views_by_day)
+    views_max = max((row["views"] for row in views_by_day), default=0)
+    top_viewed = (
+        ListingViewCount.objects.filter(listing__agency=agency, day__gte=views_by_day[0]["day"])
+        .values("listing__title", "listing__slug")
+        .annotate(total=Sum("views"))
+        .order_by("-total")[:5]
+    )
+
     context = {
         "agency": agency,
         "total_listings": total_listings,
         "published_listings": published_listings,
         "draft_listings": draft_listings,
         "publication_rate": publication_rate,
+        "views_by_day": views_by_day,
+        "views_total": views_total,
+        "views_max": views_max,
+        "top_viewed": top_viewed,
     }
     return render(request, "accounts/agency_statistics.html", context)
 
@@ -229,14 +250,18 @@ def appointments_list(request):
             listing__agency=user.agency
         ).select_related('listing', 'agent', 'customer')
 
-    # Statistiques
-    stats = {
-        'total': appointments.count(),
-        'pending': appointments.filter(status='pending').count(),
-        'confirmed': appointments.filter(status='confirmed').count(),
-        'completed': appointments.filter(status='completed').count(),
-        'cancelled': appointments.filter(status='cancelled').count(),
-    }
+    # Statistiques (admin d'agence : ligne AgencyStats au lieu de 5 COUNT)
+    if not (user.is_agent() or user.is_customer()) and user.agency_id:
+        agency_stats = get_agency_stats(user.agency)
+        stats = {
+            'total': agency_stats.total_appointments,
+            'pending': agency_stats.appointments_pending,
+            'confirmed': agency_stats.appointments_confirmed,
+            'completed': agency_stats.appointments_completed,
+            'cancelled': agency_stats.appointments_cancelled,
+        }
+    else:
+        stats = count_by_choices(appointments, 'status', Appointment.Status)
 
     context = {
         'appointments': appointments,
@@ -310,6 +335,11 @@ def appointment_create(request, listing_id):
                 notes=notes,
                 status='pending'
             )
+            UserActivity.log_activity(
+                user, UserActivity.ActivityType.APPOINTMENT_REQUEST,
+                f"Demande de rendez-vous : {listing.title}",
+                content_object=appointment, request=request,
+            )
 
             messages.success(request, "Votre demande de rendez-vous a été envoyée.")
             return redirect('appointment_detail', appointment_id=appointment.id)
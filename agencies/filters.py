@@ -5,26 +5,28 @@ from .models import Region, District, City
 class RegionListFilter(admin.SimpleListFilter):
     title = "Région"
     parameter_name = "region"
+    field_lookup = "city__district__region_id"
 
     def lookups(self, request, model_admin):
         return [(r.id, r.name) for r in Region.objects.all()]
 
     def queryset(self, request, queryset):
         if self.value():
-            return queryset.filter(city__district__region_id=self.value())
+            return queryset.filter(**{self.field_lookup: self.value()})
         return queryset
 
 
 class DistrictListFilter(admin.SimpleListFilter):
     title = "District"
     parameter_name = "district"
+    field_lookup = "city__district_id"
 
     def lookups(self, request, model_admin):
         return [(d.id, f"{d.name} ({d.region.name})") for d in District.objects.all()]
 
     def queryset(self, request, queryset):
         if self.value():
-            return queryset.filter(city__district_id=self.value())
+            return queryset.filter(**{self.field_lookup: self.value()})
         return queryset
 
 
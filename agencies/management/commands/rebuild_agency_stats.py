@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from agencies.stats import rebuild_agency_stats
+
+
+class Command(BaseCommand):
+    help = "Recalcule la table AgencyStats (une requête agrégée) pour corriger toute dérive des compteurs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--agency", type=int, action="append", dest="agency_ids", help="Limiter à une agence (id), répétable")
+
+    def handle(self, *args, **options):
+        count = rebuild_agency_stats(options["agency_ids"])
+        self.stdout.write(self.style.SUCCESS(f"✅ Statistiques recalculées pour {count} agence(s)."))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agencies', '0002_region_slug'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgencyStats',
+            fields=[
+                ('agency', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='agencies.agency')),
+                ('total_listings', models.IntegerField(default=0)),
+                ('published_listings', models.IntegerField(default=0)),
+                ('users_count', models.IntegerField(default=0)),
+                ('appointments_pending', models.IntegerField(default=0)),
+                ('appointments_confirmed', models.IntegerField(default=0)),
+                ('appointments_completed', models.IntegerField(default=0)),
+                ('appointments_cancelled', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': "Statistiques d'agence",
+                'verbose_name_plural': "Statistiques d'agences",
+            },
+        ),
+    ]
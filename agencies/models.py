@@ -95,4 +95,39 @@ class Agency(models.Model):
 
     @property
     def region(self):
-        return self.city.district.region if self.city else None
\ No newline at end of file
+        return self.city.district.region if self.city else None
+
+class AgencyStats(models.Model):
+    """
+    Compteurs matérialisés par agence (annonces, utilisateurs, rendez-vous),
+    tenus à jour par signaux (agencies/signals.py) ; réparés par rebuild_agency_stats.
+    """
+    agency = models.OneToOneField(
+        Agency, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    total_listings = models.IntegerField(default=0)
+    published_listings = models.IntegerField(default=0)
+    users_count = models.IntegerField(default=0)
+    appointments_pending = models.IntegerField(default=0)
+    appointments_confirmed = models.IntegerField(default=0)
+    appointments_completed = models.IntegerField(default=0)
+    appointments_cancelled = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Statistiques d'agence"
+        verbose_name_plural = "Statistiques d'agences"
+
+    def __str__(self):
+        return f"Statistiques {self.agency_id}"
+
+    @property
+    def draft_listings(self):
+        return self.total_listings - self.published_listings
+
+    @property
+    def total_appointments(self):
+        return (
+            self.appointments_pending + self.appointments_confirmed
+            + self.appointments_completed + self.appointments_cancelled
+        )
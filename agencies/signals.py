@@ -0,0 +1,93 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from accounts.models import Appointment, User
+from listings.models import Listing
+from .stats import APPOINTMENT_FIELDS, apply_delta
+
+
+def _listing_deltas(published, sign):
+    return {"total_listings": sign, "published_listings": sign if published else 0}
+
+
+def _appointment_agency_id(appointment):
+    return appointment.listing.agency_id if appointment.listing_id else None
+
+
+# === Listing ===
+@receiver(pre_save, sender=Listing)
+def remember_listing_state(sender, instance, **kwargs):
+    instance._stats_previous = (
+        Listing.objects.filter(pk=instance.pk).values("agency_id", "published").first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Listing)
+def update_stats_on_listing_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_stats_previous", None)
+    if created or previous is None:
+        apply_delta(instance.agency_id, **_listing_deltas(instance.published, +1))
+    elif previous["agency_id"] != instance.agency_id:
+        apply_delta(previous["agency_id"], **_listing_deltas(previous["published"], -1))
+        apply_delta(instance.agency_id, **_listing_deltas(instance.published, +1))
+    elif previous["published"] != instance.published:
+        apply_delta(instance.agency_id, published_listings=1 if instance.published else -1)
+
+
+@receiver(post_delete, sender=Listing)
+def update_stats_on_listing_delete(sender, instance, **kwargs):
+    apply_delta(instance.agency_id, create_missing=False, **_listing_deltas(instance.published, -1))
+
+
+# === User ===
+@receiver(pre_save, sender=User)
+def remember_user_agency(sender, instance, **kwargs):
+    instance._stats_previous_agency_id = (
+        User.objects.filter(pk=instance.pk).values_list("agency_id", flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=User)
+def update_stats_on_user_save(sender, instance, created, **kwargs):
+    previous_agency_id = getattr(instance, "_stats_previous_agency_id", None)
+    if created or previous_agency_id != instance.agency_id:
+        apply_delta(previous_agency_id, create_missing=False, users_count=-1)
+        apply_delta(instance.agency_id, users_count=1)
+
+
+@receiver(post_delete, sender=User)
+def update_stats_on_user_delete(sender, instance, **kwargs):
+    apply_delta(instance.agency_id, create_missing=False, users_count=-1)
+
+
+# === Appointment ===
+@receiver(pre_save, sender=Appointment)
+def remember_appointment_state(sender, instance, **kwargs):
+    instance._stats_previous = (
+        Appointment.objects.filter(pk=instance.pk).values("status", "listing__agency_id").first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Appointment)
+def update_stats_on_appointment_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_stats_previous", None)
+    agency_id = _appointment_agency_id(instance)
+    if previous and (previous["status"], previous["listing__agency_id"]) == (instance.status, agency_id):
+        return
+    if previous:
+        old_field = APPOINTMENT_FIELDS.get(previous["status"])
+        if old_field:
+            apply_delta(previous["listing__agency_id"], create_missing=False, **{old_field: -1})
+    new_field = APPOINTMENT_FIELDS.get(instance.status)
+    if new_field:
+        apply_delta(agency_id, **{new_field: 1})
+
+
+@receiver(post_delete, sender=Appointment)
+def update_stats_on_appointment_delete(sender, instance, **kwargs):
+    field = APPOINTMENT_FIELDS.get(instance.status)
+    if field:
+        apply_delta(_appointment_agency_id(instance), create_missing=False, **{field: -1})
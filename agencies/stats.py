@@ -0,0 +1,83 @@
+# agencies/stats.py
+from django.db import connection
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Agency, AgencyStats
+
+APPOINTMENT_FIELDS = {
+    "pending": "appointments_pending",
+    "confirmed": "appointments_confirmed",
+    "completed": "appointments_completed",
+    "cancelled": "appointments_cancelled",
+}
+
+
+def _count_per_agency(queryset, agency_field):
+    """Sous-requête corrélée : nombre de lignes de `queryset` pour l'agence courante."""
+    counts = (
+        queryset.filter(**{agency_field: OuterRef("pk")})
+        .order_by()
+        .values(agency_field)
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def rebuild_agency_stats(agency_ids=None):
+    """
+    Recalcule les compteurs en une seule requête agrégée (une ligne par agence)
+    puis les écrit en un seul upsert. Retourne le nombre d'agences traitées.
+    """
+    from accounts.models import Appointment, User
+    from listings.models import Listing
+
+    agencies = Agency.objects.order_by()
+    if agency_ids is not None:
+        agencies = agencies.filter(pk__in=agency_ids)
+
+    annotations = {
+        "total_listings": _count_per_agency(Listing.objects.all(), "agency"),
+        "published_listings": _count_per_agency(Listing.objects.filter(published=True), "agency"),
+        "users_count": _count_per_agency(User.objects.all(), "agency"),
+    }
+    for status, field in APPOINTMENT_FIELDS.items():
+        annotations[field] = _count_per_agency(Appointment.objects.filter(status=status), "listing__agency")
+
+    rows = [
+        AgencyStats(agency_id=values.pop("pk"), **values)
+        for values in agencies.values("pk", **annotations)
+    ]
+    # MySQL (ON DUPLICATE KEY UPDATE) n'accepte pas unique_fields
+    conflict_target = (
+        {"unique_fields": ["agency"]} if connection.features.supports_update_conflicts_with_target else {}
+    )
+    AgencyStats.objects.bulk_create(
+        rows, update_conflicts=True, update_fields=list(annotations), **conflict_target
+    )
+    return len(rows)
+
+
+def get_agency_stats(agency):
+    """Ligne de statistiques de l'agence (reconstruite si elle n'existe pas encore)."""
+    stats = AgencyStats.objects.filter(agency=agency).first()
+    if stats is None:
+        rebuild_agency_stats([agency.pk])
+        stats = AgencyStats.objects.get(agency=agency)
+    return stats
+
+
+def apply_delta(agency_id, create_missing=True, **deltas):
+    """
+    Incrémente/décrémente les compteurs d'une agence avec F() (atomique côté SQL).
+    Si la ligne n'existe pas encore, elle est recalculée entièrement.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not agency_id or not deltas:
+        return
+    updated = AgencyStats.objects.filter(agency_id=agency_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+    if not updated and create_missing:
+        rebuild_agency_stats([agency_id])
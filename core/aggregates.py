@@ -0,0 +1,27 @@
+# core/aggregates.py
+from enum import Enum
+
+from django.db.models import Count, Q
+
+
+def count_by_choices(queryset, field, choices, total_key="total"):
+    """
+    Compte les lignes de `queryset` par valeur de `field` en UNE requête
+    (COUNT(...) FILTER / CASE WHEN selon la base).
+
+    `choices` : une énumération de choix (ex: Appointment.Status) → clés = valeurs,
+    ou un dict {clé: valeur} (ex: {"published": True, "draft": False}).
+    Retourne {"total": n, <clé>: n, ...}.
+    """
+    if isinstance(choices, type) and issubclass(choices, Enum):
+        choices = {member.value: member.value for member in choices}
+
+    # Alias préfixés : une clé ne doit pas masquer un champ du modèle (ex: "published")
+    aggregates = {
+        f"count_{key}": Count("pk", filter=Q(**{field: value}))
+        for key, value in choices.items()
+    }
+    if total_key:
+        aggregates[f"count_{total_key}"] = Count("pk")
+    result = queryset.order_by().aggregate(**aggregates)
+    return {alias.removeprefix("count_"): value for alias, value in result.items()}
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+
+    def ready(self):
+        # Déclare les blocs en cache et branche leurs signaux d'invalidation
+        import core.fragments
+        # Avertit si le cache n'est pas partagé entre processus
+        import core.checks
@@ -0,0 +1,83 @@
+# core/buffered.py
+import atexit
+import logging
+import threading
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedFlusher:
+    """
+    Base des tampons en mémoire écrits en base par lots (journal d'activité,
+    compteurs de vues...).
+
+    - avec `flush_interval`, un thread démon appelle `flush()` toutes les
+      `flush_interval` secondes, ou dès qu'un ajout signale un lot plein ;
+    - sans `flush_interval`, pas de thread : le lot plein est écrit dans l'appelant ;
+    - l'instance de chaque processus est vidée à l'arrêt (voir `process_flusher`).
+
+    Les sous-classes implémentent `flush()` et appellent `after_add(full)` après
+    chaque ajout.
+    """
+
+    thread_name = "buffered-flusher"
+
+    def __init__(self, flush_interval=None):
+        self.flush_interval = flush_interval
+        self._thread_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def flush(self):
+        raise NotImplementedError
+
+    def after_add(self, full):
+        """Démarre le thread si besoin ; un lot plein est écrit tout de suite (par le thread ou ici)."""
+        if self.flush_interval:
+            self._ensure_thread()
+            if full:
+                self._wakeup.set()
+        elif full:
+            self.flush()
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._thread_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Écriture du tampon %s impossible", self.thread_name)
+            finally:
+                close_old_connections()
+
+
+def process_flusher(factory):
+    """
+    Retourne un accesseur de l'instance unique du processus : créée au premier
+    appel par `factory()` (les settings sont lus à ce moment-là) et vidée à
+    l'arrêt du processus (atexit).
+    """
+    instance = None
+    lock = threading.Lock()
+
+    def get():
+        nonlocal instance
+        if instance is None:
+            with lock:
+                if instance is None:
+                    flusher = factory()
+                    atexit.register(flusher.flush)
+                    instance = flusher
+        return instance
+
+    return get
@@ -0,0 +1,43 @@
+# core/checks.py
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Backends dont le contenu n'est visible que du processus courant
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+# Backends dont incr() est atomique côté serveur ; ailleurs (fichiers, base) c'est une lecture puis une écriture
+ATOMIC_INCR_CACHES = (
+    "django.core.cache.backends.redis.RedisCache",
+    "django.core.cache.backends.memcached.PyMemcacheCache",
+    "django.core.cache.backends.memcached.PyLibMCCache",
+)
+
+
+def cache_incr_is_atomic(alias="default"):
+    """cache.incr() du cache `alias` est-il atomique et partagé (Redis, Memcached) ?"""
+    return settings.CACHES.get(alias, {}).get("BACKEND") in ATOMIC_INCR_CACHES
+
+
+def cache_is_shared(alias="default"):
+    """Le cache `alias` est-il vu par tous les processus (web, workers, commandes) ?"""
+    return settings.CACHES.get(alias, {}).get("BACKEND") not in PROCESS_LOCAL_CACHES
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if cache_is_shared():
+        return []
+    return [Warning(
+        "Le cache par défaut est propre à chaque processus.",
+        hint=(
+            "Les blocs de la page d'accueil (core/fragments.py) invalidés par un autre processus "
+            "(worker, commande de gestion) resteront périmés jusqu'à FRAGMENT_CACHE_TIMEOUT, "
+            "et le compteur de notifications non lues est désactivé (COUNT(*) à chaque lecture). "
+            "Configurer CACHE_BACKEND (FileBasedCache, RedisCache...)."
+        ),
+        id="core.W001",
+    )]
@@ -0,0 +1,126 @@
+# core/fragment_cache.py
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+
+from .checks import cache_incr_is_atomic
+
+
+def _incr(cache, key):
+    """Incrément côté cache (backend à incr() atomique), en recréant la clé si elle a été évincée."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, timeout=None):
+            return 1
+        return cache.incr(key)
+
+
+class FragmentCache:
+    """
+    Cache d'un bloc de page (stats, timeline, ...) avec clé versionnée.
+
+    La valeur est stockée sous `fragment:<nom>:<version>` ; sauvegarder ou supprimer
+    un modèle de `depends_on` incrémente la version, ce qui invalide le bloc sans
+    avoir à connaître ni supprimer les anciennes clés (elles expirent d'elles-mêmes).
+    Les compteurs hits / misses sont tenus dans le cache, partagés entre processus,
+    seulement si son incr() est atomique (Redis, Memcached). Sinon (FileBasedCache :
+    lecture puis écriture de fichier à chaque requête, incréments perdus) ils
+    restent propres au processus.
+    """
+
+    registry = {}
+
+    def __init__(self, name, depends_on, timeout=None, cache_alias="default"):
+        self.name = name
+        self.depends_on = tuple(depends_on)
+        self.timeout = timeout
+        self.cache_alias = cache_alias
+        self.registry[name] = self
+        self._local_stats = Counter()
+        self._stats_lock = threading.Lock()
+        for model in self.depends_on:
+            # Les labels "app.Model" sont résolus paresseusement par Django
+            for signal in (post_save, post_delete):
+                signal.connect(self._invalidate, sender=model, weak=False,
+                               dispatch_uid=f"fragment_cache:{name}:{model}:{signal is post_save}")
+
+    def __repr__(self):
+        return f"<FragmentCache {self.name}>"
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _key(self, suffix):
+        return f"fragment:{self.name}:{suffix}"
+
+    def version(self):
+        # Version initiale horodatée : une clé de version évincée ne peut pas
+        # retomber sur une ancienne entrée encore présente
+        return self.cache.get_or_set(self._key("version"), time.time_ns(), timeout=None)
+
+    def invalidate(self):
+        # Nouvelle valeur unique plutôt qu'un incrément : pas de lecture, rien à perdre en concurrence
+        self.cache.set(self._key("version"), time.time_ns(), timeout=None)
+
+    def _invalidate(self, sender, **kwargs):
+        self.invalidate()
+
+    def get_or_set(self, builder):
+        """Retourne le bloc en cache, ou l'obtient via `builder()` et le met en cache."""
+        timeout = self.timeout if self.timeout is not None else getattr(settings, "FRAGMENT_CACHE_TIMEOUT", 300)
+        key = self._key(self.version())
+        value = self.cache.get(key)
+        if value is not None:
+            self._record("hits")
+            return value
+        self._record("misses")
+        value = builder()
+        self.cache.set(key, value, timeout)
+        return value
+
+    @property
+    def shared_stats(self):
+        """Compteurs partagés entre processus (backend à incr() atomique) ou propres au processus."""
+        return cache_incr_is_atomic(self.cache_alias)
+
+    def _record(self, name):
+        if self.shared_stats:
+            _incr(self.cache, self._key(name))
+        else:
+            with self._stats_lock:
+                self._local_stats[name] += 1
+
+    def stats(self):
+        if self.shared_stats:
+            counters = self.cache.get_many([self._key("hits"), self._key("misses")])
+            hits = counters.get(self._key("hits"), 0)
+            misses = counters.get(self._key("misses"), 0)
+        else:
+            with self._stats_lock:
+                hits, misses = self._local_stats["hits"], self._local_stats["misses"]
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / total if total else 0.0,
+        }
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._local_stats.clear()
+        if self.shared_stats:
+            self.cache.delete_many([self._key("hits"), self._key("misses")])
+
+
+def invalidate_fragments_for(model):
+    """Invalide les blocs dépendant de `model` (écritures sans signaux : bulk_create, update...)."""
+    label = model._meta.label_lower
+    for fragment in FragmentCache.registry.values():
+        if any(str(dependency).lower() == label for dependency in fragment.depends_on):
+            fragment.invalidate()
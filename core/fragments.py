@@ -0,0 +1,18 @@
+# core/fragments.py
+from core.fragment_cache import FragmentCache
+
+# Les villes s'affichent avec leur district / région : renommer l'un d'eux invalide aussi
+LOCATION_MODELS = ("agencies.City", "agencies.District", "agencies.Region")
+
+# 🏠 Blocs de la page d'accueil (togoestate.views.home) et modèles dont ils dépendent
+HOME_STATS = FragmentCache(
+    "home:stats", depends_on=("agencies.Agency", "listings.Listing", "accounts.User")
+)
+HOME_RECENT = FragmentCache(
+    "home:recent", depends_on=("agencies.Agency", "listings.Listing", "listings.ListingPhoto", *LOCATION_MODELS)
+)
+HOME_TIMELINE = FragmentCache(
+    "home:timeline",
+    depends_on=("agencies.Agency", "listings.Listing", "accounts.User", *LOCATION_MODELS),
+)
+HOME_MONTHLY_CHART = FragmentCache("home:monthly_chart", depends_on=("listings.Listing",))
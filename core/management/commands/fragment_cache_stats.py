@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core.fragment_cache import FragmentCache
+
+
+class Command(BaseCommand):
+    help = "Affiche les compteurs hits / misses des blocs mis en cache (page d'accueil...)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Remet les compteurs à zéro après affichage")
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE("=== CACHE DES BLOCS ==="))
+        if not all(fragment.shared_stats for fragment in FragmentCache.registry.values()):
+            self.stdout.write(self.style.WARNING(
+                "⚠️ Cache sans incr() atomique (Redis, Memcached) : compteurs de ce processus seulement."
+            ))
+        for name, fragment in sorted(FragmentCache.registry.items()):
+            stats = fragment.stats()
+            self.stdout.write(
+                f" - {name:<20} hits={stats['hits']:<8} misses={stats['misses']:<8} "
+                f"ratio={stats['hit_ratio']:.1%}"
+            )
+            if options["reset"]:
+                fragment.reset_stats()
+        if options["reset"]:
+            self.stdout.write(self.style.SUCCESS("\n✅ Compteurs remis à zéro."))
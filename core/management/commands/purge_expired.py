@@ -0,0 +1,135 @@
+import gzip
+import json
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from core.fragment_cache import invalidate_fragments_for
+from core.retention import get_policies
+from notifications.counters import invalidate_unread_counts
+from notifications.models import Notification
+from notifications.pubsub import publish_count
+
+STATE_FILE = ".purge_state.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Supprime (et archive en JSONL compressé) les notifications / activités expirées "
+        "selon settings.RETENTION_POLICIES, par tranches de clés primaires"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", action="append", dest="models", help="Limiter à un modèle (ex: notifications.Notification)")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Largeur d'une tranche de clés primaires")
+        parser.add_argument("--archive", action="store_true", help="Archiver les lignes avant suppression")
+        parser.add_argument("--archive-dir", help="Dossier des archives (défaut : settings.RETENTION_ARCHIVE_DIR)")
+        parser.add_argument("--sleep", type=float, default=0, help="Pause (s) entre deux tranches, pour laisser respirer la base")
+        parser.add_argument("--restart", action="store_true", help="Ignore le point de reprise d'une exécution interrompue")
+        parser.add_argument("--dry-run", action="store_true", help="Compte les lignes expirées sans rien supprimer")
+
+    def handle(self, *args, **options):
+        policies = get_policies(options["models"])
+        if not policies:
+            raise CommandError("Aucune politique de rétention ne correspond (settings.RETENTION_POLICIES).")
+
+        self.archive_dir = Path(options["archive_dir"] or getattr(settings, "RETENTION_ARCHIVE_DIR", "archives"))
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        state = self.load_state()
+        now = timezone.now()
+
+        self.stdout.write(self.style.NOTICE("=== PURGE DES DONNÉES EXPIRÉES ==="))
+        for policy in policies:
+            expired = policy.expired_q(now)
+            if expired is None:
+                self.stdout.write(f" - {policy.label} : conservation illimitée")
+                continue
+
+            start = None if options["restart"] else state.get(policy.label)
+            deleted, elapsed = self.purge(policy, expired, start, state, options)
+            rate = deleted / elapsed if elapsed else 0
+            verb = "expirée(s)" if options["dry_run"] else "supprimée(s)"
+            self.stdout.write(f" - {policy.label} : {deleted} ligne(s) {verb} en {elapsed:.1f}s ({rate:.0f} lignes/s)")
+
+        self.stdout.write(self.style.SUCCESS("\n✅ Purge terminée."))
+
+    def purge(self, policy, expired, start, state, options):
+        model = policy.model
+        bounds = model.objects.aggregate(low=Min("pk"), high=Max("pk"))
+        if bounds["high"] is None:
+            return 0, 0.0
+        low = max(start or bounds["low"], bounds["low"])
+        if start:
+            self.stdout.write(f"   reprise à l'id {start}")
+
+        archive = None
+        if options["archive"] and not options["dry_run"]:
+            stamp = timezone.now().strftime("%Y%m%d-%H%M%S")
+            path = self.archive_dir / f"{model._meta.app_label}_{model._meta.model_name}-{stamp}.jsonl.gz"
+            archive = gzip.open(path, "at", encoding="utf-8")
+
+        deleted = 0
+        started = time.monotonic()
+        try:
+            while low <= bounds["high"]:
+                high = low + options["batch_size"]
+                # Tranche bornée par la clé primaire : verrous courts, pas de scan complet
+                batch = model.objects.filter(pk__gte=low, pk__lt=high).filter(expired)
+                if options["dry_run"]:
+                    deleted += batch.count()
+                else:
+                    with transaction.atomic():
+                        if archive:
+                            rows = list(batch.values())
+                            for row in rows:
+                                archive.write(json.dumps(row, cls=DjangoJSONEncoder) + "\n")
+                            # Archive écrite avant la suppression : au pire une ligne est archivée deux fois
+                            archive.flush()
+                        recipients = self.unread_recipients(model, batch)
+                        # Lignes sans dépendants : DELETE direct, sans charger les objets ni
+                        # envoyer post_delete ligne par ligne ; caches invalidés une fois par tranche
+                        count = batch._raw_delete(batch.db)
+                        if count:
+                            self.invalidate_caches(model, recipients)
+                        deleted += count
+                    state[policy.label] = high
+                    self.save_state(state)
+                low = high
+                if options["sleep"]:
+                    time.sleep(options["sleep"])
+        finally:
+            if archive:
+                archive.close()
+
+        if not options["dry_run"]:
+            state.pop(policy.label, None)
+            self.save_state(state)
+        return deleted, time.monotonic() - started
+
+    # === Caches dérivés ===
+    def unread_recipients(self, model, batch):
+        """Destinataires dont le compteur de non-lues change avec la tranche."""
+        if model is not Notification:
+            return set()
+        return set(batch.filter(is_read=False).values_list("user_id", flat=True))
+
+    def invalidate_caches(self, model, recipients):
+        invalidate_fragments_for(model)
+        if recipients:
+            # Après le commit de la tranche (voir counters.py)
+            invalidate_unread_counts(recipients)
+            publish_count(recipients)
+
+    # === Point de reprise ===
+    def load_state(self):
+        path = self.archive_dir / STATE_FILE
+        return json.loads(path.read_text()) if path.exists() else {}
+
+    def save_state(self, state):
+        (self.archive_dir / STATE_FILE).write_text(json.dumps(state))
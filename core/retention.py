@@ -0,0 +1,55 @@
+# core/retention.py
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+
+class RetentionPolicy:
+    """
+    Durées de conservation d'un modèle, par valeur de `type_field`.
+
+    `ttl_days` : {type: jours, "default": jours} ; None = conservation illimitée.
+    Une ligne est expirée quand `date_field` est antérieure à maintenant - TTL de son type.
+    """
+
+    def __init__(self, label, type_field, ttl_days, date_field="created_at"):
+        self.label = label
+        self.model = apps.get_model(label)
+        self.type_field = type_field
+        self.date_field = date_field
+        self.ttl_days = dict(ttl_days)
+
+    def __repr__(self):
+        return f"<RetentionPolicy {self.label}>"
+
+    def expired_q(self, now=None):
+        """Filtre des lignes expirées, ou None si rien n'expire."""
+        now = now or timezone.now()
+        clauses = []
+        explicit = [value for value in self.ttl_days if value != "default"]
+        for value, days in self.ttl_days.items():
+            if days is None:
+                continue
+            cutoff = Q(**{f"{self.date_field}__lt": now - timedelta(days=days)})
+            if value == "default":
+                clauses.append(cutoff & ~Q(**{f"{self.type_field}__in": explicit}))
+            else:
+                clauses.append(cutoff & Q(**{self.type_field: value}))
+        return reduce(or_, clauses) if clauses else None
+
+
+def get_policies(labels=None):
+    """Politiques déclarées dans settings.RETENTION_POLICIES (éventuellement filtrées)."""
+    policies = [
+        RetentionPolicy(label, **options)
+        for label, options in getattr(settings, "RETENTION_POLICIES", {}).items()
+    ]
+    if labels:
+        wanted = {label.lower() for label in labels}
+        policies = [policy for policy in policies if policy.label.lower() in wanted]
+    return policies
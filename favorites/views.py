@@ -2,6 +2,7 @@ from django.shortcuts import get_object_or_404
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
+from accounts.models import UserActivity
 from listings.models import Listing
 from .models import Favorite
 
@@ -17,8 +18,16 @@ def toggle_favorite(request, listing_id):
 
     if not created:
         favorite.delete()
+        UserActivity.log_activity(
+            request.user, UserActivity.ActivityType.FAVORITE_REMOVE, f"Retiré des favoris : {listing.title}",
+            content_object=listing, request=request,
+        )
         return JsonResponse({'success': True, 'is_favorite': False})
 
+    UserActivity.log_activity(
+        request.user, UserActivity.ActivityType.FAVORITE_ADD, f"Ajouté aux favoris : {listing.title}",
+        content_object=listing, request=request,
+    )
     return JsonResponse({'success': True, 'is_favorite': True})
 
 
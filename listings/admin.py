@@ -1,4 +1,4 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.models import Group
 from django.contrib.auth.admin import GroupAdmin
 from django.utils.html import format_html
@@ -6,7 +6,8 @@ from django.core.exceptions import ValidationError
 from django.forms.models import BaseInlineFormSet
 from adminsortable2.admin import SortableAdminBase, SortableInlineAdminMixin, CustomInlineFormSetMixin
 
-from .models import Listing, ListingPhoto
+from .forms import ListingImportForm
+from .models import Listing, ListingImport, ListingPhoto
 from django.contrib.auth import get_user_model
 from core.admin_site import admin_site
 
@@ -16,6 +17,15 @@ from agencies.filters import RegionListFilter, DistrictListFilter, CityListFilte
 User = get_user_model()
 
 
+# Filtres hiérarchiques sur les colonnes dénormalisées (sans jointure city → district → region)
+class ListingRegionListFilter(RegionListFilter):
+    field_lookup = "region_id"
+
+
+class ListingDistrictListFilter(DistrictListFilter):
+    field_lookup = "district_id"
+
+
 # === Inline avec aperçu et validation is_cover ===
 class ListingPhotoInlineFormset(CustomInlineFormSetMixin, BaseInlineFormSet):
     def __init__(self, *args, **kwargs):
@@ -53,8 +63,8 @@ class ListingPhotoInline(SortableInlineAdminMixin, admin.StackedInline):
     def preview(self, obj):
         if obj.image:
             return format_html(
-                '<img src="{}" style="max-height:120px; border:1px solid #ccc;"/>',
-                obj.image.url,
+                '<img src="{}" style="max-height:120px; border:1px solid #ccc;" loading="lazy"/>',
+                obj.thumb_url,
             )
         return "—"
     preview.short_description = "Aperçu"
@@ -82,25 +92,26 @@ class ListingAdmin(SortableAdminBase, admin.ModelAdmin):
     )
     list_filter = (
         "agency", "category", "listing_type", "published",
-        RegionListFilter, DistrictListFilter, CityListFilter
+        ListingRegionListFilter, ListingDistrictListFilter, CityListFilter
     )
     search_fields = (
-        "title", "city__name", "city__district__name",
-        "city__district__region__name", "agency__name", "owner__username"
+        "title", "city__name", "district__name",
+        "region__name", "agency__name", "owner__username"
     )
+    list_select_related = ("agency", "owner", "city__district__region", "district", "region")
     prepopulated_fields = {"slug": ("title",)}
     inlines = [ListingPhotoInline]
 
     # Helpers cockpit-ready
     def get_district(self, obj):
-        return obj.city.district if obj.city else None
+        return obj.district.name if obj.district else None
     get_district.short_description = "District"
-    get_district.admin_order_field = "city__district__name"
+    get_district.admin_order_field = "district__name"
 
     def get_region(self, obj):
-        return obj.city.district.region if obj.city else None
+        return obj.region
     get_region.short_description = "Région"
-    get_region.admin_order_field = "city__district__region__name"
+    get_region.admin_order_field = "region__name"
 
     # === Helper pour vérifier permissions ===
     def _call_or_bool(self, obj, attr_name):
@@ -286,6 +297,82 @@ class ListingPhotoAdmin(admin.ModelAdmin):
         return attr() if callable(attr) else bool(attr)
 
 
+# === Admin ListingImport : envoi d'un fichier CSV / JSONL ===
+@admin.register(ListingImport, site=admin_site)
+class ListingImportAdmin(admin.ModelAdmin):
+    form = ListingImportForm
+    list_display = (
+        "source_name", "agency", "user", "status", "total_rows",
+        "created_count", "error_count", "error_report_link", "created_at",
+    )
+    list_filter = ("status", "agency")
+    list_select_related = ("agency", "user")
+    readonly_fields = (
+        "user", "source_name", "status", "total_rows", "created_count",
+        "error_count", "error_report_link", "created_at", "finished_at",
+    )
+
+    def get_fields(self, request, obj=None):
+        if obj is None:
+            return ("agency", "source")
+        return ("agency", *self.readonly_fields)
+
+    def get_readonly_fields(self, request, obj=None):
+        return self.readonly_fields if obj is None else ("agency", *self.readonly_fields)
+
+    def get_form(self, request, obj=None, **kwargs):
+        form = super().get_form(request, obj, **kwargs)
+        if obj is None:
+            form.base_fields["source"].help_text = (
+                "Une annonce par ligne (CSV avec en-têtes, ou JSONL) : title, category, listing_type, "
+                "price, city (nom ou identifiant), district / region (homonymes), bedrooms, description…"
+            )
+            if not self._call_or_bool(request.user, "is_platform_admin"):
+                agency = form.base_fields["agency"]
+                agency.queryset = agency.queryset.filter(pk=request.user.agency_id)
+                agency.initial = request.user.agency_id
+        return form
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if self._call_or_bool(request.user, "is_platform_admin"):
+            return qs
+        return qs.filter(agency_id=request.user.agency_id) if request.user.agency_id else qs.none()
+
+    def has_add_permission(self, request):
+        user = request.user
+        return self._call_or_bool(user, "is_platform_admin") or self._call_or_bool(user, "is_agency_admin")
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def save_model(self, request, obj, form, change):
+        from .importer import detect_format, run_import
+
+        obj.user = request.user
+        obj.source_name = obj.source.name.rsplit("/", 1)[-1]
+        super().save_model(request, obj, form, change)
+        # Import synchrone en flux ; pour de très gros fichiers : manage.py import_listings
+        with obj.source.open("rb") as handle:
+            run_import(obj, handle, detect_format(obj.source_name))
+        level = messages.WARNING if obj.error_count or obj.status == ListingImport.Status.FAILED else messages.SUCCESS
+        self.message_user(
+            request,
+            f"{obj.created_count} annonce(s) importée(s), {obj.error_count} ligne(s) refusée(s) sur {obj.total_rows}.",
+            level,
+        )
+
+    def error_report_link(self, obj):
+        if not obj.error_report:
+            return "—"
+        return format_html('<a href="{}">Rapport d\'erreurs</a>', obj.error_report.url)
+    error_report_link.short_description = "Rapport d'erreurs"
+
+    def _call_or_bool(self, obj, attr_name):
+        attr = getattr(obj, attr_name, None)
+        return attr() if callable(attr) else bool(attr)
+
+
 # === Nettoyage et réenregistrement ===
 try:
     admin_site.unregister(User)
@@ -1,23 +1,115 @@
 # listings/api_views.py
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import UnsupportedMediaType, ValidationError
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
-from rest_framework.serializers import ModelSerializer
-from .models import Listing
+from rest_framework.serializers import ModelSerializer, SerializerMethodField
+from .models import Listing, PhotoUpload
 from .query import listings_for_user
+from .serializers import ListingPhotoSerializer, PhotoUploadSerializer
+from .uploads import abort_upload, append_chunk, create_upload, finalize_upload
 from core.drf_permissions import ListingAccessPermission
 
+UPLOAD_CONTENT_TYPE = "application/offset+octet-stream"
+UPLOAD_ID = r"(?P<upload_id>[0-9a-f-]{32,36})"
+
 class ListingSerializer(ModelSerializer):
+    """
+    cover_photo / gallery_photos : URLs des originaux (compatibilité).
+    cover_image / gallery_images : mêmes photos avec renditions et srcset (ListingPhotoSerializer).
+    """
+    cover_photo = SerializerMethodField()
+    gallery_photos = SerializerMethodField()
+    cover_image = SerializerMethodField()
+    gallery_images = SerializerMethodField()
+
     class Meta:
         model = Listing
         fields = '__all__'
         read_only_fields = ('agency', 'owner')
 
+    def get_cover_photo(self, obj):
+        return obj.cover_photo()
+
+    def get_gallery_photos(self, obj):
+        return [p.image.url for p in obj.gallery_photos()]
+
+    def get_cover_image(self, obj):
+        cover = obj.cover
+        return ListingPhotoSerializer(cover).data if cover else None
+
+    def get_gallery_images(self, obj):
+        return ListingPhotoSerializer(obj.gallery_photos(), many=True).data
+
 class ListingViewSet(ModelViewSet):
     serializer_class = ListingSerializer
     permission_classes = [ListingAccessPermission]
 
     def get_queryset(self):
-        return listings_for_user(self.request.user)
+        # Photos préchargées une fois par page (cover/galerie calculées en mémoire)
+        return listings_for_user(self.request.user).with_photos()
 
     def perform_create(self, serializer):
         user = self.request.user
-        serializer.save(agency=user.agency, owner=user)
\ No newline at end of file
+        serializer.save(agency=user.agency, owner=user)
+
+    # 📤 Envoi de photos reprenable (listings/uploads.py)
+    def _upload_response(self, request, upload, status_code=status.HTTP_200_OK, body=True):
+        headers = {
+            "Upload-Offset": str(upload.offset),
+            "Upload-Length": str(upload.length),
+            "Upload-Expires": upload.expires_at.isoformat(),
+            "Location": request.build_absolute_uri(
+                reverse("listing-upload", kwargs={"pk": upload.listing_id, "upload_id": upload.pk})
+            ),
+            "Cache-Control": "no-store",
+        }
+        data = PhotoUploadSerializer(upload).data if body else None
+        return Response(data, status=status_code, headers=headers)
+
+    def _get_upload(self, request, upload_id):
+        listing = self.get_object()
+        return get_object_or_404(
+            PhotoUpload.objects.select_related("listing"),
+            pk=upload_id, listing=listing, user=request.user, expires_at__gt=timezone.now(),
+        )
+
+    @action(detail=True, methods=["post"], url_path="uploads", url_name="uploads")
+    def uploads(self, request, pk=None):
+        listing = self.get_object()
+        is_cover = request.data.get("is_cover")
+        upload = create_upload(
+            listing,
+            request.user,
+            request.data.get("filename", ""),
+            request.headers.get("Upload-Length") or request.data.get("length"),
+            is_cover=None if is_cover is None else str(is_cover).lower() in ("1", "true", "yes"),
+        )
+        return self._upload_response(request, upload, status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=["get", "patch", "delete"], url_path=f"uploads/{UPLOAD_ID}", url_name="upload")
+    def upload(self, request, pk=None, upload_id=None):
+        upload = self._get_upload(request, upload_id)
+        if request.method == "DELETE":
+            abort_upload(upload)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        if request.method == "PATCH":
+            if request.content_type.split(";")[0].strip() != UPLOAD_CONTENT_TYPE:
+                raise UnsupportedMediaType(request.content_type)
+            try:
+                offset = int(request.headers["Upload-Offset"])
+            except (KeyError, ValueError):
+                raise ValidationError({"Upload-Offset": "En-tête Upload-Offset (entier) requis."})
+            # Corps lu par blocs directement depuis la requête (jamais request.data)
+            append_chunk(upload, offset, request.stream)
+            return self._upload_response(request, upload, status.HTTP_204_NO_CONTENT, body=False)
+        return self._upload_response(request, upload)
+
+    @action(detail=True, methods=["post"], url_path=f"uploads/{UPLOAD_ID}/finalize", url_name="upload-finalize")
+    def upload_finalize(self, request, pk=None, upload_id=None):
+        photo = finalize_upload(self._get_upload(request, upload_id))
+        return Response(ListingPhotoSerializer(photo).data, status=status.HTTP_201_CREATED)
@@ -1,12 +1,22 @@
 import django_filters
 from .models import Listing
+from .search import search_listings
 
 class ListingFilter(django_filters.FilterSet):
     min_price = django_filters.NumberFilter(field_name="price", lookup_expr="gte")
     max_price = django_filters.NumberFilter(field_name="price", lookup_expr="lte")
     city = django_filters.CharFilter(field_name="city__id", lookup_expr="exact")
     category = django_filters.CharFilter(field_name="category", lookup_expr="iexact")
+    q = django_filters.CharFilter(method="filter_search", label="Mots-clés")
 
     class Meta:
         model = Listing
-        fields = ["city", "category", "min_price", "max_price"]
\ No newline at end of file
+        fields = ["city", "category", "min_price", "max_price", "q"]
+
+    def filter_search(self, queryset, name, value):
+        """Recherche plein texte classée par pertinence, filtres structurés appliqués dans l'index."""
+        data = self.form.cleaned_data
+        return search_listings(
+            queryset, value, city_id=data.get("city"), category=(data.get("category") or "").lower(),
+            min_price=data.get("min_price"), max_price=data.get("max_price"),
+        )
\ No newline at end of file
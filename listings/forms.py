@@ -1,5 +1,5 @@
 from django import forms
-from .models import Listing, ListingPhoto
+from .models import Listing, ListingImport, ListingPhoto
 
 
 class ListingPhotoForm(forms.ModelForm):
@@ -32,3 +32,23 @@ class ListingForm(forms.ModelForm):
             'address': forms.TextInput(attrs={'class': 'form-control'}),
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 4}),
         }
+
+
+class ListingImportForm(forms.ModelForm):
+    """Envoi d'un fichier d'import d'annonces (admin)."""
+
+    class Meta:
+        model = ListingImport
+        fields = ['agency', 'source']
+
+    def clean_source(self):
+        from .importer import detect_format
+
+        source = self.cleaned_data.get('source')
+        if not source:
+            raise forms.ValidationError("Fichier d'import requis.")
+        try:
+            detect_format(source.name)
+        except ValueError as exc:
+            raise forms.ValidationError(str(exc))
+        return source
@@ -0,0 +1,141 @@
+# listings/images.py
+"""
+Déclinaisons (renditions) des photos d'annonces.
+
+Chaque photo est décodée une fois, réorientée selon l'EXIF puis réduite aux
+tailles de RENDITIONS, encodées en WebP et en JPEG progressif. Les fichiers
+produits ne contiennent aucune métadonnée EXIF (position GPS des téléphones).
+
+`render_renditions` est une fonction pure (chemin ou octets → octets encodés) :
+elle peut tourner dans un processus séparé (ProcessPoolExecutor). L'écriture
+dans le stockage et la mise à jour de la ligne restent dans le processus Django
+(`store_renditions`).
+"""
+import io
+import posixpath
+
+from PIL import Image, ImageOps
+
+# Nom → boîte maximale (largeur, hauteur) ; jamais d'agrandissement
+RENDITIONS = {
+    "thumb": (320, 320),
+    "card": (640, 480),
+    "detail": (1600, 1200),
+}
+
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+RENDITIONS_DIR = "listings/renditions"
+
+ORIENTATION_TAG = 0x0112
+
+# Affiché à la place d'une photo encore en traitement (rectangle gris 4:3)
+PLACEHOLDER_URL = (
+    "data:image/svg+xml;charset=utf-8,"
+    "%3Csvg xmlns=%27http://www.w3.org/2000/svg%27 viewBox=%270 0 4 3%27%3E"
+    "%3Crect width=%274%27 height=%273%27 fill=%27%23e5e7eb%27/%3E%3C/svg%3E"
+)
+
+
+def _to_rgb(image):
+    """Aplatit la transparence sur fond blanc (le JPEG ne la supporte pas)."""
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB") if image.mode != "RGB" else image
+
+
+def render_renditions(source):
+    """
+    `source` : chemin de fichier ou octets de l'image d'origine.
+    Retourne {"width", "height", "renditions": {nom: {"width", "height", format: octets}}}.
+    """
+    with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as original:
+        width, height = original.size
+        # Orientations EXIF 5 à 8 : photo tournée de 90°
+        if original.getexif().get(ORIENTATION_TAG, 1) in (5, 6, 7, 8):
+            width, height = height, width
+        # JPEG : décodage directement à une échelle réduite (toujours ≥ la plus grande rendition)
+        original.draft("RGB", max(RENDITIONS.values()))
+        image = _to_rgb(ImageOps.exif_transpose(original))
+
+    renditions = {}
+    for name, box in RENDITIONS.items():
+        resized = image.copy()
+        resized.thumbnail(box, Image.Resampling.LANCZOS)
+        rendition = {"width": resized.width, "height": resized.height}
+        for fmt, (pil_format, params) in FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, format=pil_format, **params)
+            rendition[fmt] = buffer.getvalue()
+        renditions[name] = rendition
+    return {"width": width, "height": height, "renditions": renditions}
+
+
+# === Côté Django : stockage et mise à jour de ListingPhoto ===
+def photo_source(photo):
+    """Chemin local de l'original si le stockage en a un (évite de copier les octets vers un processus), sinon ses octets."""
+    try:
+        return photo.image.path
+    except NotImplementedError:
+        with photo.image.open("rb") as handle:
+            return handle.read()
+
+
+def rendition_names(renditions):
+    """Noms de fichiers d'un dict `ListingPhoto.renditions`."""
+    return [
+        path
+        for name in RENDITIONS
+        for fmt in FORMATS
+        if (path := renditions.get(name, {}).get(fmt, {}).get("name"))
+    ]
+
+
+def store_renditions(photo, rendered):
+    """Écrit les fichiers de `render_renditions` et met à jour la photo (une UPDATE)."""
+    from django.core.files.base import ContentFile
+
+    from .storage import release_photo_files
+
+    storage = photo.image.storage
+    previous = photo.renditions or {}
+    # Stockage adressé par contenu : même original → mêmes fichiers de renditions, partagés ;
+    # hash lié à l'original, pour que son compteur de références couvre aussi ses renditions
+    stem = posixpath.splitext(posixpath.basename(photo.image.name))[0]
+    renditions = {"source": photo.image.name}
+    for name, rendition in rendered["renditions"].items():
+        entry = {"width": rendition["width"], "height": rendition["height"]}
+        for fmt in FORMATS:
+            data = rendition[fmt]
+            content = ContentFile(data)
+            content.derived_from = photo.image.name
+            path = storage.save(f"{RENDITIONS_DIR}/{stem}-{name}.{fmt}", content)
+            entry[fmt] = {"name": path, "bytes": len(data)}
+        renditions[name] = entry
+
+    photo.width = rendered["width"]
+    photo.height = rendered["height"]
+    photo.file_size = photo.image.size
+    photo.renditions = renditions
+    photo.status = photo.Status.READY
+    photo.spool_path = photo.last_error = ""
+    photo.claimed_at = None
+    photo.save(update_fields=[
+        "image", "width", "height", "file_size", "renditions", "status", "spool_path", "last_error", "claimed_at",
+    ])
+    # Original remplacé : l'ancien et ses renditions ne sont effacés que si plus aucune photo ne les utilise
+    previous_source = previous.get("source")
+    if previous_source and previous_source != photo.image.name:
+        release_photo_files(storage, previous_source, previous, keep=rendition_names(renditions))
+    return photo
+
+
+def process_photo(photo):
+    """Génère et enregistre les renditions d'une photo (dans le processus courant)."""
+    return store_renditions(photo, render_renditions(photo_source(photo)))
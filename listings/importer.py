@@ -0,0 +1,244 @@
+# listings/importer.py
+"""
+Import en masse d'annonces depuis un fichier CSV ou JSONL.
+
+Le fichier est lu ligne à ligne, jamais entièrement en mémoire. Chaque ligne est
+validée par ListingWriteSerializer. La ville (nom, avec district / région pour
+lever les homonymies, ou identifiant) est résolue dans une table en mémoire
+construite une fois pour tout l'import (LocationLookup) : aucune requête par ligne.
+
+Les annonces valides sont insérées par lots avec bulk_create, donc sans signal
+post_save : pas de notification « listing_created » par annonce. Les effets
+utiles des signaux sont appliqués une fois par lot (statistiques d'agence,
+index de recherche) ou une fois par import (blocs en cache), puis une seule
+notification récapitulative est mise en file (« listing_import_done »).
+Les lignes refusées sont décrites dans un rapport CSV (ListingImport.error_report).
+"""
+import csv
+import io
+import json
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from agencies.models import City
+from .models import Listing, ListingImport
+from .search import get_search_index, strip_accents
+from .serializers import ListingWriteSerializer
+
+LOCATION_FIELDS = ("city", "district", "region")
+
+REPORT_HEADER = ("ligne", "erreurs", "donnees")
+
+
+def detect_format(name):
+    suffix = Path(name).suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Format non reconnu pour {name} (attendu : .csv ou .jsonl)")
+
+
+def read_rows(handle, fmt):
+    """
+    `handle` : fichier binaire. Produit (numéro de ligne, dict) ; dict vaut None
+    pour une ligne JSONL illisible. Les valeurs vides sont omises.
+    """
+    text = io.TextIOWrapper(handle, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, {
+                key.strip(): value.strip()
+                for key, value in row.items()
+                if key and isinstance(value, str) and value.strip()
+            }
+        return
+    for number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield number, None
+            continue
+        if not isinstance(row, dict):
+            yield number, None
+            continue
+        yield number, {key: value for key, value in row.items() if value not in (None, "")}
+
+
+def _normalize(name):
+    return " ".join(strip_accents(str(name or "")).lower().split())
+
+
+class LocationLookup:
+    """Villes de la hiérarchie région / district / ville, indexées par nom normalisé (une requête)."""
+
+    def __init__(self):
+        self._by_id = {}
+        self._by_name = defaultdict(list)
+        rows = City.objects.values_list(
+            "id", "name", "district_id", "district__name", "district__region_id", "district__region__name"
+        )
+        for city_id, city, district_id, district, region_id, region in rows:
+            entry = (city_id, district_id, region_id, _normalize(district), _normalize(region))
+            self._by_id[city_id] = entry
+            self._by_name[_normalize(city)].append(entry)
+
+    def resolve(self, city, district=None, region=None):
+        """(city_id, district_id, region_id) ; ValueError si la ville est inconnue ou ambiguë."""
+        city = str(city).strip()
+        if city.isdigit():
+            if int(city) not in self._by_id:
+                raise ValueError(f"Ville inconnue : {city}")
+            return self._by_id[int(city)][:3]
+        candidates = self._by_name.get(_normalize(city), [])
+        if district:
+            candidates = [entry for entry in candidates if entry[3] == _normalize(district)]
+        if region:
+            candidates = [entry for entry in candidates if entry[4] == _normalize(region)]
+        if not candidates:
+            raise ValueError(f"Ville inconnue : {city}")
+        if len(candidates) > 1:
+            raise ValueError(f"Ville ambiguë : {city} (préciser le district ou la région)")
+        return candidates[0][:3]
+
+
+def build_listing(row, lookup, agency, owner):
+    """Ligne → (Listing non enregistrée, None) ou (None, {champ: [erreurs]})."""
+    if row is None:
+        return None, {"ligne": ["Ligne JSON illisible ou qui n'est pas un objet."]}
+    data = {key: value for key, value in row.items() if key not in LOCATION_FIELDS and key != "slug"}
+    serializer = ListingWriteSerializer(data=data)
+    errors = {} if serializer.is_valid() else {field: [str(e) for e in errs] for field, errs in serializer.errors.items()}
+
+    location = None
+    if row.get("city") is not None:
+        try:
+            location = lookup.resolve(row["city"], row.get("district"), row.get("region"))
+        except ValueError as exc:
+            errors["city"] = [str(exc)]
+    if errors:
+        return None, errors
+
+    listing = Listing(**serializer.validated_data, agency=agency, owner=owner)
+    if location:
+        listing.city_id, listing.district_id, listing.region_id = location
+    # Même forme que Listing.save ; rendu unique par lot dans _assign_slugs
+    listing.slug = listing._slug_base = slugify(row.get("slug") or f"{listing.title}-{agency.id}")[:200]
+    return listing, None
+
+
+def _assign_slugs(listings, used):
+    """Slugs uniques (base, base-2, base-3…), vérifiés en base par lot et non par annonce."""
+    bases = [listing._slug_base for listing in listings]
+    suffixes = [1] * len(listings)
+    pending = list(range(len(listings)))
+    while pending:
+        candidates = {i: bases[i] if suffixes[i] == 1 else f"{bases[i]}-{suffixes[i]}" for i in pending}
+        existing = set(Listing.objects.filter(slug__in=candidates.values()).values_list("slug", flat=True))
+        retry = []
+        for i in pending:
+            if candidates[i] in existing or candidates[i] in used:
+                suffixes[i] += 1
+                retry.append(i)
+            else:
+                used.add(candidates[i])
+                listings[i].slug = candidates[i]
+        pending = retry
+
+
+def _insert_batch(listings, agency_id, used_slugs):
+    from agencies.stats import apply_delta
+
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                _assign_slugs(listings, used_slugs)
+                created = Listing.objects.bulk_create(listings)
+                # Effets des signaux post_save, une fois pour le lot
+                apply_delta(
+                    agency_id,
+                    total_listings=len(created),
+                    published_listings=sum(1 for listing in created if listing.published),
+                )
+                # bulk_create ne renvoie pas les clés sur MySQL : lignes relues par leurs slugs (uniques)
+                slugs = [listing.slug for listing in created]
+                transaction.on_commit(
+                    lambda: get_search_index().index(
+                        Listing.objects.filter(slug__in=slugs).select_related("city", "district", "region")
+                    ),
+                    robust=True,
+                )
+            return len(created)
+        except IntegrityError:
+            # Slug pris entre-temps par une autre écriture : nouveaux slugs, un seul nouvel essai
+            if attempt:
+                raise
+            used_slugs.difference_update(listing.slug for listing in listings)
+
+
+def run_import(listing_import, handle, fmt=None, batch_size=500):
+    """
+    Importe le fichier binaire `handle` pour `listing_import` (agence, propriétaire)
+    et met à jour ses compteurs, son statut et son rapport d'erreurs.
+    """
+    from core.fragment_cache import invalidate_fragments_for
+    from notifications.outbox import enqueue_notification
+
+    fmt = fmt or detect_format(listing_import.source_name or listing_import.source.name)
+    agency, owner = listing_import.agency, listing_import.user
+    listing_import.status = ListingImport.Status.RUNNING
+    listing_import.save(update_fields=["status"])
+
+    lookup = LocationLookup()
+    used_slugs = set()
+    total = created = failed = 0
+    batch = []
+    with tempfile.TemporaryFile() as raw_report:
+        report = io.TextIOWrapper(raw_report, encoding="utf-8", newline="")
+        writer = csv.writer(report)
+        writer.writerow(REPORT_HEADER)
+        status = ListingImport.Status.DONE
+        try:
+            for number, row in read_rows(handle, fmt):
+                total += 1
+                listing, errors = build_listing(row, lookup, agency, owner)
+                if errors:
+                    failed += 1
+                    writer.writerow([number, json.dumps(errors, ensure_ascii=False), json.dumps(row, ensure_ascii=False)])
+                    continue
+                batch.append(listing)
+                if len(batch) >= batch_size:
+                    created += _insert_batch(batch, agency.pk, used_slugs)
+                    batch = []
+            if batch:
+                created += _insert_batch(batch, agency.pk, used_slugs)
+        except (UnicodeDecodeError, csv.Error, IntegrityError) as exc:
+            # Fichier illisible au-delà d'une ligne : les lots déjà insérés restent
+            status = ListingImport.Status.FAILED
+            writer.writerow([total, json.dumps({"fichier": [str(exc)]}, ensure_ascii=False), ""])
+
+        listing_import.total_rows = total
+        listing_import.created_count = created
+        listing_import.error_count = failed
+        listing_import.status = status
+        listing_import.finished_at = timezone.now()
+        report.flush()
+        report.detach()
+        if failed or status == ListingImport.Status.FAILED:
+            raw_report.seek(0)
+            listing_import.error_report.save(f"import-{listing_import.pk}-erreurs.csv", File(raw_report), save=False)
+    listing_import.save()
+
+    if created:
+        invalidate_fragments_for(Listing)
+    enqueue_notification(listing_import, "listing_import_done")
+    return listing_import
@@ -0,0 +1,108 @@
+import statistics
+import time
+from urllib.parse import parse_qs, urlparse
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from agencies.models import Agency
+from listings.models import Listing
+from listings.pagination import MixedPagination
+
+BENCH_AGENCY = "Agence Benchmark"
+BENCH_SLUG_PREFIX = "bench-"
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark pagination : compare p50/p95 de la page 1 et d'une page profonde "
+        "pour les modes page, limit/offset et cursor"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0, help="Nombre d'annonces de test à créer avant la mesure (ex: 200000)")
+        parser.add_argument("--page", type=int, default=500, help="Page profonde à mesurer")
+        parser.add_argument("--page-size", type=int, default=20, help="Taille de page")
+        parser.add_argument("--repeat", type=int, default=30, help="Nombre de mesures par cas")
+        parser.add_argument("--cleanup", action="store_true", help="Supprime les annonces de test après la mesure")
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            self.seed(options["seed"])
+
+        page_size = options["page_size"]
+        deep = options["page"]
+        queryset = Listing.objects.filter(published=True)
+        self.stdout.write(self.style.NOTICE(
+            f"=== BENCHMARK PAGINATION ({queryset.count()} annonces publiées, page_size={page_size}) ==="
+        ))
+
+        cases = {
+            "page": lambda page: {"page": page, "page_size": page_size},
+            "limit": lambda page: {"limit": page_size, "offset": (page - 1) * page_size},
+            "cursor": lambda page: {"cursor": self.cursor_for_page(queryset, page, page_size), "page_size": page_size},
+        }
+        for mode, params_for in cases.items():
+            for page in (1, deep):
+                params = params_for(page)
+                timings = [self.measure(queryset, params) for _ in range(options["repeat"])]
+                p50, p95 = self.percentiles(timings)
+                self.stdout.write(f" - {mode:<7} page {page:<5} p50={p50:8.2f} ms  p95={p95:8.2f} ms")
+
+        if options["cleanup"]:
+            deleted, _ = Listing.objects.filter(slug__startswith=BENCH_SLUG_PREFIX).delete()
+            self.stdout.write(self.style.WARNING(f"{deleted} annonce(s) de test supprimée(s)"))
+
+        self.stdout.write(self.style.NOTICE("=== FIN BENCHMARK ==="))
+
+    def seed(self, total, batch_size=5000):
+        agency, _ = Agency.objects.get_or_create(name=BENCH_AGENCY)
+        start = Listing.objects.filter(slug__startswith=BENCH_SLUG_PREFIX).count()
+        self.stdout.write(f"Création de {total} annonces de test...")
+        # bulk_create : pas de signaux post_save (pas de notifications)
+        for offset in range(start, start + total, batch_size):
+            with transaction.atomic():
+                Listing.objects.bulk_create([
+                    Listing(
+                        title=f"Annonce benchmark {i}",
+                        slug=f"{BENCH_SLUG_PREFIX}{i}",
+                        category=Listing.Category.HOUSE,
+                        listing_type=Listing.ListingType.RENT,
+                        price=50000 + i % 1000,
+                        agency=agency,
+                        published=True,
+                    )
+                    for i in range(offset, min(offset + batch_size, start + total))
+                ])
+        self.stdout.write(self.style.SUCCESS(f"{total} annonces créées"))
+
+    def paginate(self, queryset, params):
+        request = Request(APIRequestFactory().get("/api/listings/", params))
+        paginator = MixedPagination()
+        page = paginator.paginate_queryset(queryset, request)
+        return paginator, paginator.get_paginated_response([obj.pk for obj in page])
+
+    def measure(self, queryset, params):
+        start = time.perf_counter()
+        self.paginate(queryset, params)
+        return (time.perf_counter() - start) * 1000
+
+    def cursor_for_page(self, queryset, page, page_size):
+        """Suit les liens "next" jusqu'à la page voulue (non chronométré)."""
+        cursor = ""
+        for _ in range(page - 1):
+            paginator, _ = self.paginate(queryset, {"cursor": cursor, "page_size": page_size})
+            next_link = paginator.get_next_link()
+            if not next_link:
+                break
+            cursor = parse_qs(urlparse(next_link).query)[paginator.cursor_query_param][0]
+        return cursor
+
+    @staticmethod
+    def percentiles(timings):
+        if len(timings) < 2:
+            return timings[0], timings[0]
+        cuts = statistics.quantiles(timings, n=100, method="inclusive")
+        return statistics.median(timings), cuts[94]
@@ -0,0 +1,96 @@
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from listings.models import Listing
+from listings.search import ListingSearchIndex
+
+CITIES = ["Lomé", "Kara", "Sokodé", "Kpalimé", "Atakpamé", "Dapaong", "Tsévié", "Aného", "Bassar", "Mango"]
+REGIONS = ["Maritime", "Plateaux", "Centrale", "Kara", "Savanes"]
+WORDS = [
+    "villa", "maison", "appartement", "terrain", "bureau", "magasin", "piscine", "jardin", "meublé",
+    "climatisé", "carrelé", "moderne", "spacieux", "lumineux", "sécurisé", "parking", "garage", "terrasse",
+    "balcon", "cuisine", "équipée", "chambres", "salon", "douche", "forage", "clôturé", "titre", "foncier",
+    "plage", "centre", "quartier", "calme", "vue", "mer", "neuf", "rénové", "étage", "duplex", "studio",
+]
+QUERIES = [
+    ("1 terme", "piscine", {}),
+    ("2 termes", "villa piscine", {}),
+    ("accents", "meuble climatise", {}),
+    ("préfixe", "apparte", {}),
+    ("+ filtres", "maison jardin", {"category": "house", "listing_type": "rent", "max_price": 300000}),
+    ("+ ville", "terrain titre foncier", {"city_id": 3}),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de la recherche plein texte : construit un index temporaire d'annonces "
+        "synthétiques (500 000 par défaut) et mesure p50/p95 par type de requête"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--listings", type=int, default=500_000, help="Nombre d'annonces synthétiques")
+        parser.add_argument("--repeat", type=int, default=50, help="Mesures par requête")
+        parser.add_argument("--limit", type=int, default=20, help="Résultats par requête")
+        parser.add_argument("--seed", type=int, default=42, help="Graine aléatoire")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with tempfile.TemporaryDirectory() as directory:
+            index = ListingSearchIndex(Path(directory) / "benchmark.sqlite3")
+            self.stdout.write(self.style.NOTICE(f"=== BENCHMARK RECHERCHE ({options['listings']} annonces) ==="))
+
+            started = time.perf_counter()
+            total = index.rebuild(self.batches(rng, options["listings"]))
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f" - indexation : {total} annonces en {elapsed:.1f}s ({total / elapsed:.0f}/s)")
+
+            for label, query, filters in QUERIES:
+                timings = []
+                for _ in range(options["repeat"]):
+                    start = time.perf_counter()
+                    index.search(query, limit=options["limit"], published=1, **filters)
+                    timings.append((time.perf_counter() - start) * 1000)
+                matches = index.count(query, published=1, **filters)
+                p50, p95 = self.percentiles(timings)
+                self.stdout.write(
+                    f" - {label:<10} « {query} » : {matches:>7} résultats  p50={p50:7.2f} ms  p95={p95:7.2f} ms"
+                )
+            index.close()
+        self.stdout.write(self.style.NOTICE("=== FIN BENCHMARK ==="))
+
+    @staticmethod
+    def batches(rng, total, batch_size=10_000):
+        categories = Listing.Category.values
+        types = Listing.ListingType.values
+        for offset in range(0, total, batch_size):
+            batch = []
+            for pk in range(offset + 1, min(offset + batch_size, total) + 1):
+                city_index = rng.randrange(len(CITIES))
+                batch.append(SimpleNamespace(
+                    pk=pk,
+                    title=" ".join(rng.sample(WORDS, 4)),
+                    description=" ".join(rng.choices(WORDS, k=40)),
+                    address=f"Quartier {rng.choice(WORDS)} {rng.randrange(200)}",
+                    city=SimpleNamespace(name=CITIES[city_index]),
+                    district=None,
+                    region=SimpleNamespace(name=REGIONS[city_index % len(REGIONS)]),
+                    published=rng.random() < 0.9,
+                    city_id=city_index + 1,
+                    region_id=city_index % len(REGIONS) + 1,
+                    category=rng.choice(categories),
+                    listing_type=rng.choice(types),
+                    price=rng.randrange(20_000, 2_000_000, 5_000),
+                ))
+            yield batch
+
+    @staticmethod
+    def percentiles(timings):
+        cuts = statistics.quantiles(timings, n=100, method="inclusive")
+        return statistics.median(timings), cuts[94]
@@ -0,0 +1,60 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from listings.images import photo_source, render_renditions, store_renditions
+from listings.models import ListingPhoto
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère les renditions (thumb / card / detail, WebP + JPEG) des photos existantes, "
+        "le décodage et l'encodage tournant dans un pool de processus"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Processus de traitement d'image")
+        parser.add_argument("--batch-size", type=int, default=100, help="Photos lues par requête")
+        parser.add_argument("--force", action="store_true", help="Régénère aussi les photos qui ont déjà leurs renditions")
+
+    def handle(self, *args, **options):
+        photos = ListingPhoto.objects.exclude(image="").exclude(image__isnull=True).order_by("pk")
+        self.stdout.write(self.style.NOTICE(f"=== RENDITIONS DES PHOTOS ({options['workers']} processus) ==="))
+
+        done = skipped = failed = 0
+        started = time.monotonic()
+        last_pk = 0
+        with ProcessPoolExecutor(max_workers=options["workers"]) as pool:
+            while True:
+                batch = list(photos.filter(pk__gt=last_pk)[:options["batch_size"]])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+                todo = [photo for photo in batch if options["force"] or not photo.has_renditions]
+                skipped += len(batch) - len(todo)
+
+                # Décodage / encodage en parallèle ; écriture dans le stockage ici, dans l'ordre
+                futures = []
+                for photo in todo:
+                    try:
+                        futures.append((photo, pool.submit(render_renditions, photo_source(photo))))
+                    except OSError as exc:
+                        failed += 1
+                        self.stderr.write(f"   photo {photo.pk} : original illisible ({exc})")
+                for photo, future in futures:
+                    try:
+                        store_renditions(photo, future.result())
+                    except Exception as exc:
+                        failed += 1
+                        self.stderr.write(f"   photo {photo.pk} : {exc!r}")
+                    else:
+                        done += 1
+                self.stdout.write(f"   … jusqu'à la photo {last_pk} : {done} traitée(s)")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {done} photo(s) traitée(s), {skipped} déjà à jour, {failed} en échec "
+            f"en {elapsed:.1f}s ({done / elapsed if elapsed else 0:.1f} photos/s)."
+        ))
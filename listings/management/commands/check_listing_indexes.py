@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from agencies.models import City, Region
+from listings.models import Listing
+
+
+class Command(BaseCommand):
+    help = (
+        "Garde-fou index : lance EXPLAIN sur les combinaisons de filtres canoniques "
+        "de la recherche publique et échoue si l'une d'elles parcourt toute la table"
+    )
+
+    def canonical_queries(self):
+        """Combinaisons réellement utilisées par listing_list, region_listings et ListingFilter."""
+        city_id = City.objects.values_list("id", flat=True).first() or 1
+        region_id = Region.objects.values_list("id", flat=True).first() or 1
+        published = Listing.objects.filter(published=True)
+        return {
+            "ville": published.filter(city_id=city_id).order_by("-id")[:12],
+            "ville + type": published.filter(city_id=city_id, listing_type="rent").order_by("-id")[:12],
+            "ville + type + prix": published.filter(
+                city_id=city_id, listing_type="rent", price__gte=50000, price__lte=500000
+            ).order_by("-id")[:12],
+            "région": published.filter(region_id=region_id).order_by("-id")[:12],
+            "région + type + prix": published.filter(
+                region_id=region_id, listing_type="rent", price__gte=50000, price__lte=500000
+            ).order_by("-id")[:12],
+            "catégorie": published.filter(category="house").order_by("-id")[:12],
+            "catégorie + type + prix": published.filter(
+                category="house", listing_type="sale", price__gte=50000, price__lte=500000
+            ).order_by("-id")[:12],
+            "vedette": published.filter(featured=True).order_by("-created_at")[:6],
+            "récentes (home, API)": published.order_by("-created_at")[:10],
+        }
+
+    def handle(self, *args, **options):
+        table = Listing._meta.db_table
+        if connection.vendor != "mysql":
+            # Ailleurs (ex: SQLite) Django compile published=True en `WHERE published`,
+            # qui n'utilise pas les index : le plan ne serait pas représentatif.
+            self.stdout.write(self.style.WARNING(
+                f"⚠️ Vérification prévue pour MySQL uniquement (base actuelle : {connection.vendor})."
+            ))
+            return
+        self.stdout.write(self.style.NOTICE(f"=== EXPLAIN {table} ({connection.vendor}) ==="))
+
+        failures = []
+        for label, queryset in self.canonical_queries().items():
+            sql, params = queryset.query.sql_with_params()
+            plan = self.explain(sql, params)
+            if self.is_full_scan(plan, table):
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f" ✗ {label}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f" ✓ {label}"))
+            for line in plan:
+                self.stdout.write(f"     {line}")
+
+        if failures:
+            raise CommandError(f"Parcours complet de {table} pour : {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("\n✅ Toutes les requêtes canoniques utilisent un index."))
+
+    def explain(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {sql}", params)
+            columns = [col[0] for col in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def is_full_scan(self, plan, table):
+        # type=ALL : aucune clé utilisée pour cette table
+        return any(row.get("table") == table and row.get("type") == "ALL" for row in plan)
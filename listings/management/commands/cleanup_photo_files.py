@@ -0,0 +1,90 @@
+import os
+import posixpath
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from listings.images import RENDITIONS_DIR, rendition_names
+from listings.models import ListingPhoto
+from listings.photo_queue import spool_dir
+from listings.storage import INCOMING_DIR, photo_storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Supprime les fichiers de photos (originaux, renditions, envois interrompus, "
+        "fichiers en attente de traitement) qu'aucune ListingPhoto ne référence plus"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Liste les fichiers sans les supprimer")
+        parser.add_argument(
+            "--grace", type=int, default=None,
+            help="Âge minimal (secondes) d'un fichier supprimé (défaut : LISTING_PHOTO_ORPHAN_GRACE)",
+        )
+
+    def _walk(self, storage, directory):
+        try:
+            directories, files = storage.listdir(directory)
+        except FileNotFoundError:
+            return
+        for name in files:
+            yield posixpath.join(directory, name)
+        for child in directories:
+            yield from self._walk(storage, posixpath.join(directory, child))
+
+    def handle(self, *args, **options):
+        storage = photo_storage()
+        grace = options["grace"]
+        if grace is None:
+            grace = getattr(settings, "LISTING_PHOTO_ORPHAN_GRACE", 600)
+        upload_to = ListingPhoto._meta.get_field("image").upload_to.rstrip("/")
+        self.stdout.write(self.style.NOTICE("=== FICHIERS DE PHOTOS ORPHELINS ==="))
+
+        referenced = set()
+        for image, renditions in ListingPhoto.objects.values_list("image", "renditions").iterator(chunk_size=2000):
+            if image:
+                referenced.add(image)
+            referenced.update(rendition_names(renditions or {}))
+        self.stdout.write(f"   {len(referenced)} fichier(s) référencé(s)")
+
+        deleted = freed = 0
+        now = time.time()
+        for directory in (upload_to, RENDITIONS_DIR, INCOMING_DIR):
+            for name in self._walk(storage, directory):
+                if name in referenced:
+                    continue
+                path = storage.path(name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if now - stat.st_mtime < grace:
+                    continue
+                deleted += 1
+                freed += stat.st_size
+                if options["dry_run"]:
+                    self.stdout.write(f"   {name}")
+                else:
+                    storage.delete(name)
+
+        # Dossier d'attente (LISTING_PHOTO_SPOOL_DIR) : fichiers sans photo en file
+        spooled = set(ListingPhoto.objects.exclude(spool_path="").values_list("spool_path", flat=True))
+        for path in spool_dir().iterdir():
+            if not path.is_file() or str(path) in spooled:
+                continue
+            stat = path.stat()
+            if now - stat.st_mtime < grace:
+                continue
+            deleted += 1
+            freed += stat.st_size
+            if options["dry_run"]:
+                self.stdout.write(f"   {path}")
+            else:
+                path.unlink(missing_ok=True)
+
+        verb = "à supprimer" if options["dry_run"] else "supprimé(s)"
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {deleted} fichier(s) orphelin(s) {verb} ({freed / 1024 / 1024:.1f} Mo)."
+        ))
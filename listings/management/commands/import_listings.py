@@ -0,0 +1,59 @@
+import os
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from agencies.models import Agency
+from listings.importer import detect_format, run_import
+from listings.models import ListingImport
+
+
+class Command(BaseCommand):
+    help = (
+        "Importe des annonces depuis un fichier CSV ou JSONL (lu en flux, validé ligne à ligne, "
+        "inséré par lots) ; une notification récapitulative et un rapport d'erreurs par ligne"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Fichier .csv (avec en-têtes) ou .jsonl")
+        parser.add_argument("--agency", type=int, required=True, help="Identifiant de l'agence")
+        parser.add_argument("--owner", help="Nom d'utilisateur propriétaire des annonces (destinataire du récapitulatif)")
+        parser.add_argument("--format", choices=("csv", "jsonl"), help="Format (défaut : d'après l'extension)")
+        parser.add_argument("--batch-size", type=int, default=500, help="Annonces insérées par requête")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.isfile(path):
+            raise CommandError(f"Fichier introuvable : {path}")
+        try:
+            fmt = options["format"] or detect_format(path)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        agency = Agency.objects.filter(pk=options["agency"]).first()
+        if agency is None:
+            raise CommandError(f"Agence introuvable : {options['agency']}")
+        owner = None
+        if options["owner"]:
+            owner = get_user_model().objects.filter(username=options["owner"]).first()
+            if owner is None:
+                raise CommandError(f"Utilisateur introuvable : {options['owner']}")
+
+        listing_import = ListingImport.objects.create(agency=agency, user=owner, source_name=os.path.basename(path))
+        self.stdout.write(self.style.NOTICE(f"=== IMPORT D'ANNONCES : {listing_import.source_name} → {agency.name} ==="))
+        started = time.monotonic()
+        with open(path, "rb") as handle:
+            run_import(listing_import, handle, fmt, batch_size=options["batch_size"])
+        elapsed = time.monotonic() - started
+
+        self.stdout.write(
+            f"   {listing_import.total_rows} ligne(s) lue(s) en {elapsed:.1f}s "
+            f"({listing_import.total_rows / elapsed if elapsed else 0:.0f} lignes/s)"
+        )
+        if listing_import.error_report:
+            self.stdout.write(self.style.WARNING(f"   Rapport d'erreurs : {listing_import.error_report.path}"))
+        style = self.style.SUCCESS if listing_import.status == ListingImport.Status.DONE else self.style.ERROR
+        self.stdout.write(style(
+            f"{'✅' if listing_import.status == ListingImport.Status.DONE else '❌'} "
+            f"{listing_import.created_count} annonce(s) importée(s), {listing_import.error_count} ligne(s) refusée(s)."
+        ))
@@ -0,0 +1,56 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from listings.photo_queue import process_batch, queue_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker des photos envoyées : génère les renditions des photos en attente "
+        "dans un pool de processus et rend compte du débit et de la file"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Processus de traitement d'image")
+        parser.add_argument("--batch-size", type=int, default=20, help="Photos réservées par lot")
+        parser.add_argument("--loop", action="store_true", help="Tourne en continu")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Pause (s) quand la file est vide, avec --loop")
+        parser.add_argument("--report-every", type=float, default=60.0, help="Intervalle (s) des rapports, avec --loop")
+
+    def handle(self, *args, **options):
+        self.ready = self.failed = 0
+        self.started = self.last_report = time.monotonic()
+        with ProcessPoolExecutor(max_workers=options["workers"]) as pool:
+            try:
+                while True:
+                    ready, failed = process_batch(pool, options["batch_size"])
+                    self.ready += ready
+                    self.failed += failed
+                    idle = not (ready or failed)
+                    if not options["loop"]:
+                        if idle:
+                            break
+                        continue
+                    if time.monotonic() - self.last_report >= options["report_every"]:
+                        self.report()
+                    if idle:
+                        time.sleep(options["sleep"])
+            except KeyboardInterrupt:
+                pass
+        self.report(final=True)
+
+    def report(self, final=False):
+        now = time.monotonic()
+        elapsed = now - self.started
+        stats = queue_stats()
+        self.last_report = now
+        line = (
+            f"{self.ready} photo(s) prête(s), {self.failed} échec(s) en {elapsed:.0f}s "
+            f"({self.ready / elapsed if elapsed else 0:.2f} photos/s) — file : {stats['pending']} en attente, "
+            f"{stats['processing']} en cours, {stats['failed']} en échec, "
+            f"plus ancienne : {stats['oldest_seconds']:.0f}s"
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ {line}") if final else line)
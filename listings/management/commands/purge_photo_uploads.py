@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from listings.uploads import purge_expired_uploads
+
+
+class Command(BaseCommand):
+    help = "Supprime les envois de photos reprenables abandonnés (expirés) et leurs fichiers temporaires"
+
+    def handle(self, *args, **options):
+        uploads, strays = purge_expired_uploads()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {uploads} envoi(s) expiré(s) supprimé(s), {strays} fichier(s) temporaire(s) orphelin(s) effacé(s)."
+        ))
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from listings.models import Listing
+from listings.search import get_search_index
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche plein texte des annonces (SQLite FTS5)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000, help="Annonces lues par requête")
+
+    def handle(self, *args, **options):
+        index = get_search_index()
+        self.stdout.write(self.style.NOTICE(f"=== REINDEXATION → {index.path} ==="))
+        started = time.monotonic()
+        total = index.rebuild(self.batches(options["batch_size"]))
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {total} annonce(s) indexée(s) en {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} annonces/s)."
+        ))
+
+    @staticmethod
+    def batches(batch_size):
+        """Lots d'annonces par identifiant croissant (pas d'OFFSET)."""
+        queryset = Listing.objects.select_related("city", "district", "region").order_by("pk")
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                return
+            last_pk = batch[-1].pk
+            yield batch
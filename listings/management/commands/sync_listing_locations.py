@@ -0,0 +1,56 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from agencies.models import City
+from listings.models import Listing
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill / réparation des colonnes dénormalisées district et region des annonces, "
+        "par lots d'identifiants"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Nombre d'annonces par lot")
+        parser.add_argument("--dry-run", action="store_true", help="Compte les annonces désynchronisées sans les corriger")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        # Table de correspondance ville → (district, région), chargée une seule fois
+        locations = {
+            city_id: (district_id, region_id)
+            for city_id, district_id, region_id in City.objects.values_list("id", "district_id", "district__region_id")
+        }
+
+        self.stdout.write(self.style.NOTICE("=== SYNC DISTRICT / RÉGION DES ANNONCES ==="))
+        total = last_id = 0
+        while True:
+            batch = list(
+                Listing.objects.filter(id__gt=last_id).order_by("id")
+                .values_list("id", "city_id", "district_id", "region_id")[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1][0]
+
+            # Regroupe les corrections par couple (district, région) : un UPDATE par couple
+            stale = defaultdict(list)
+            for listing_id, city_id, district_id, region_id in batch:
+                expected = locations.get(city_id, (None, None))
+                if (district_id, region_id) != expected:
+                    stale[expected].append(listing_id)
+
+            count = sum(len(ids) for ids in stale.values())
+            if count and not options["dry_run"]:
+                with transaction.atomic():
+                    for (district_id, region_id), ids in stale.items():
+                        Listing.objects.filter(id__in=ids).update(district_id=district_id, region_id=region_id)
+            if count:
+                self.stdout.write(f" - lot jusqu'à l'id {last_id} : {count} annonce(s) désynchronisée(s)")
+            total += count
+
+        verb = "à corriger" if options["dry_run"] else "corrigée(s)"
+        self.stdout.write(self.style.SUCCESS(f"\n✅ {total} annonce(s) {verb}."))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agencies', '0002_region_slug'),
+        ('listings', '0002_listing_featured'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['published', 'city', 'listing_type', 'price'], name='listing_pub_city_type_price'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['published', 'category', 'listing_type', 'price'], name='listing_pub_cat_type_price'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['published', 'featured', 'created_at'], name='listing_pub_featured_created'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['published', 'created_at'], name='listing_pub_created'),
+        ),
+    ]
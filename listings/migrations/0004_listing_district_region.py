@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_district_region(apps, schema_editor):
+    Listing = apps.get_model("listings", "Listing")
+    City = apps.get_model("agencies", "City")
+    city = City.objects.filter(pk=OuterRef("city_id"))
+    Listing.objects.filter(city__isnull=False).update(
+        district_id=Subquery(city.values("district_id")[:1]),
+        region_id=Subquery(city.values("district__region_id")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agencies', '0002_region_slug'),
+        ('listings', '0003_listing_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listing',
+            name='district',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='listings', to='agencies.district'),
+        ),
+        migrations.AddField(
+            model_name='listing',
+            name='region',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='listings', to='agencies.region'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['published', 'region', 'listing_type', 'price'], name='listing_pub_region_type_price'),
+        ),
+        migrations.RunPython(backfill_district_region, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0004_listing_district_region'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingViewCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_counts', to='listings.listing')),
+            ],
+            options={
+                'ordering': ['-day'],
+                'constraints': [models.UniqueConstraint(fields=('listing', 'day'), name='listing_view_count_unique_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0006_listing_photo_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listingphoto',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='listingphoto',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='listingphoto',
+            name='last_error',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='listingphoto',
+            name='queued_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='listingphoto',
+            name='spool_path',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='listingphoto',
+            name='status',
+            field=models.CharField(choices=[('pending', 'En attente de traitement'), ('processing', 'En cours de traitement'), ('ready', 'Prête'), ('failed', 'Échec')], default='ready', editable=False, max_length=12),
+        ),
+        migrations.AddIndex(
+            model_name='listingphoto',
+            index=models.Index(fields=['status', 'queued_at'], name='listing_photo_queue'),
+        ),
+    ]
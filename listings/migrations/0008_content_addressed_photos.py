@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:23
+
+import listings.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0007_listing_photo_queue'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='listingphoto',
+            name='image',
+            field=models.ImageField(blank=True, db_index=True, null=True, storage=listings.storage.photo_storage, upload_to='listings/photos/'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agencies', '0003_agencystats'),
+        ('listings', '0009_photo_upload'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.FileField(blank=True, help_text='Fichier .csv ou .jsonl', upload_to='listings/imports/')),
+                ('source_name', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('running', 'En cours'), ('done', 'Terminé'), ('failed', 'Échec')], default='pending', editable=False, max_length=10)),
+                ('total_rows', models.PositiveIntegerField(default=0, editable=False)),
+                ('created_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('error_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('error_report', models.FileField(blank=True, editable=False, upload_to='listings/imports/errors/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('agency', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='listing_imports', to='agencies.agency')),
+                ('user', models.ForeignKey(blank=True, help_text="Auteur de l'import, propriétaire des annonces créées", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='listing_imports', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': "Import d'annonces",
+                'verbose_name_plural': "Imports d'annonces",
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -1,7 +1,37 @@
+import uuid
+
 from django.db import models
+from django.db.models.functions import RowNumber
 from django.utils.text import slugify
 from accounts.models import Agency, User
 from locations.models import City
+from .storage import photo_storage
+
+
+class ListingQuerySet(models.QuerySet):
+
+    def with_cover(self):
+        """
+        Précharge la photo de couverture de chaque annonce en une seule requête.
+        Même règle que ListingPhoto.cover_photo : la photo is_cover, sinon la
+        photo de plus petit `order`. Accessible ensuite via `listing.cover`.
+        """
+        return self.prefetch_related(
+            models.Prefetch(
+                "photos",
+                queryset=ListingPhoto.objects.cover_candidates(),
+                to_attr="_cover_photos",
+            )
+        )
+
+    def with_photos(self):
+        """
+        Précharge toutes les photos en une requête : cover_photo() et
+        gallery_photos() sont alors calculés en mémoire.
+        """
+        return self.prefetch_related(
+            models.Prefetch("photos", queryset=ListingPhoto.objects.order_by("order", "pk"))
+        )
 
 
 class Listing(models.Model):
@@ -48,6 +78,24 @@ class Listing(models.Model):
     null=True,
     blank=True
 )
+    # Dénormalisés depuis city (synchronisés à la sauvegarde et par signaux)
+    # pour filtrer par région/district sans la chaîne de jointures city → district → region
+    district = models.ForeignKey(
+        "agencies.District",
+        on_delete=models.SET_NULL,
+        related_name="listings",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    region = models.ForeignKey(
+        "agencies.Region",
+        on_delete=models.SET_NULL,
+        related_name="listings",
+        null=True,
+        blank=True,
+        editable=False,
+    )
     address = models.CharField(max_length=255, blank=True)
     description = models.TextField(blank=True)
     published = models.BooleanField(default=False)
@@ -55,25 +103,77 @@ class Listing(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ListingQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        # Chemins d'accès de la recherche publique (listing_list, region_listings, ListingFilter)
+        indexes = [
+            models.Index(fields=["published", "city", "listing_type", "price"], name="listing_pub_city_type_price"),
+            models.Index(fields=["published", "region", "listing_type", "price"], name="listing_pub_region_type_price"),
+            models.Index(fields=["published", "category", "listing_type", "price"], name="listing_pub_cat_type_price"),
+            models.Index(fields=["published", "featured", "created_at"], name="listing_pub_featured_created"),
+            models.Index(fields=["published", "created_at"], name="listing_pub_created"),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.get_listing_type_display()})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_city_id = instance.__dict__.get("city_id")
+        instance._loaded_published = instance.__dict__.get("published")
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(f"{self.title}-{self.agency.id}")
+        if self.city_id != getattr(self, "_loaded_city_id", None) or (self.city_id and not self.region_id):
+            self.sync_location()
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "district", "region"}
         super().save(*args, **kwargs)
+        self._loaded_city_id = self.city_id
+        self._loaded_published = self.published
 
-    # ✅ Helpers cockpit-ready
     @property
-    def district(self):
-        return self.city.district if self.city else None
+    def was_published(self):
+        """Valeur de `published` au chargement (ou à la dernière sauvegarde)."""
+        return bool(getattr(self, "_loaded_published", False))
+
+    # ✅ Helpers cockpit-ready
+    def sync_location(self):
+        """Recopie district/region depuis la ville (une requête)."""
+        from agencies.models import City
+
+        location = (
+            City.objects.filter(pk=self.city_id).values("district_id", "district__region_id").first()
+            if self.city_id else None
+        )
+        self.district_id = location["district_id"] if location else None
+        self.region_id = location["district__region_id"] if location else None
 
     @property
-    def region(self):
-        return self.city.district.region if self.city else None
+    def cover(self):
+        """Photo de couverture (préchargée si le queryset utilise with_cover() ou with_photos())."""
+        if hasattr(self, "_cover_photos"):
+            return self._cover_photos[0] if self._cover_photos else None
+        if "photos" in getattr(self, "_prefetched_objects_cache", {}):
+            photos = [p for p in self.photos.all() if p.image or p.is_pending]
+            return next((p for p in photos if p.is_cover), photos[0] if photos else None)
+        return ListingPhoto.objects.cover_candidates().filter(listing=self).first()
+
+    def cover_photo(self):
+        """URL de la photo de couverture, ou None."""
+        cover = self.cover
+        return cover.image.url if cover and cover.image else None
+
+    def gallery_photos(self):
+        """Photos (avec image) hors couverture, dans l'ordre de la galerie."""
+        cover = self.cover
+        return [p for p in self.photos.all() if p.image and p != cover]
 
     # ✅ Gestion des droits
     def can_view(self, user: User) -> bool:
@@ -91,20 +191,118 @@ class Listing(models.Model):
         return self.can_view(user)
 
 
+class ListingPhotoQuerySet(models.QuerySet):
+
+    def cover_candidates(self):
+        """Une seule photo (avec image, ou en traitement) par annonce : la couverture, sinon la première."""
+        with_image = models.Q(image__isnull=False) & ~models.Q(image="")
+        in_queue = models.Q(status__in=[ListingPhoto.Status.PENDING, ListingPhoto.Status.PROCESSING])
+        return (
+            # Photo encore en traitement : candidate aussi (affichée en attente)
+            self.filter(with_image | in_queue)
+            .annotate(
+                cover_rank=models.Window(
+                    RowNumber(),
+                    partition_by=models.F("listing_id"),
+                    order_by=[models.F("is_cover").desc(), "order", "pk"],
+                )
+            )
+            .filter(cover_rank=1)
+        )
+
+
 class ListingPhoto(models.Model):
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "En attente de traitement"
+        PROCESSING = "processing", "En cours de traitement"
+        READY = "ready", "Prête"
+        FAILED = "failed", "Échec"
+
     listing = models.ForeignKey(
         Listing, on_delete=models.CASCADE, related_name="photos"
     )
-    image = models.ImageField(upload_to="listings/photos/", blank=True, null=True)
+    # Nom = hash du contenu (listings/storage.py) ; index : compteur de références du fichier
+    image = models.ImageField(upload_to="listings/photos/", storage=photo_storage, blank=True, null=True, db_index=True)
     is_cover = models.BooleanField(default=False)
     order = models.PositiveIntegerField(default=0)
 
+    # Renseignés par listings/images.py à partir de l'original
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    file_size = models.PositiveBigIntegerField(null=True, blank=True, editable=False, help_text="Taille de l'original en octets")
+    # {"source": nom de l'original, "<rendition>": {"width", "height", "webp": {"name", "bytes"}, "jpeg": {...}}}
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
+
+    # File de traitement hors requête (listings/photo_queue.py) : original en attente sur disque local
+    status = models.CharField(max_length=12, choices=Status.choices, default=Status.READY, editable=False)
+    spool_path = models.CharField(max_length=255, blank=True, default="", editable=False)
+    attempts = models.PositiveSmallIntegerField(default=0, editable=False)
+    last_error = models.TextField(blank=True, default="", editable=False)
+    queued_at = models.DateTimeField(null=True, blank=True, editable=False)
+    claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = ListingPhotoQuerySet.as_manager()
+
     class Meta:
         ordering = ["order"]
+        indexes = [
+            models.Index(fields=["status", "queued_at"], name="listing_photo_queue"),
+        ]
 
     def __str__(self):
         return f"Photo {self.id} de {self.listing.title}"
 
+    # 🖼️ Renditions (thumb / card / detail), repli sur l'original tant qu'elles n'existent pas
+    @property
+    def is_pending(self):
+        return self.status in (self.Status.PENDING, self.Status.PROCESSING)
+
+    @property
+    def has_renditions(self):
+        return bool(self.image) and self.renditions.get("source") == self.image.name
+
+    def rendition_url(self, name, fmt="jpeg"):
+        if self.has_renditions and name in self.renditions:
+            return self.image.storage.url(self.renditions[name][fmt]["name"])
+        if self.is_pending:
+            from .images import PLACEHOLDER_URL
+
+            return PLACEHOLDER_URL
+        return self.image.url if self.image else None
+
+    def srcset(self, fmt="jpeg"):
+        """Attribut srcset : chaque rendition avec sa largeur réelle."""
+        if not self.has_renditions:
+            return ""
+        from .images import RENDITIONS
+
+        entries = sorted(
+            (self.renditions[name]["width"], self.image.storage.url(self.renditions[name][fmt]["name"]))
+            for name in RENDITIONS if name in self.renditions
+        )
+        return ", ".join(f"{url} {width}w" for width, url in entries)
+
+    @property
+    def thumb_url(self):
+        return self.rendition_url("thumb")
+
+    @property
+    def card_url(self):
+        return self.rendition_url("card")
+
+    @property
+    def detail_url(self):
+        return self.rendition_url("detail")
+
+    @property
+    def srcset_jpeg(self):
+        return self.srcset("jpeg")
+
+    @property
+    def srcset_webp(self):
+        return self.srcset("webp")
+
     # ✅ Helpers pour galerie
     def cover_photo(self):
         cover = self.listing.photos.filter(is_cover=True).order_by("order").first()
@@ -120,4 +318,88 @@ class ListingPhoto(models.Model):
         cover = self.listing.photos.filter(is_cover=True).first()
         if cover:
             qs = qs.exclude(pk=cover.pk)
-        return qs
\ No newline at end of file
+        return qs
+
+
+class PhotoUpload(models.Model):
+    """
+    Envoi de photo reprenable (API, listings/uploads.py) : les morceaux reçus sont
+    ajoutés à `temp_path` jusqu'à `length` octets, puis la photo est mise en file.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    listing = models.ForeignKey(Listing, on_delete=models.CASCADE, related_name="photo_uploads")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="photo_uploads")
+    filename = models.CharField(max_length=255)
+    length = models.PositiveBigIntegerField(help_text="Taille annoncée en octets")
+    offset = models.PositiveBigIntegerField(default=0, help_text="Octets déjà reçus")
+    is_cover = models.BooleanField(default=False)
+    temp_path = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    # Morceau en cours d'écriture (un seul PATCH à la fois par envoi)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["user", "expires_at"], name="photo_upload_user_expiry"),
+        ]
+
+    def __str__(self):
+        return f"Envoi {self.filename} ({self.offset}/{self.length})"
+
+    @property
+    def is_complete(self):
+        return self.offset == self.length
+
+
+class ListingImport(models.Model):
+    """Import en masse d'annonces depuis un fichier CSV / JSONL (listings/importer.py)."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "En attente"
+        RUNNING = "running", "En cours"
+        DONE = "done", "Terminé"
+        FAILED = "failed", "Échec"
+
+    agency = models.ForeignKey(Agency, on_delete=models.CASCADE, related_name="listing_imports")
+    user = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="listing_imports",
+        help_text="Auteur de l'import, propriétaire des annonces créées",
+    )
+    source = models.FileField(upload_to="listings/imports/", blank=True, help_text="Fichier .csv ou .jsonl")
+    source_name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING, editable=False)
+    total_rows = models.PositiveIntegerField(default=0, editable=False)
+    created_count = models.PositiveIntegerField(default=0, editable=False)
+    error_count = models.PositiveIntegerField(default=0, editable=False)
+    # CSV : ligne, erreurs, données de la ligne
+    error_report = models.FileField(upload_to="listings/imports/errors/", blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Import d'annonces"
+        verbose_name_plural = "Imports d'annonces"
+
+    def __str__(self):
+        return f"Import {self.source_name or self.pk} ({self.get_status_display()})"
+
+
+class ListingViewCount(models.Model):
+    """Compteur de vues d'une annonce par jour (alimenté par lots, cf. listings/view_counter.py)"""
+    listing = models.ForeignKey(
+        Listing, on_delete=models.CASCADE, related_name="view_counts"
+    )
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-day"]
+        constraints = [
+            models.UniqueConstraint(fields=["listing", "day"], name="listing_view_count_unique_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.listing_id} – {self.day} : {self.views} vue(s)"
@@ -1,25 +1,137 @@
-from rest_framework.pagination import PageNumberPagination, LimitOffsetPagination
-from rest_framework.response import Response
+from django.core import signing
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor, CursorPagination, LimitOffsetPagination, PageNumberPagination,
+)
+from rest_framework.utils.urls import replace_query_param
 
-class MixedPagination(PageNumberPagination, LimitOffsetPagination):
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Pagination par curseur (keyset) : ?cursor=<jeton signé>
+    Filtre sur (-created_at, -id) au lieu d'un OFFSET et ne fait aucun COUNT(*),
+    le coût d'une page ne dépend donc pas de sa profondeur dans le flux.
+    """
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+    cursor_salt = "listings.pagination.cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        position = self.cursor.position if self.cursor else None
+
+        # En arrière (lien "previous"), on parcourt l'ordre inverse puis on retourne la page
+        fields = [f.lstrip("-") for f in self.ordering]
+        queryset = queryset.order_by(*(fields if reverse else self.ordering))
+        if position is not None:
+            queryset = queryset.filter(self._keyset_filter(fields, position, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+
+        if reverse:
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        if self.page:
+            self.next_position = self._position(self.page[-1])
+            self.previous_position = self._position(self.page[0])
+        else:
+            self.next_position = self.previous_position = position
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or self.next_position is None:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.next_position))
+
+    def get_previous_link(self):
+        if not self.has_previous or self.previous_position is None:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.previous_position))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            tokens = signing.loads(encoded, salt=self.cursor_salt)
+            position = tokens["p"]
+            if len(position) != len(self.ordering):
+                raise ValueError
+            return Cursor(offset=0, reverse=bool(tokens.get("r")), position=position)
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, cursor):
+        tokens = {"p": cursor.position}
+        if cursor.reverse:
+            tokens["r"] = 1
+        encoded = signing.dumps(tokens, salt=self.cursor_salt, compress=True)
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _position(self, instance):
+        values = []
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip("-"))
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return values
+
+    def _keyset_filter(self, fields, position, reverse):
+        """(a, b) < (x, y)  ==>  a < x OR (a = x AND b < y), pour un ordre descendant."""
+        lookup = "gt" if reverse else "lt"
+        condition = Q()
+        for i, field in enumerate(fields):
+            equal = {f: v for f, v in zip(fields[:i], position[:i])}
+            condition |= Q(**equal, **{f"{field}__{lookup}": position[i]})
+        return condition
+
+
+class MixedPagination(PageNumberPagination, LimitOffsetPagination, KeysetCursorPagination):
     """
     Pagination mixte : accepte soit ?page=2&page_size=10
     soit ?limit=10&offset=20
+    soit ?cursor=&page_size=10 (keyset, sans COUNT, pour le scroll infini mobile)
     """
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
 
     def paginate_queryset(self, queryset, request, view=None):
+        # Si "cursor" est présent (même vide) → KeysetCursorPagination
+        if self.cursor_query_param in request.query_params:
+            self.mode = KeysetCursorPagination
         # Si "limit" ou "offset" sont présents → LimitOffsetPagination
-        if "limit" in request.query_params or "offset" in request.query_params:
-            return LimitOffsetPagination.paginate_queryset(self, queryset, request, view)
+        elif "limit" in request.query_params or "offset" in request.query_params:
+            self.mode = LimitOffsetPagination
         # Sinon → PageNumberPagination
-        return PageNumberPagination.paginate_queryset(self, queryset, request, view)
+        else:
+            self.mode = PageNumberPagination
+        return self.mode.paginate_queryset(self, queryset, request, view)
+
+    # Chaque mode garde ses propres liens : on redirige explicitement vers la bonne classe
+    def get_next_link(self):
+        return self.mode.get_next_link(self)
+
+    def get_previous_link(self):
+        return self.mode.get_previous_link(self)
+
+    def get_html_context(self):
+        return self.mode.get_html_context(self)
 
     def get_paginated_response(self, data):
-        if hasattr(self, "limit") and self.limit is not None:
-            # Mode limit/offset
-            return LimitOffsetPagination.get_paginated_response(self, data)
-        # Mode page/page_size
-        return PageNumberPagination.get_paginated_response(self, data)
\ No newline at end of file
+        return self.mode.get_paginated_response(self, data)
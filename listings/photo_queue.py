@@ -0,0 +1,160 @@
+# listings/photo_queue.py
+"""
+Traitement des photos hors requête.
+
+La vue écrit chaque fichier reçu dans un dossier local (LISTING_PHOTO_SPOOL_DIR)
+et insère une ligne ListingPhoto « pending » (un seul INSERT pour toutes les
+photos). Le worker `process_photo_uploads` réserve des lots de photos en attente,
+fait décoder / réduire / encoder les images par un ProcessPoolExecutor, puis,
+dans son propre processus, enregistre l'original et les renditions dans le
+stockage et passe la photo à « ready ». En attendant, les pages affichent un
+emplacement réservé (ListingPhoto.rendition_url).
+"""
+import logging
+import os
+import shutil
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from .images import photo_source, render_renditions, store_renditions
+from .models import ListingPhoto
+
+logger = logging.getLogger(__name__)
+
+Status = ListingPhoto.Status
+
+
+def spool_dir():
+    path = Path(getattr(settings, "LISTING_PHOTO_SPOOL_DIR", settings.BASE_DIR / "spool" / "photos"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def spool_upload(uploaded_file):
+    """Écrit un fichier reçu dans le dossier d'attente ; retourne son chemin."""
+    suffix = Path(uploaded_file.name).suffix.lower()[:10]
+    path = spool_dir() / f"{uuid.uuid4().hex}{suffix}"
+    if hasattr(uploaded_file, "temporary_file_path"):
+        # Gros fichier déjà sur disque (TemporaryUploadedFile) : simple déplacement
+        shutil.move(uploaded_file.temporary_file_path(), path)
+    else:
+        with open(path, "wb") as destination:
+            for chunk in uploaded_file.chunks():
+                destination.write(chunk)
+    return str(path)
+
+
+def enqueue_spooled(listing, spool_paths, first_is_cover=True):
+    """Met en file des fichiers déjà dans le dossier d'attente (une seule INSERT)."""
+    now = timezone.now()
+    start = (listing.photos.order_by("-order").values_list("order", flat=True).first() or -1) + 1
+    photos = [
+        ListingPhoto(
+            listing=listing,
+            is_cover=first_is_cover and i == 0,
+            order=start + i,
+            status=Status.PENDING,
+            spool_path=str(path),
+            queued_at=now,
+        )
+        for i, path in enumerate(spool_paths)
+    ]
+    return ListingPhoto.objects.bulk_create(photos)
+
+
+def enqueue_uploads(listing, uploaded_files, first_is_cover=True):
+    """Met en file les fichiers reçus pour `listing`."""
+    return enqueue_spooled(listing, [spool_upload(uploaded_file) for uploaded_file in uploaded_files], first_is_cover)
+
+
+def claim_batch(limit):
+    """
+    Réserve jusqu'à `limit` photos en attente (ou dont la réservation a expiré :
+    worker arrêté en cours de traitement). Plusieurs workers peuvent tourner.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=getattr(settings, "LISTING_PHOTO_CLAIM_TIMEOUT", 600))
+    with transaction.atomic():
+        photos = list(
+            ListingPhoto.objects.select_for_update(skip_locked=True)
+            .filter(Q(status=Status.PENDING) | Q(status=Status.PROCESSING, claimed_at__lt=stale))
+            .order_by("queued_at", "pk")[:limit]
+        )
+        for photo in photos:
+            photo.status = Status.PROCESSING
+            photo.claimed_at = now
+            photo.attempts += 1
+        ListingPhoto.objects.bulk_update(photos, ["status", "claimed_at", "attempts"])
+    return photos
+
+
+def _source(photo):
+    return photo.spool_path if photo.spool_path else photo_source(photo)
+
+
+def _finish(photo, rendered):
+    if photo.spool_path:
+        with open(photo.spool_path, "rb") as handle:
+            name = photo.image.field.generate_filename(photo, Path(photo.spool_path).name)
+            photo.image.name = photo.image.storage.save(name, File(handle))
+    spooled = photo.spool_path
+    store_renditions(photo, rendered)
+    if spooled:
+        os.remove(spooled)
+
+
+def _fail(photo, exc):
+    max_attempts = getattr(settings, "LISTING_PHOTO_MAX_ATTEMPTS", 3)
+    photo.last_error = repr(exc)
+    photo.status = Status.FAILED if photo.attempts >= max_attempts else Status.PENDING
+    photo.claimed_at = None
+    spooled = photo.spool_path if photo.status == Status.FAILED else ""
+    if spooled:
+        # Échec définitif : plus personne ne lira le fichier en attente
+        photo.spool_path = ""
+    photo.save(update_fields=["status", "last_error", "claimed_at", "spool_path"])
+    if spooled and os.path.exists(spooled):
+        os.remove(spooled)
+    logger.warning("Photo %s : traitement impossible (%s)", photo.pk, exc)
+
+
+def process_batch(pool, batch_size=20):
+    """
+    Traite un lot : décodage / encodage dans `pool`, écritures ici.
+    Retourne (photos prêtes, photos en échec).
+    """
+    photos = claim_batch(batch_size)
+    futures = []
+    for photo in photos:
+        try:
+            futures.append((photo, pool.submit(render_renditions, _source(photo))))
+        except Exception as exc:
+            _fail(photo, exc)
+    ready = 0
+    for photo, future in futures:
+        try:
+            _finish(photo, future.result())
+        except Exception as exc:
+            _fail(photo, exc)
+        else:
+            ready += 1
+    return ready, len(photos) - ready
+
+
+def queue_stats():
+    """Profondeur de la file et âge de la plus ancienne photo en attente."""
+    waiting = ListingPhoto.objects.filter(status__in=[Status.PENDING, Status.PROCESSING])
+    oldest = waiting.aggregate(oldest=Min("queued_at"))["oldest"]
+    return {
+        "pending": waiting.filter(status=Status.PENDING).count(),
+        "processing": waiting.filter(status=Status.PROCESSING).count(),
+        "failed": ListingPhoto.objects.filter(status=Status.FAILED).count(),
+        "oldest_seconds": (timezone.now() - oldest).total_seconds() if oldest else 0,
+    }
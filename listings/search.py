@@ -0,0 +1,249 @@
+# listings/search.py
+"""
+Recherche plein texte des annonces.
+
+Index inversé SQLite FTS5 sur disque (settings.LISTING_SEARCH_INDEX), indépendant
+de la base principale : titre, description, adresse, ville, district, région.
+Les textes sont normalisés avant indexation (minuscules, accents retirés, mots
+vides, racinisation légère du français) et le classement utilise bm25().
+Les critères structurés (ville, région, catégorie, type, prix) sont stockés en
+colonnes non indexées pour filtrer dans la même requête que le classement.
+Synchronisé par signaux (listings/signals.py), reconstruit par `rebuild_search_index`.
+"""
+import re
+import sqlite3
+import threading
+import unicodedata
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Case, IntegerField, When
+
+TABLE = "listing_fts"
+
+# Poids bm25 par colonne (ordre de CREATE VIRTUAL TABLE ; 0 pour les colonnes non indexées)
+COLUMNS = ("title", "body", "location", "published", "city_id", "region_id", "category", "listing_type", "price")
+WEIGHTS = (10.0, 1.0, 4.0, 0, 0, 0, 0, 0, 0)
+
+STOPWORDS = frozenset("""
+    a au aux avec ce ces dans de des du elle en et eux il je la le les leur lui ma mais me meme mes moi mon
+    ne nos notre nous on ou par pas pour qu que qui sa se ses son sur ta te tes toi ton tu un une vos votre
+    vous c d j l m n s t y est sont ete tres plus
+""".split())
+
+# Suffixes retirés par la racinisation (du plus long au plus court)
+SUFFIXES = (
+    "issements", "issement", "atrices", "ateurs", "ations", "ements", "atrice", "ateur", "ation", "ement",
+    "ances", "ences", "ables", "ibles", "istes", "ismes", "euses", "ance", "ence", "able", "ible", "iste",
+    "isme", "euse", "eaux", "ites", "ives", "eux", "ite", "ive", "ifs",
+)
+
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def strip_accents(text):
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+def stem(word):
+    """Racinisation légère du français : pluriels et suffixes dérivationnels courants."""
+    if len(word) <= 3 or word.isdigit():
+        return word
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    if word[-1] in "sx" and len(word) > 4:
+        word = word[:-1]
+    # Féminin (meublée → meuble → meubl)
+    while word.endswith("e") and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Texte → racines (minuscules, sans accents ni mots vides)."""
+    words = WORD.findall(strip_accents((text or "").lower()))
+    return [stem(word) for word in words if word not in STOPWORDS]
+
+
+def build_match(query):
+    """Requête utilisateur → expression MATCH FTS5 (tous les termes, préfixe sur le dernier)."""
+    terms = tokenize(query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def listing_document(listing):
+    """Ligne d'index d'une annonce (city / district / region préchargés de préférence)."""
+    location = [listing.address]
+    for related in (listing.city, listing.district, listing.region):
+        if related is not None:
+            location.append(related.name)
+    return (
+        listing.pk,
+        " ".join(tokenize(listing.title)),
+        " ".join(tokenize(listing.description)),
+        " ".join(tokenize(" ".join(location))),
+        int(listing.published),
+        listing.city_id,
+        listing.region_id,
+        listing.category,
+        listing.listing_type,
+        float(listing.price),
+    )
+
+
+class ListingSearchIndex:
+    """Accès à un fichier d'index FTS5 (une connexion par thread, mode WAL)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.create_schema(connection)
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def create_schema(connection):
+        columns = ", ".join(
+            name if name in ("title", "body", "location") else f"{name} UNINDEXED" for name in COLUMNS
+        )
+        connection.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+            f"{columns}, tokenize='unicode61 remove_diacritics 2')"
+        )
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    # === Écriture ===
+    def _insert(self, connection, rows):
+        connection.executemany(
+            f"INSERT INTO {TABLE} (rowid, {', '.join(COLUMNS)}) VALUES ({', '.join('?' * (len(COLUMNS) + 1))})",
+            rows,
+        )
+
+    def index(self, listings):
+        """(Ré)indexe des annonces ; retourne le nombre de lignes écrites."""
+        rows = [listing_document(listing) for listing in listings]
+        if not rows:
+            return 0
+        connection = self.connection
+        connection.execute("BEGIN")
+        try:
+            connection.executemany(f"DELETE FROM {TABLE} WHERE rowid = ?", [(row[0],) for row in rows])
+            self._insert(connection, rows)
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return len(rows)
+
+    def rebuild(self, batches):
+        """
+        Remplace tout le contenu par les lots d'annonces `batches`, en une transaction :
+        les lecteurs (WAL) voient l'ancien index jusqu'au COMMIT.
+        """
+        connection = self.connection
+        total = 0
+        connection.execute("BEGIN")
+        try:
+            connection.execute(f"DELETE FROM {TABLE}")
+            for listings in batches:
+                rows = [listing_document(listing) for listing in listings]
+                self._insert(connection, rows)
+                total += len(rows)
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        self.optimize()
+        return total
+
+    def remove(self, listing_ids):
+        self.connection.executemany(f"DELETE FROM {TABLE} WHERE rowid = ?", [(pk,) for pk in listing_ids])
+
+    def optimize(self):
+        self.connection.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('optimize')")
+
+    # === Lecture ===
+    def _where(self, match, filters):
+        clauses, params = [f"{TABLE} MATCH ?"], [match]
+        for column, cast in (("published", int), ("city_id", int), ("region_id", int),
+                             ("category", str), ("listing_type", str)):
+            value = filters.get(column)
+            if value not in (None, ""):
+                clauses.append(f"{column} = ?")
+                params.append(cast(value))
+        if filters.get("min_price") not in (None, ""):
+            clauses.append("price >= ?")
+            params.append(float(filters["min_price"]))
+        if filters.get("max_price") not in (None, ""):
+            clauses.append("price <= ?")
+            params.append(float(filters["max_price"]))
+        return " AND ".join(clauses), params
+
+    def search(self, query, limit=100, offset=0, **filters):
+        """[(listing_id, score)] classés par pertinence bm25 (score décroissant)."""
+        match = build_match(query)
+        if match is None:
+            return []
+        where, params = self._where(match, filters)
+        weights = ", ".join(str(weight) for weight in WEIGHTS)
+        rows = self.connection.execute(
+            f"SELECT rowid, bm25({TABLE}, {weights}) AS rank FROM {TABLE} WHERE {where} "
+            f"ORDER BY rank LIMIT ? OFFSET ?",
+            [*params, limit, offset],
+        ).fetchall()
+        # bm25() est négatif (plus petit = meilleur) : on renvoie un score positif
+        return [(listing_id, -rank) for listing_id, rank in rows]
+
+    def count(self, query, **filters):
+        match = build_match(query)
+        if match is None:
+            return 0
+        where, params = self._where(match, filters)
+        return self.connection.execute(f"SELECT count(*) FROM {TABLE} WHERE {where}", params).fetchone()[0]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index():
+    global _index
+    path = Path(getattr(settings, "LISTING_SEARCH_INDEX", settings.BASE_DIR / "search_index" / "listings.sqlite3"))
+    if _index is None or _index.path != path:
+        with _index_lock:
+            if _index is None or _index.path != path:
+                _index = ListingSearchIndex(path)
+    return _index
+
+
+def search_listings(queryset, query, limit=None, **filters):
+    """
+    Restreint `queryset` aux annonces correspondant à `query`, triées par pertinence.
+    Les `filters` (published, city_id, region_id, category, listing_type, min_price,
+    max_price) sont appliqués dans l'index, avant la coupe à `limit` résultats.
+    """
+    limit = limit or getattr(settings, "LISTING_SEARCH_MAX_RESULTS", 1000)
+    ids = [listing_id for listing_id, _ in get_search_index().search(query, limit=limit, **filters)]
+    if not ids:
+        return queryset.none()
+    rank = Case(*(When(pk=pk, then=position) for position, pk in enumerate(ids)), output_field=IntegerField())
+    return queryset.filter(pk__in=ids).order_by(rank)
@@ -1,5 +1,48 @@
 from rest_framework import serializers
-from .models import Listing
+from .images import FORMATS, RENDITIONS
+from .models import Listing, ListingPhoto, PhotoUpload
+
+
+class ListingPhotoSerializer(serializers.ModelSerializer):
+    """
+    Photo avec ses renditions : `url` = rendition « card » (repli sur l'original),
+    `srcset` par format pour laisser le client choisir la taille.
+    """
+    url = serializers.CharField(source="card_url", read_only=True)
+    original = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
+    renditions = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ListingPhoto
+        fields = ["id", "url", "status", "original", "width", "height", "file_size", "is_cover", "srcset", "renditions"]
+
+    def get_original(self, obj):
+        return obj.image.url if obj.image else None
+
+    def get_srcset(self, obj):
+        return {fmt: obj.srcset(fmt) for fmt in FORMATS} if obj.has_renditions else {}
+
+    def get_renditions(self, obj):
+        if not obj.has_renditions:
+            return {}
+        return {
+            name: {
+                "width": obj.renditions[name]["width"],
+                "height": obj.renditions[name]["height"],
+                **{fmt: obj.rendition_url(name, fmt) for fmt in FORMATS},
+            }
+            for name in RENDITIONS if name in obj.renditions
+        }
+
+
+class PhotoUploadSerializer(serializers.ModelSerializer):
+    """Envoi reprenable en cours (listings/uploads.py)."""
+
+    class Meta:
+        model = PhotoUpload
+        fields = ["id", "filename", "length", "offset", "is_cover", "expires_at"]
+        read_only_fields = fields
 
 
 class ListingWriteSerializer(serializers.ModelSerializer):
@@ -7,6 +50,8 @@ class ListingWriteSerializer(serializers.ModelSerializer):
     Serializer utilisé pour la création et la mise à jour des annonces.
     On limite aux champs éditables par l’utilisateur.
     """
+    district = serializers.StringRelatedField(read_only=True)
+
     class Meta:
         model = Listing
         fields = [
@@ -19,10 +64,15 @@ class ListingWriteSerializer(serializers.ModelSerializer):
 class ListingReadSerializer(serializers.ModelSerializer):
     """
     Serializer utilisé pour la lecture (API GET).
-    Inclut les helpers cover_photo() et gallery_photos().
+    Inclut les helpers cover_photo() et gallery_photos() de Listing,
+    calculés en mémoire quand le queryset utilise with_photos().
+    cover_image / gallery_images : mêmes photos avec renditions et srcset.
     """
+    district = serializers.StringRelatedField(read_only=True)
     cover_photo = serializers.SerializerMethodField()
     gallery_photos = serializers.SerializerMethodField()
+    cover_image = serializers.SerializerMethodField()
+    gallery_images = serializers.SerializerMethodField()
 
     class Meta:
         model = Listing
@@ -31,14 +81,21 @@ class ListingReadSerializer(serializers.ModelSerializer):
             "city", "category", "listing_type",
             "surface", "bedrooms", "bathrooms",
             "address", "district", "description", "published",
-            "cover_photo", "gallery_photos",
+            "cover_photo", "gallery_photos", "cover_image", "gallery_images",
         ]
 
     def get_cover_photo(self, obj):
         return obj.cover_photo()
 
     def get_gallery_photos(self, obj):
-        return [p.image.url for p in obj.gallery_photos() if p.image]
+        return [p.image.url for p in obj.gallery_photos()]
+
+    def get_cover_image(self, obj):
+        cover = obj.cover
+        return ListingPhotoSerializer(cover).data if cover else None
+
+    def get_gallery_images(self, obj):
+        return ListingPhotoSerializer(obj.gallery_photos(), many=True).data
 
 
 # ✅ Alias pour compatibilité avec les imports existants
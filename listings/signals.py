@@ -0,0 +1,89 @@
+import os
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from agencies.models import City, District, Region
+from .models import Listing, ListingPhoto
+
+
+@receiver(post_save, sender=City)
+def sync_listings_on_city_move(sender, instance, created, **kwargs):
+    """
+    Une ville déplacée vers un autre district : recopier district/region
+    sur ses annonces (une seule requête UPDATE).
+    """
+    if created:
+        return
+    region_id = District.objects.filter(pk=instance.district_id).values_list("region_id", flat=True).first()
+    Listing.objects.filter(city=instance).exclude(
+        district_id=instance.district_id, region_id=region_id
+    ).update(district_id=instance.district_id, region_id=region_id)
+
+
+@receiver(post_save, sender=District)
+def sync_listings_on_district_move(sender, instance, created, **kwargs):
+    """Un district rattaché à une autre région : mettre à jour region sur ses annonces."""
+    if created:
+        return
+    Listing.objects.filter(district=instance).exclude(
+        region_id=instance.region_id
+    ).update(region_id=instance.region_id)
+
+
+# === Index de recherche plein texte (listings/search.py) ===
+def _reindex_listings(queryset):
+    from .search import get_search_index
+
+    listings = queryset.select_related("city", "district", "region")
+    transaction.on_commit(lambda: get_search_index().index(listings), robust=True)
+
+
+@receiver(post_save, sender=Listing)
+def index_listing(sender, instance, **kwargs):
+    _reindex_listings(Listing.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Listing)
+def unindex_listing(sender, instance, **kwargs):
+    from .search import get_search_index
+
+    listing_id = instance.pk
+    transaction.on_commit(lambda: get_search_index().remove([listing_id]), robust=True)
+
+
+@receiver(post_save, sender=City)
+@receiver(post_save, sender=District)
+@receiver(post_save, sender=Region)
+def reindex_listings_on_location_change(sender, instance, created, **kwargs):
+    """Nom ou rattachement d'une ville / d'un district / d'une région modifié."""
+    if created:
+        return
+    lookup = {City: "city", District: "district", Region: "region"}[sender]
+    _reindex_listings(Listing.objects.filter(**{lookup: instance}))
+
+
+# === Renditions des photos (listings/images.py, listings/photo_queue.py) ===
+@receiver(post_save, sender=ListingPhoto)
+def queue_photo_renditions(sender, instance, **kwargs):
+    """Nouvelle image (ou image remplacée) : mise en file pour le worker process_photo_uploads."""
+    if instance.image and not instance.has_renditions and instance.status == ListingPhoto.Status.READY:
+        instance.status, instance.queued_at = ListingPhoto.Status.PENDING, timezone.now()
+        ListingPhoto.objects.filter(pk=instance.pk).update(status=instance.status, queued_at=instance.queued_at)
+
+
+@receiver(post_delete, sender=ListingPhoto)
+def delete_photo_files(sender, instance, **kwargs):
+    """Photo (ou annonce) supprimée : original et renditions effacés s'ils ne sont plus référencés."""
+    from .storage import release_photo_files
+
+    image_name, renditions, spool_path = instance.image.name, instance.renditions, instance.spool_path
+    storage = ListingPhoto._meta.get_field("image").storage
+
+    def cleanup():
+        release_photo_files(storage, image_name, renditions)
+        if spool_path and os.path.exists(spool_path):
+            os.remove(spool_path)
+    transaction.on_commit(cleanup, robust=True)
@@ -0,0 +1,128 @@
+# listings/storage.py
+"""
+Stockage des photos d'annonces adressé par contenu.
+
+Chaque fichier est nommé par le SHA-256 de ses octets
+(listings/photos/ab/ab12…ef.jpg), calculé en recopiant le flux reçu par blocs
+dans un fichier temporaire : rien n'est chargé entièrement en mémoire. Des
+octets identiques (même photo envoyée pour plusieurs annonces, ou renvoyée à
+chaque modification) correspondent à un seul fichier.
+
+Le hash d'une rendition inclut le nom de son original (`derived_from`) : deux
+originaux différents aux pixels identiques (EXIF modifié...) ne partagent
+jamais une rendition. Les renditions d'un fichier ne sont donc utilisées que
+par les photos de cet original.
+
+Le compteur de références d'un fichier est le nombre de ListingPhoto dont
+`image` vaut ce nom (colonne indexée) : à la suppression d'une photo ou d'une
+annonce, l'original et ses renditions ne sont effacés que si plus aucune
+photo ne les utilise (listings/signals.py). `cleanup_photo_files` balaie les
+fichiers restés orphelins.
+
+Un nom ne désigne jamais qu'un seul contenu : ces fichiers peuvent être servis
+avec un cache « immutable » d'un an (IMMUTABLE_CACHE_CONTROL).
+"""
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, storages
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+HASHED_NAME = re.compile(r"(^|/)[0-9a-f]{2}/[0-9a-f]{64}(\.[a-z0-9]+)?$")
+
+INCOMING_DIR = ".incoming"
+
+
+def is_content_addressed(name):
+    return bool(HASHED_NAME.search(name))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage dont les noms de fichiers sont le hash de leur contenu (précédé,
+    pour un fichier dérivé, du nom de son original : attribut `derived_from` du fichier).
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Le nom définitif est choisi par _save à partir du contenu : jamais de suffixe « _abc123 »
+        return name
+
+    def _save(self, name, content):
+        incoming = self.path(INCOMING_DIR)
+        os.makedirs(incoming, exist_ok=True)
+        digest = hashlib.sha256()
+        derived_from = getattr(content, "derived_from", "")
+        if derived_from:
+            digest.update(derived_from.encode() + b"\0")
+        with tempfile.NamedTemporaryFile(dir=incoming, delete=False) as temporary:
+            for chunk in content.chunks():
+                digest.update(chunk)
+                temporary.write(chunk)
+
+        directory, filename = posixpath.split(name)
+        extension = posixpath.splitext(filename)[1].lower()[:10]
+        hexdigest = digest.hexdigest()
+        name = posixpath.join(directory, hexdigest[:2], f"{hexdigest}{extension}")
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            # Contenu déjà stocké : on garde l'existant, rafraîchi pour le délai de grâce des orphelins
+            os.remove(temporary.name)
+            os.utime(full_path)
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            os.replace(temporary.name, full_path)
+            if self.file_permissions_mode is not None:
+                os.chmod(full_path, self.file_permissions_mode)
+        return name
+
+
+def photo_storage():
+    """Stockage de ListingPhoto.image (alias "listing_photos" de settings.STORAGES)."""
+    return storages["listing_photos"]
+
+
+# === Références et fichiers orphelins ===
+def photo_refcount(name, exclude_pk=None):
+    """Nombre de photos dont l'original est le fichier `name`."""
+    from .models import ListingPhoto
+
+    photos = ListingPhoto.objects.filter(image=name)
+    if exclude_pk is not None:
+        photos = photos.exclude(pk=exclude_pk)
+    return photos.count()
+
+
+def _recently_written(storage, name):
+    grace = getattr(settings, "LISTING_PHOTO_ORPHAN_GRACE", 600)
+    try:
+        return time.time() - os.path.getmtime(storage.path(name)) < grace
+    except (NotImplementedError, OSError):
+        return False
+
+
+def release_photo_files(storage, image_name, renditions, keep=()):
+    """
+    Efface l'original `image_name` et les renditions `renditions` (hors noms de `keep`)
+    si plus aucune photo n'utilise cet original. Un fichier écrit il y a moins de
+    LISTING_PHOTO_ORPHAN_GRACE secondes est laissé à `cleanup_photo_files` : le même
+    contenu peut être en cours d'enregistrement pour une autre photo.
+    Retourne le nombre de fichiers effacés.
+    """
+    from .images import rendition_names
+
+    source = (renditions or {}).get("source") or image_name
+    names = [image_name] if image_name else []
+    names += [name for name in rendition_names(renditions or {}) if name not in keep]
+    if not names or any(photo_refcount(name) for name in {source, image_name} if name):
+        return 0
+    if image_name and _recently_written(storage, image_name):
+        return 0
+    for name in names:
+        storage.delete(name)
+    return len(names)
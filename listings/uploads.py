@@ -0,0 +1,216 @@
+# listings/uploads.py
+"""
+Envoi de photos reprenable pour l'API (protocole inspiré de tus) :
+
+1. POST   /api/listings/<id>/uploads/                  {filename, length} → 201, Upload-Offset: 0
+2. PATCH  /api/listings/<id>/uploads/<uuid>/           corps brut (application/offset+octet-stream),
+                                                        en-tête Upload-Offset = octets déjà reçus
+   HEAD                                                 → Upload-Offset, pour reprendre après une coupure
+3. POST   /api/listings/<id>/uploads/<uuid>/finalize/  → ListingPhoto mise en file (listings/photo_queue.py)
+   DELETE /api/listings/<id>/uploads/<uuid>/           → abandon
+
+Chaque morceau est recopié par blocs dans un fichier temporaire
+(LISTING_UPLOAD_DIR), sans passer en mémoire ; les octets reçus avant une
+coupure sont conservés. Un utilisateur a au plus LISTING_UPLOAD_MAX_ACTIVE envois
+en cours ; un envoi sans activité pendant LISTING_UPLOAD_EXPIRY secondes expire
+(fichiers supprimés par `purge_photo_uploads`).
+"""
+import os
+import shutil
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from PIL import Image
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.http import UnreadablePostError
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound, Throttled, ValidationError
+
+from .models import PhotoUpload
+from .photo_queue import enqueue_spooled, spool_dir
+
+CHUNK_SIZE = 64 * 1024
+
+ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+
+# Un PATCH interrompu sans fermeture propre libère l'envoi après ce délai (secondes)
+LOCK_TIMEOUT = 600
+
+
+class UploadConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Décalage incorrect ou envoi déjà en cours : reprendre à partir de Upload-Offset."
+    default_code = "upload_conflict"
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Le fichier dépasse la taille autorisée."
+    default_code = "upload_too_large"
+
+
+def upload_dir():
+    path = Path(getattr(settings, "LISTING_UPLOAD_DIR", settings.BASE_DIR / "spool" / "uploads"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _expires_at():
+    return timezone.now() + timedelta(seconds=getattr(settings, "LISTING_UPLOAD_EXPIRY", 24 * 3600))
+
+
+def active_uploads(user):
+    return PhotoUpload.objects.filter(user=user, expires_at__gt=timezone.now())
+
+
+def create_upload(listing, user, filename, length, is_cover=None):
+    """Ouvre un envoi de `length` octets (fichier temporaire vide)."""
+    try:
+        length = int(length)
+    except (TypeError, ValueError):
+        raise ValidationError({"length": "Taille du fichier (octets) requise."})
+    if length <= 0:
+        raise ValidationError({"length": "Taille du fichier (octets) requise."})
+    if length > getattr(settings, "LISTING_UPLOAD_MAX_BYTES", 20 * 1024 * 1024):
+        raise UploadTooLarge()
+    extension = Path(filename or "").suffix.lower()
+    if extension not in ALLOWED_EXTENSIONS:
+        raise ValidationError({"filename": f"Extensions acceptées : {', '.join(sorted(ALLOWED_EXTENSIONS))}."})
+
+    max_active = getattr(settings, "LISTING_UPLOAD_MAX_ACTIVE", 3)
+    with transaction.atomic():
+        # Verrou sur la ligne de l'utilisateur : des POST parallèles comptent l'un après l'autre
+        get_user_model().objects.select_for_update().get(pk=user.pk)
+        if active_uploads(user).count() >= max_active:
+            raise Throttled(detail=f"{max_active} envois de photos déjà en cours : terminez-les ou annulez-les.")
+
+        path = upload_dir() / f"{uuid.uuid4().hex}{extension}"
+        path.touch()
+        if is_cover is None:
+            is_cover = not listing.photos.exists()
+        return PhotoUpload.objects.create(
+            listing=listing,
+            user=user,
+            filename=Path(filename).name[:255],
+            length=length,
+            is_cover=is_cover,
+            temp_path=str(path),
+            expires_at=_expires_at(),
+        )
+
+
+def _lock(upload, **conditions):
+    """Réserve l'envoi pour un seul PATCH / finalize à la fois (UPDATE conditionnelle)."""
+    now = timezone.now()
+    stale = now - timedelta(seconds=LOCK_TIMEOUT)
+    locked = (
+        PhotoUpload.objects.filter(pk=upload.pk, expires_at__gt=now, **conditions)
+        .filter(Q(locked_at__isnull=True) | Q(locked_at__lt=stale))
+        .update(locked_at=now)
+    )
+    if not locked:
+        raise UploadConflict()
+
+
+def append_chunk(upload, offset, stream):
+    """
+    Écrit le corps `stream` à partir de `offset` (doit valoir upload.offset).
+    Retourne le nouveau décalage ; une coupure en cours de corps garde les octets reçus.
+    """
+    if offset != upload.offset:
+        raise UploadConflict()
+    _lock(upload, offset=offset)
+
+    remaining = upload.length - offset
+    written, too_large, gone = 0, False, False
+    try:
+        with open(upload.temp_path, "r+b") as destination:
+            destination.seek(offset)
+            while stream is not None:
+                try:
+                    chunk = stream.read(CHUNK_SIZE)
+                except (UnreadablePostError, OSError):
+                    break  # client déconnecté : on garde ce qui est arrivé
+                if not chunk:
+                    break
+                if written + len(chunk) > remaining:
+                    too_large = True
+                    break
+                destination.write(chunk)
+                written += len(chunk)
+            if too_large:
+                written = 0
+            # Restes d'un PATCH précédent interrompu au-delà du décalage enregistré
+            destination.truncate(offset + written)
+    except FileNotFoundError:
+        gone = True  # fichier supprimé par un DELETE concurrent
+    finally:
+        upload.offset = offset + written
+        upload.expires_at = _expires_at()
+        upload.locked_at = None
+        # UPDATE filtrée : l'envoi a pu être annulé (DELETE) pendant la réception du corps
+        updated = PhotoUpload.objects.filter(pk=upload.pk).update(
+            offset=upload.offset, expires_at=upload.expires_at, locked_at=None
+        )
+    if gone or not updated:
+        raise NotFound("Envoi annulé pendant la réception du morceau.")
+    if too_large:
+        raise UploadTooLarge(detail=f"Le morceau dépasse la taille annoncée ({upload.length} octets).")
+    return upload.offset
+
+
+def abort_upload(upload):
+    PhotoUpload.objects.filter(pk=upload.pk).delete()
+    if os.path.exists(upload.temp_path):
+        os.remove(upload.temp_path)
+
+
+def finalize_upload(upload):
+    """Envoi complet → ListingPhoto en attente de traitement (le fichier rejoint le dossier d'attente)."""
+    if not upload.is_complete:
+        raise UploadConflict(detail=f"Envoi incomplet : {upload.offset}/{upload.length} octets reçus.")
+    _lock(upload, offset=upload.length)
+    try:
+        with Image.open(upload.temp_path) as image:
+            image.verify()
+    except Exception:
+        abort_upload(upload)
+        raise ValidationError({"file": "Le fichier envoyé n'est pas une image valide."})
+
+    spooled = spool_dir() / Path(upload.temp_path).name
+    shutil.move(upload.temp_path, spooled)
+    os.utime(spooled)  # récent : pas balayé par cleanup_photo_files avant l'INSERT de sa photo
+    try:
+        with transaction.atomic():
+            PhotoUpload.objects.filter(pk=upload.pk).delete()
+            photo, = enqueue_spooled(upload.listing, [spooled], first_is_cover=upload.is_cover)
+    except Exception:
+        shutil.move(spooled, upload.temp_path)
+        PhotoUpload.objects.filter(pk=upload.pk).update(locked_at=None)
+        raise
+    return photo
+
+
+def purge_expired_uploads():
+    """Supprime les envois expirés et les fichiers temporaires sans envoi ; retourne (envois, fichiers)."""
+    expired = list(PhotoUpload.objects.filter(expires_at__lte=timezone.now()).values_list("pk", "temp_path"))
+    for _, path in expired:
+        if os.path.exists(path):
+            os.remove(path)
+    PhotoUpload.objects.filter(pk__in=[pk for pk, _ in expired]).delete()
+
+    # Fichiers orphelins (envoi supprimé avant son fichier) plus vieux que le délai d'expiration
+    known = set(PhotoUpload.objects.values_list("temp_path", flat=True))
+    cutoff = time.time() - getattr(settings, "LISTING_UPLOAD_EXPIRY", 24 * 3600)
+    strays = 0
+    for path in upload_dir().iterdir():
+        if path.is_file() and str(path) not in known and path.stat().st_mtime < cutoff:
+            path.unlink()
+            strays += 1
+    return len(expired), strays
@@ -0,0 +1,124 @@
+# listings/view_counter.py
+import re
+import threading
+from collections import Counter
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Q, Sum, Value, When
+from django.utils import timezone
+
+from accounts.models import UserActivity
+from core.buffered import BufferedFlusher, process_flusher
+from .models import ListingViewCount
+
+BOT_USER_AGENT = re.compile(
+    r"bot|crawl|spider|slurp|archiver|facebookexternalhit|bingpreview|headless|lighthouse"
+    r"|python-requests|python-urllib|curl|wget|httpclient|java/|go-http|monitor|preview",
+    re.IGNORECASE,
+)
+
+
+def is_bot(request):
+    """Robot ou client sans user agent : la vue n'est pas comptée."""
+    user_agent = request.META.get("HTTP_USER_AGENT", "")
+    return not user_agent or bool(BOT_USER_AGENT.search(user_agent))
+
+
+def flush_view_counts(counts, batch_size=500):
+    """
+    Ajoute {(listing_id, jour): vues} aux compteurs journaliers.
+    Par lot : un INSERT IGNORE des lignes manquantes puis UN seul
+    UPDATE ... SET views = views + CASE WHEN ... END.
+    """
+    items = list(counts.items())
+    for start in range(0, len(items), batch_size):
+        chunk = items[start:start + batch_size]
+        with transaction.atomic():
+            ListingViewCount.objects.bulk_create(
+                [ListingViewCount(listing_id=listing_id, day=day) for (listing_id, day), _ in chunk],
+                ignore_conflicts=True,
+            )
+            ListingViewCount.objects.filter(
+                reduce(or_, (Q(listing_id=listing_id, day=day) for (listing_id, day), _ in chunk))
+            ).update(views=F("views") + Case(
+                *(When(listing_id=listing_id, day=day, then=Value(views)) for (listing_id, day), views in chunk),
+                default=Value(0),
+                output_field=PositiveIntegerField(),
+            ))
+
+
+class ViewCounter(BufferedFlusher):
+    """
+    Agrège les vues en mémoire par (annonce, jour) et les écrit par lots : quand
+    `flush_threshold` couples sont en attente, toutes les `flush_interval`
+    secondes et à l'arrêt du processus (core.buffered.BufferedFlusher).
+    Sans `flush_interval`, seul le seuil déclenche l'écriture (tests).
+    """
+
+    thread_name = "listing-view-counter"
+
+    def __init__(self, flush_threshold=500, flush_interval=10.0):
+        super().__init__(flush_interval)
+        self.flush_threshold = flush_threshold
+        self.pending = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, listing_id, day=None):
+        with self._lock:
+            self.pending[(listing_id, day or timezone.localdate())] += 1
+            full = len(self.pending) >= self.flush_threshold
+        self.after_add(full)
+
+    def flush(self):
+        with self._lock:
+            counts, self.pending = self.pending, Counter()
+        if counts:
+            try:
+                flush_view_counts(counts)
+            except Exception:
+                # Remis en attente pour le prochain essai
+                with self._lock:
+                    self.pending.update(counts)
+                raise
+        return sum(counts.values())
+
+
+get_view_counter = process_flusher(lambda: ViewCounter(
+    flush_threshold=getattr(settings, "LISTING_VIEWS_FLUSH_THRESHOLD", 500),
+    flush_interval=getattr(settings, "LISTING_VIEWS_FLUSH_INTERVAL", 10.0),
+))
+
+
+def record_listing_view(request, listing):
+    """
+    Compte une vue de `listing`, sauf robots et rechargements de la même IP
+    dans la fenêtre LISTING_VIEWS_DEDUP_SECONDS. Retourne True si la vue est comptée.
+    """
+    if is_bot(request):
+        return False
+    window = getattr(settings, "LISTING_VIEWS_DEDUP_SECONDS", 1800)
+    if window:
+        ip = UserActivity.get_client_ip(request)
+        if not cache.add(f"listing_view:{listing.pk}:{ip}", 1, window):
+            return False
+    get_view_counter().add(listing.pk)
+    return True
+
+
+def daily_views(listings, days=30):
+    """Vues par jour des `listings` sur les `days` derniers jours, jours sans vue compris."""
+    today = timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    totals = dict(
+        ListingViewCount.objects.filter(listing__in=listings, day__gte=start)
+        .values("day").annotate(total=Sum("views")).values_list("day", "total")
+    )
+    return [
+        {"day": day, "views": totals.get(day, 0)}
+        for day in (start + timedelta(days=offset) for offset in range(days))
+    ]
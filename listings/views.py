@@ -3,22 +3,28 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
 
-from .models import Listing
+from accounts.models import UserActivity
+from .models import Listing, ListingPhoto
 from agencies.models import City
+from .photo_queue import enqueue_uploads
 from .query import listings_for_user
+from .search import search_listings
+from .view_counter import record_listing_view
+from core.aggregates import count_by_choices
 from core.permissions import require_role
 
+LISTING_STATUS = {"published": True, "draft": False}
+
 
 @login_required
 @require_role('agency_admin', 'agent')
 def manage_listings(request):
     listings = listings_for_user(request.user)
-    published_count = listings.filter(published=True).count()
-    draft_count = listings.filter(published=False).count()
+    counts = count_by_choices(listings, "published", LISTING_STATUS)
     return render(request, 'listings/manage_list.html', {
         'listings': listings,
-        'published_count': published_count,
-        'draft_count': draft_count,
+        'published_count': counts['published'],
+        'draft_count': counts['draft'],
     })
 
 
@@ -34,6 +40,10 @@ def listing_edit(request, pk):
         listing.title = request.POST.get('title', listing.title)
         # ... autres champs autorisés ...
         listing.save()
+        UserActivity.log_activity(
+            request.user, UserActivity.ActivityType.LISTING_UPDATE, f"Annonce modifiée : {listing.title}",
+            content_object=listing, request=request,
+        )
         messages.success(request, "Annonce mise à jour.")
         return redirect('manage_listings')
 
@@ -47,6 +57,10 @@ def listing_delete(request, pk):
     if not listing.can_edit(request.user):
         messages.error(request, "Accès refusé.")
         return redirect('manage_listings')
+    UserActivity.log_activity(
+        request.user, UserActivity.ActivityType.LISTING_DELETE, f"Annonce supprimée : {listing.title}",
+        metadata={"listing_id": listing.pk}, request=request,
+    )
     listing.delete()
     messages.success(request, "Annonce supprimée.")
     return redirect('manage_listings')
@@ -56,12 +70,11 @@ def listing_delete(request, pk):
 @require_role('agency_admin', 'agent')
 def my_listings(request):
     listings = listings_for_user(request.user)
-    published_count = listings.filter(published=True).count()
-    draft_count = listings.filter(published=False).count()
+    counts = count_by_choices(listings, "published", LISTING_STATUS)
     return render(request, 'listings/manage_list.html', {
         'listings': listings,
-        'published_count': published_count,
-        'draft_count': draft_count,
+        'published_count': counts['published'],
+        'draft_count': counts['draft'],
     })
 
 
@@ -69,7 +82,6 @@ def my_listings(request):
 @require_role('agency_admin', 'agent')
 def listing_create(request):
     from .forms import ListingForm
-    from .models import ListingPhoto
 
     if request.method == 'POST':
         form = ListingForm(request.POST)
@@ -78,16 +90,14 @@ def listing_create(request):
             listing.agency = request.user.agency
             listing.owner = request.user
             listing.save()
+            UserActivity.log_activity(
+                request.user, UserActivity.ActivityType.LISTING_CREATE, f"Annonce créée : {listing.title}",
+                content_object=listing, request=request,
+            )
 
-            # Gestion des photos uploadées
-            photos = request.FILES.getlist('photos')
-            for i, photo in enumerate(photos):
-                ListingPhoto.objects.create(
-                    listing=listing,
-                    image=photo,
-                    is_cover=(i == 0),  # Première photo comme couverture
-                    order=i
-                )
+            # Photos uploadées : mises en file (disque local + lignes "pending"),
+            # redimensionnées et stockées par le worker process_photo_uploads
+            enqueue_uploads(listing, request.FILES.getlist('photos'))  # première photo = couverture
 
             messages.success(request, "Annonce créée avec succès.")
             return redirect('manage_listings')
@@ -99,25 +109,31 @@ def listing_create(request):
 
 def listing_detail(request, slug):
     listing = get_object_or_404(Listing, slug=slug, published=True)
-
-    # Préparer la photo de couverture et la galerie
-    cover = listing.photos.filter(is_cover=True).first()
-    if cover:
-        gallery = listing.photos.exclude(pk=cover.pk).order_by("order")
-    else:
-        gallery = listing.photos.all().order_by("order")
+    # Vue comptée (hors robots et rechargements) : aussi dans le journal des utilisateurs connectés
+    if record_listing_view(request, listing) and request.user.is_authenticated:
+        UserActivity.log_activity(
+            request.user, UserActivity.ActivityType.LISTING_VIEW, f"Annonce consultée : {listing.title}",
+            content_object=listing, request=request,
+        )
+
+    # Couverture et galerie : photos prêtes seulement, les autres sont annoncées en cours de traitement
+    photos = list(listing.photos.order_by("order", "pk"))
+    ready = [p for p in photos if p.image and p.status == ListingPhoto.Status.READY]
+    cover = next((p for p in ready if p.is_cover), ready[0] if ready else None)
 
     context = {
         "listing": listing,
         "cover": cover,
-        "gallery": gallery,
+        "gallery": [p for p in ready if p != cover],
+        "photos": ready,
+        "processing": sum(1 for p in photos if p.is_pending),
     }
     return render(request, 'listings/listing_detail.html', context)
 
 
 def listing_list(request):
     # Base queryset
-    listings = Listing.objects.filter(published=True).select_related("city", "agency", "owner")
+    listings = Listing.objects.filter(published=True).select_related("city__district__region", "agency", "owner")
 
     # Filtres GET
     city_id = request.GET.get("city")
@@ -125,6 +141,7 @@ def listing_list(request):
     listing_type = request.GET.get("listing_type")
     min_price = request.GET.get("min_price")
     max_price = request.GET.get("max_price")
+    query = request.GET.get("q", "").strip()
 
     # Filtres classiques
     if city_id:
@@ -138,15 +155,20 @@ def listing_list(request):
     if max_price:
         listings = listings.filter(price__lte=max_price)
 
-    # Pagination
-    paginator = Paginator(listings.order_by("-id"), 12)  # 12 annonces par page
+    # 🔎 Mots-clés : index plein texte, triés par pertinence (mêmes filtres appliqués dans l'index)
+    if query:
+        listings = search_listings(
+            listings, query, published=True, city_id=city_id, category=category,
+            listing_type=listing_type, min_price=min_price, max_price=max_price,
+        )
+    else:
+        listings = listings.order_by("-id")
+
+    # Pagination (photo de couverture préchargée via with_cover)
+    paginator = Paginator(listings.with_cover(), 12)  # 12 annonces par page
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
 
-    # Préparer la photo de couverture pour chaque annonce
-    for l in page_obj:
-        l.cover = l.photos.filter(is_cover=True).first()
-
     # Régions (affichage)
     regions = [
         {"name": "Maritime", "slug": "maritime"},
@@ -157,9 +179,7 @@ def listing_list(request):
     ]
 
     # Annonces en vedette (si champ featured)
-    featured = Listing.objects.filter(published=True, featured=True).select_related("city")[:6]
-    for f in featured:
-        f.cover = f.photos.filter(is_cover=True).first()
+    featured = Listing.objects.filter(published=True, featured=True).select_related("city__district__region").with_cover()[:6]
 
     # Données pour les <select>
     cities = City.objects.all().order_by("name")
@@ -182,6 +202,7 @@ def listing_list(request):
             "listing_type": listing_type or "",
             "min_price": min_price or "",
             "max_price": max_price or "",
+            "q": query,
         }
     }
     return render(request, "listings/listing_list.html", context)
@@ -200,7 +221,7 @@ def region_listings(request, region_slug):
     # Filtrer les annonces par région
     listings = Listing.objects.filter(
         published=True,
-        city__district__region=region
+        region=region
     ).select_related("city", "agency", "owner")
 
     # Filtres GET supplémentaires (optionnels)
@@ -222,15 +243,11 @@ def region_listings(request, region_slug):
     if max_price:
         listings = listings.filter(price__lte=max_price)
 
-    # Pagination
-    paginator = Paginator(listings.order_by("-id"), 12)
+    # Pagination (photo de couverture préchargée via with_cover)
+    paginator = Paginator(listings.with_cover().order_by("-id"), 12)
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
 
-    # Préparer la photo de couverture pour chaque annonce
-    for l in page_obj:
-        l.cover = l.photos.filter(is_cover=True).first()
-
     # Villes de cette région pour les filtres
     cities = City.objects.all().order_by("name")
     categories = [(choice[0], choice[1]) for choice in Listing.Category.choices]
@@ -26,7 +26,7 @@ class ListingViewSet(
     - POST/PUT/PATCH/DELETE : réservés aux rôles agency_admin / agent
     """
 
-    queryset = Listing.objects.select_related("city", "agency", "owner")
+    queryset = Listing.objects.select_related("city", "district__region", "agency", "owner").with_photos()
     filter_backends = [DjangoFilterBackend]
     filterset_class = ListingFilter
     lookup_field = "slug"  # permet d'utiliser /api/listings/<slug>/
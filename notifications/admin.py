@@ -1,6 +1,8 @@
 from django.contrib import admin
-from django.utils.translation import gettext_lazy as _
-from .models import Notification
+from django.utils.translation import gettext_lazy as _, ngettext
+from .counters import invalidate_unread_counts
+from .pubsub import publish_count
+from .models import Notification, NotificationEvent
 
 
 @admin.register(Notification)
@@ -35,6 +37,9 @@ class NotificationAdmin(admin.ModelAdmin):
 
     ordering = ['-created_at']
 
+    # Pas de COUNT(*) complet de la table à chaque page de la liste
+    show_full_result_count = False
+
     fieldsets = (
         (_('Informations générales'), {
             'fields': ('user', 'notification_type', 'title', 'message')
@@ -59,7 +64,10 @@ class NotificationAdmin(admin.ModelAdmin):
     actions = ['mark_as_read', 'mark_as_unread']
 
     def mark_as_read(self, request, queryset):
+        user_ids = list(queryset.values_list('user_id', flat=True).distinct())
         updated = queryset.update(is_read=True)
+        invalidate_unread_counts(user_ids)
+        publish_count(user_ids)
         self.message_user(
             request,
             ngettext(
@@ -71,7 +79,10 @@ class NotificationAdmin(admin.ModelAdmin):
     mark_as_read.short_description = _("Marquer comme lue(s)")
 
     def mark_as_unread(self, request, queryset):
+        user_ids = list(queryset.values_list('user_id', flat=True).distinct())
         updated = queryset.update(is_read=False)
+        invalidate_unread_counts(user_ids)
+        publish_count(user_ids)
         self.message_user(
             request,
             ngettext(
@@ -84,3 +95,31 @@ class NotificationAdmin(admin.ModelAdmin):
 
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('user', 'content_type')
+
+
+@admin.register(NotificationEvent)
+class NotificationEventAdmin(admin.ModelAdmin):
+    list_display = [
+        'event_id',
+        'notification_type',
+        'content_type',
+        'object_id',
+        'status',
+        'attempts',
+        'next_attempt_at',
+        'created_at'
+    ]
+
+    list_filter = [
+        'status',
+        'notification_type'
+    ]
+
+    readonly_fields = [
+        'event_id',
+        'created_at',
+        'processed_at',
+        'last_error'
+    ]
+
+    ordering = ['-id']
@@ -0,0 +1,7 @@
+# notifications/context_processors.py
+from .pubsub import push_available
+
+
+def notification_push(request):
+    """`notification_push` : le gabarit ouvre un flux SSE (ASGI) ou interroge le compteur (WSGI)."""
+    return {"notification_push": push_available(request)}
@@ -0,0 +1,119 @@
+# notifications/counters.py
+"""
+Compteur de notifications non lues, maintenu en cache par deltas, et version des
+notifications de chaque utilisateur (changée après chaque création / lecture /
+suppression) : les flux SSE et long-polls ne relisent la base que si elle a bougé.
+
+Il n'est utilisé que si le cache par défaut est partagé entre processus : avec
+un cache propre à chaque processus (LocMem), les deltas appliqués par le worker
+(process_notifications) ou par un autre worker web ne seraient jamais vus. Dans
+ce cas chaque lecture fait le COUNT(*) exact (voir core.W001).
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.checks import cache_is_shared
+
+
+def unread_key(user_id):
+    return f"notifications:unread:{user_id}"
+
+
+def version_key(user_id):
+    return f"notifications:version:{user_id}"
+
+
+def _ttl():
+    # L'expiration sert de réconciliation périodique avec le vrai COUNT(*)
+    return getattr(settings, "NOTIFICATION_UNREAD_COUNT_TTL", 300)
+
+
+def get_unread_count(user_id):
+    """Nombre de notifications non lues : lecture en cache, COUNT(*) seulement si absent."""
+    if not cache_is_shared():
+        return _count(user_id)
+    count = cache.get(unread_key(user_id))
+    if count is None:
+        count = reconcile_unread_count(user_id)
+    return count
+
+
+def _count(user_id):
+    from .models import Notification
+
+    return Notification.objects.filter(user_id=user_id, is_read=False).count()
+
+
+def reconcile_unread_count(user_id):
+    """Recalcule le compteur depuis la base et le remet en cache."""
+    count = _count(user_id)
+    if cache_is_shared():
+        cache.set(unread_key(user_id), count, _ttl())
+    return count
+
+
+def adjust_unread_count(user_id, delta):
+    """
+    Applique `delta` au compteur s'il est en cache, après commit : un recomptage
+    concurrent ne peut pas lire la base avant la modification puis recevoir le delta,
+    et un rollback ne laisse pas de compteur faux. Absent, il sera recalculé à la
+    prochaine lecture ; négatif (dérive), il est supprimé pour forcer ce recalcul.
+    """
+    if not delta or not cache_is_shared():
+        return
+    transaction.on_commit(lambda: _apply_delta(user_id, delta), robust=True)
+
+
+def _apply_delta(user_id, delta):
+    _bump_versions([user_id])
+    try:
+        value = cache.incr(unread_key(user_id), delta)
+    except ValueError:
+        return
+    if value < 0:
+        cache.delete(unread_key(user_id))
+
+
+def invalidate_unread_counts(user_ids):
+    """Oublie les compteurs (après un bulk_create / update en masse), après commit."""
+    if not cache_is_shared():
+        return
+    user_ids = set(user_ids)
+
+    def invalidate():
+        _bump_versions(user_ids)
+        cache.delete_many([unread_key(user_id) for user_id in user_ids])
+    transaction.on_commit(invalidate, robust=True)
+
+
+def touch_notifications(user_ids):
+    """Change la version des notifications sans toucher au compteur (ex : notification déjà lue)."""
+    if not cache_is_shared():
+        return
+    user_ids = set(user_ids)
+    transaction.on_commit(lambda: _bump_versions(user_ids), robust=True)
+
+
+def _bump_versions(user_ids):
+    version = time.time_ns()
+    cache.set_many({version_key(user_id): version for user_id in user_ids}, timeout=None)
+
+
+def notifications_version(user_id):
+    """
+    Version des notifications de l'utilisateur : une lecture de cache, qui change
+    dès qu'une notification est créée, lue ou supprimée (par n'importe quel
+    processus). None sans cache partagé : il faut alors relire la base.
+    """
+    if not cache_is_shared():
+        return None
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key)
+    return version
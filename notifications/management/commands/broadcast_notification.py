@@ -0,0 +1,46 @@
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from notifications.models import Notification
+
+BROADCAST_TYPES = (
+    Notification.NotificationType.SYSTEM_ALERT,
+    Notification.NotificationType.MAINTENANCE,
+)
+
+
+class Command(BaseCommand):
+    help = "Diffuse une alerte système / maintenance à tous les utilisateurs (ou à un rôle)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("title", help="Titre de la notification")
+        parser.add_argument("message", help="Texte de la notification")
+        parser.add_argument(
+            "--type", default=Notification.NotificationType.SYSTEM_ALERT,
+            choices=[t.value for t in BROADCAST_TYPES], help="Type de notification"
+        )
+        parser.add_argument("--role", choices=User.Roles.values, help="Limiter à un rôle")
+        parser.add_argument("--action-url", help="Lien d'action de la notification")
+        parser.add_argument("--event-id", help="Reprendre une diffusion interrompue (UUID affiché au lancement)")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Destinataires lus par requête")
+        parser.add_argument("--batch-size", type=int, default=500, help="Lignes par INSERT")
+
+    def handle(self, *args, **options):
+        try:
+            event_id = uuid.UUID(options["event_id"]) if options["event_id"] else uuid.uuid4()
+        except ValueError:
+            raise CommandError("--event-id doit être un UUID.")
+
+        users = User.objects.filter(is_active=True)
+        if options["role"]:
+            users = users.filter(role=options["role"])
+
+        self.stdout.write(self.style.NOTICE(f"=== DIFFUSION {options['type']} (event {event_id}) ==="))
+        sent = Notification.bulk_notify(
+            users, options["type"], options["title"], options["message"],
+            action_url=options["action_url"], event_id=event_id,
+            chunk_size=options["chunk_size"], batch_size=options["batch_size"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ {sent} notification(s) créée(s) (destinataires déjà notifiés ignorés)."))
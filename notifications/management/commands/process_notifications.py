@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = "Worker de l'outbox : transforme les événements en attente en notifications, par lots"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Nombre d'événements par lot")
+        parser.add_argument("--max-attempts", type=int, default=None, help="Tentatives avant abandon d'un événement")
+        parser.add_argument("--loop", action="store_true", help="Tourne en continu au lieu de vider la file puis s'arrêter")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Pause (s) quand la file est vide, avec --loop")
+
+    def handle(self, *args, **options):
+        total_events = total_notifications = 0
+        try:
+            while True:
+                events, notifications = deliver_pending(options["batch_size"], options["max_attempts"])
+                total_events += events
+                total_notifications += notifications
+                if events and options["verbosity"] > 1:
+                    self.stdout.write(f" - {events} événement(s) → {notifications} notification(s)")
+                if not events:
+                    if not options["loop"]:
+                        break
+                    time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {total_events} événement(s) traité(s), {total_notifications} notification(s) créée(s)."
+        ))
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:51
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('notifications', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='Identifiant')),
+                ('notification_type', models.CharField(max_length=50, verbose_name='Type de notification')),
+                ('object_id', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('done', 'Distribué'), ('failed', 'En échec')], default='pending', max_length=10, verbose_name='Statut')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Tentatives')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Prochaine tentative')),
+                ('last_error', models.TextField(blank=True, verbose_name='Dernière erreur')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Créé le')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='Traité le')),
+            ],
+            options={
+                'verbose_name': 'Événement de notification',
+                'verbose_name_plural': 'Événements de notification',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='event_id',
+            field=models.UUIDField(blank=True, editable=False, null=True, verbose_name='Événement'),
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(fields=('event_id', 'user'), name='notification_event_recipient_unique'),
+        ),
+        migrations.AddField(
+            model_name='notificationevent',
+            name='content_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_events', to='contenttypes.contenttype'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationevent',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='notif_event_due'),
+        ),
+    ]
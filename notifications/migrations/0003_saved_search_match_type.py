@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_notification_outbox'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('appointment_request', 'Demande de rendez-vous'), ('appointment_confirmed', 'Rendez-vous confirmé'), ('appointment_cancelled', 'Rendez-vous annulé'), ('appointment_completed', 'Rendez-vous terminé'), ('listing_approved', 'Annonce approuvée'), ('listing_rejected', 'Annonce rejetée'), ('listing_featured', 'Annonce mise en avant'), ('saved_search_match', 'Nouvelle annonce pour une recherche sauvegardée'), ('agency_approved', 'Agence approuvée'), ('agency_rejected', 'Agence rejetée'), ('agent_joined', "Agent rejoint l'agence"), ('user_registered', 'Nouvel utilisateur inscrit'), ('message_received', 'Message reçu'), ('system_alert', 'Alerte système'), ('maintenance', 'Maintenance programmée')], max_length=50, verbose_name='Type de notification'),
+        ),
+    ]
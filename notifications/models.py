@@ -1,8 +1,13 @@
+import uuid
+
 from django.db import models
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from accounts.models import User
+from .counters import adjust_unread_count, get_unread_count, invalidate_unread_counts, touch_notifications
+from .pubsub import publish_count, publish_notification
 
 
 class Notification(models.Model):
@@ -17,6 +22,8 @@ class Notification(models.Model):
         LISTING_APPROVED = 'listing_approved', _('Annonce approuvée')
         LISTING_REJECTED = 'listing_rejected', _('Annonce rejetée')
         LISTING_FEATURED = 'listing_featured', _('Annonce mise en avant')
+        SAVED_SEARCH_MATCH = 'saved_search_match', _('Nouvelle annonce pour une recherche sauvegardée')
+        LISTING_IMPORT_DONE = 'listing_import_done', _('Import d\'annonces terminé')
 
         # Agency related
         AGENCY_APPROVED = 'agency_approved', _('Agence approuvée')
@@ -91,6 +98,14 @@ class Notification(models.Model):
         verbose_name=_('Lu le')
     )
 
+    # Événement d'outbox à l'origine de la notification (idempotence du worker)
+    event_id = models.UUIDField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_('Événement')
+    )
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = _('Notification')
@@ -100,10 +115,33 @@ class Notification(models.Model):
             models.Index(fields=['user', 'is_read']),
             models.Index(fields=['notification_type']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['event_id', 'user'],
+                name='notification_event_recipient_unique'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username}: {self.title}"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding and not self.is_read:
+            adjust_unread_count(self.user_id, +1)
+            publish_notification(self)
+        elif adding:
+            touch_notifications([self.user_id])
+
+    def delete(self, *args, **kwargs):
+        was_unread = not self.is_read
+        result = super().delete(*args, **kwargs)
+        if was_unread:
+            adjust_unread_count(self.user_id, -1)
+            publish_count([self.user_id])
+        return result
+
     def mark_as_read(self):
         """Mark notification as read"""
         from django.utils import timezone
@@ -111,11 +149,25 @@ class Notification(models.Model):
             self.is_read = True
             self.read_at = timezone.now()
             self.save(update_fields=['is_read', 'read_at'])
+            adjust_unread_count(self.user_id, -1)
+            publish_count([self.user_id])
 
     @property
     def is_unread(self):
         return not self.is_read
 
+    def to_dict(self):
+        """Compact representation pushed to clients (SSE, long-polling, delta sync)"""
+        return {
+            'id': self.id,
+            'type': self.notification_type,
+            'title': self.title,
+            'message': self.message,
+            'is_read': self.is_read,
+            'created_at': self.created_at.isoformat(),
+            'action_url': self.action_url,
+        }
+
     @classmethod
     def create_notification(cls, user, notification_type, title, message,
                           content_object=None, action_url=None):
@@ -135,16 +187,149 @@ class Notification(models.Model):
         notification.save()
         return notification
 
+    @classmethod
+    def bulk_notify(cls, users_queryset, notification_type, title, message,
+                    content_object=None, action_url=None, event_id=None,
+                    chunk_size=2000, batch_size=500):
+        """
+        Notify every user of `users_queryset` (ex: SYSTEM_ALERT / MAINTENANCE broadcast).
+
+        Recipients are streamed by primary-key chunks (keyset, no OFFSET) and rows are
+        inserted with bulk_create: memory use depends on `chunk_size`, not on the number
+        of recipients. With an `event_id`, re-running the same broadcast skips users
+        already notified (unique (event_id, user)). Returns the number of notifications
+        created, already-notified users excluded.
+        """
+        content_type = object_id = None
+        if content_object is not None:
+            content_type = ContentType.objects.get_for_model(content_object)
+            object_id = content_object.pk
+
+        recipients = users_queryset.order_by('pk').values_list('pk', flat=True)
+        sent = 0
+        last_pk = None
+        while True:
+            chunk = recipients.filter(pk__gt=last_pk) if last_pk is not None else recipients
+            user_ids = list(chunk[:chunk_size])
+            if not user_ids:
+                break
+            last_pk = user_ids[-1]
+            if event_id is not None:
+                # Reprise d'une diffusion : destinataires déjà notifiés ni réinsérés ni comptés
+                done = set(
+                    cls.objects.filter(event_id=event_id, user_id__in=user_ids).values_list('user_id', flat=True)
+                )
+                user_ids = [user_id for user_id in user_ids if user_id not in done]
+                if not user_ids:
+                    continue
+            cls.objects.bulk_create(
+                [
+                    cls(
+                        user_id=user_id,
+                        notification_type=notification_type,
+                        title=title,
+                        message=message,
+                        content_type=content_type,
+                        object_id=object_id,
+                        action_url=action_url,
+                        event_id=event_id,
+                    )
+                    for user_id in user_ids
+                ],
+                batch_size=batch_size,
+                ignore_conflicts=event_id is not None,
+            )
+            invalidate_unread_counts(user_ids)
+            publish_count(user_ids)
+            # ignore_conflicts garde l'idempotence si une autre exécution insère en même temps
+            sent += len(user_ids)
+        return sent
+
     @classmethod
     def get_unread_count(cls, user):
-        """Get count of unread notifications for a user"""
-        return cls.objects.filter(user=user, is_read=False).count()
+        """Get count of unread notifications for a user (cached counter, see counters.py)"""
+        return get_unread_count(user.pk)
 
     @classmethod
     def mark_all_as_read(cls, user):
         """Mark all notifications as read for a user"""
         from django.utils import timezone
-        return cls.objects.filter(user=user, is_read=False).update(
+        count = cls.objects.filter(user=user, is_read=False).update(
             is_read=True,
             read_at=timezone.now()
         )
+        adjust_unread_count(user.pk, -count)
+        publish_count([user.pk])
+        return count
+
+
+class NotificationEvent(models.Model):
+    """
+    Outbox des notifications : les signaux n'enregistrent qu'un événement
+    (type + objet concerné), le worker `process_notifications` résout les
+    destinataires et crée les notifications par lots.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('En attente')
+        DONE = 'done', _('Distribué')
+        FAILED = 'failed', _('En échec')
+
+    event_id = models.UUIDField(
+        default=uuid.uuid4,
+        unique=True,
+        editable=False,
+        verbose_name=_('Identifiant')
+    )
+
+    notification_type = models.CharField(
+        max_length=50,
+        verbose_name=_('Type de notification')
+    )
+
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        related_name='notification_events'
+    )
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name=_('Statut')
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name=_('Tentatives')
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_('Prochaine tentative')
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name=_('Dernière erreur')
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('Créé le')
+    )
+    processed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('Traité le')
+    )
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = _('Événement de notification')
+        verbose_name_plural = _('Événements de notification')
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='notif_event_due'),
+        ]
+
+    def __str__(self):
+        return f"{self.notification_type} #{self.object_id} ({self.get_status_display()})"
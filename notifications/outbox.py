@@ -0,0 +1,228 @@
+# notifications/outbox.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import Appointment, User
+from agencies.models import Agency
+from listings.models import Listing, ListingImport
+from .counters import invalidate_unread_counts
+from .pubsub import publish_count
+from .models import Notification, NotificationEvent
+from .views import (
+    agency_notification_data,
+    appointment_notification_data,
+    listing_import_notification_data,
+    listing_notification_data,
+)
+
+
+def enqueue_notification(instance, notification_type):
+    """
+    Enregistre un événement de notification dans l'outbox.
+    Appelé depuis les signaux : une seule INSERT, dans la transaction de l'appelant.
+    """
+    return NotificationEvent.objects.create(
+        notification_type=notification_type,
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+    )
+
+
+class RecipientResolver:
+    """Cache des destinataires le temps d'un lot (admins d'agence, admins plateforme, recherches sauvegardées)."""
+
+    def __init__(self):
+        self._agency_admins = {}
+        self._platform_admins = None
+        self._matcher = None
+
+    def agency_admin(self, agency_id):
+        if not agency_id:
+            return None
+        if agency_id not in self._agency_admins:
+            self._agency_admins[agency_id] = User.objects.filter(
+                agency_id=agency_id, role=User.Roles.AGENCY_ADMIN
+            ).first()
+        return self._agency_admins[agency_id]
+
+    def users(self, user_ids):
+        """Utilisateurs actifs parmi `user_ids` (une requête)."""
+        if not user_ids:
+            return []
+        return list(User.objects.filter(pk__in=user_ids, is_active=True).only('id', 'username').order_by('pk'))
+
+    def platform_admins(self):
+        if self._platform_admins is None:
+            self._platform_admins = list(User.objects.filter(role=User.Roles.ADMIN_PLATFORM))
+        return self._platform_admins
+
+    def saved_search_matcher(self):
+        """Index des recherches sauvegardées, version vérifiée en base une fois par lot."""
+        if self._matcher is None:
+            from saved_searches.matching import get_matcher
+
+            self._matcher = get_matcher()
+        return self._matcher
+
+
+def _appointment_recipients(appointment, notification_type, resolver):
+    first = appointment.agent if notification_type == 'appointment_request' else appointment.customer
+    return [first, resolver.agency_admin(appointment.agent.agency_id)]
+
+
+def _listing_recipients(listing, notification_type, resolver):
+    if notification_type == 'saved_search_match':
+        from saved_searches.matching import match_listing
+
+        # Annonce dépubliée entre-temps : plus d'alerte
+        if not listing.published:
+            return []
+        return resolver.users(match_listing(listing, resolver.saved_search_matcher()) - {listing.owner_id})
+    return [resolver.agency_admin(listing.agency_id), *resolver.platform_admins()]
+
+
+def _listing_import_recipients(listing_import, notification_type, resolver):
+    return [listing_import.user, resolver.agency_admin(listing_import.agency_id)]
+
+
+def _agency_recipients(agency, notification_type, resolver):
+    return [resolver.agency_admin(agency.pk)]
+
+
+# Modèle concerné → (queryset de chargement, destinataires, contenu du message)
+HANDLERS = {
+    Appointment: (
+        lambda: Appointment.objects.select_related('agent', 'customer', 'listing'),
+        _appointment_recipients,
+        appointment_notification_data,
+    ),
+    Listing: (
+        lambda: Listing.objects.select_related('owner', 'agency'),
+        _listing_recipients,
+        listing_notification_data,
+    ),
+    ListingImport: (
+        lambda: ListingImport.objects.select_related('user', 'agency'),
+        _listing_import_recipients,
+        listing_import_notification_data,
+    ),
+    Agency: (
+        lambda: Agency.objects.all(),
+        _agency_recipients,
+        agency_notification_data,
+    ),
+}
+
+
+def _retry_delay(attempts):
+    base = getattr(settings, 'NOTIFICATION_OUTBOX_BACKOFF', 30)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 3600))
+
+
+def _load_objects(events):
+    """Charge les objets de tous les événements du lot : une requête par modèle."""
+    ids_by_type = {}
+    for event in events:
+        ids_by_type.setdefault(event.content_type_id, set()).add(event.object_id)
+
+    objects = {}
+    for content_type_id, ids in ids_by_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model in HANDLERS:
+            loader = HANDLERS[model][0]
+            for pk, obj in loader().in_bulk(ids).items():
+                objects[(content_type_id, pk)] = obj
+    return objects
+
+
+def _build_notifications(event, obj, resolver):
+    _, get_recipients, get_data = HANDLERS[type(obj)]
+    notifications, seen = [], set()
+    for recipient in get_recipients(obj, event.notification_type, resolver):
+        if recipient is None or recipient.pk in seen:
+            continue
+        seen.add(recipient.pk)
+        data = get_data(obj, event.notification_type, recipient)
+        if data:
+            notifications.append(Notification(
+                user=recipient,
+                notification_type=event.notification_type,
+                content_type_id=event.content_type_id,
+                object_id=event.object_id,
+                event_id=event.event_id,
+                **data
+            ))
+    return notifications
+
+
+def deliver_pending(batch_size=100, max_attempts=None):
+    """
+    Traite un lot d'événements dus et retourne (événements traités, notifications créées).
+
+    Les événements sont verrouillés (SKIP LOCKED) pour permettre plusieurs workers.
+    Les notifications du lot sont insérées en un seul bulk_create ; la contrainte
+    unique (event_id, user) rend un nouvel essai sans effet sur les notifications
+    déjà créées. En cas d'erreur, l'événement est replanifié avec un délai
+    exponentiel, puis marqué en échec après `max_attempts` tentatives.
+    """
+    max_attempts = max_attempts or getattr(settings, 'NOTIFICATION_OUTBOX_MAX_ATTEMPTS', 5)
+    now = timezone.now()
+
+    with transaction.atomic():
+        events = list(
+            NotificationEvent.objects.select_for_update(skip_locked=True)
+            .filter(status=NotificationEvent.Status.PENDING, next_attempt_at__lte=now)
+            .order_by('id')[:batch_size]
+        )
+        if not events:
+            return 0, 0
+
+        objects = _load_objects(events)
+        resolver = RecipientResolver()
+        notifications, delivered, failed = [], [], []
+        for event in events:
+            obj = objects.get((event.content_type_id, event.object_id))
+            if obj is None:
+                # Objet supprimé entre-temps : rien à notifier
+                delivered.append(event)
+                continue
+            try:
+                notifications.extend(_build_notifications(event, obj, resolver))
+            except Exception as exc:
+                event.last_error = repr(exc)
+                failed.append(event)
+            else:
+                delivered.append(event)
+
+        try:
+            with transaction.atomic():
+                Notification.objects.bulk_create(notifications, batch_size=500, ignore_conflicts=True)
+        except Exception as exc:
+            for event in delivered:
+                event.last_error = repr(exc)
+            failed.extend(delivered)
+            delivered, notifications = [], []
+
+        for event in delivered:
+            event.status = NotificationEvent.Status.DONE
+            event.processed_at = now
+            event.last_error = ''
+        for event in failed:
+            event.attempts += 1
+            if event.attempts >= max_attempts:
+                event.status = NotificationEvent.Status.FAILED
+                event.processed_at = now
+            else:
+                event.next_attempt_at = now + _retry_delay(event.attempts)
+
+        NotificationEvent.objects.bulk_update(
+            events, ['status', 'attempts', 'next_attempt_at', 'last_error', 'processed_at']
+        )
+    # Après le commit : un recomptage ne peut plus précéder les nouvelles lignes
+    invalidate_unread_counts(n.user_id for n in notifications)
+    publish_count(n.user_id for n in notifications)
+    return len(events), len(notifications)
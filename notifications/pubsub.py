@@ -0,0 +1,114 @@
+# notifications/pubsub.py
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+class InProcessBroker:
+    """
+    Pub/sub en mémoire du processus : chaque connexion SSE / long-poll abonnée
+    reçoit ses messages dans une asyncio.Queue bornée.
+
+    `publish` peut être appelé depuis n'importe quel thread (vues synchrones)
+    : le dépôt dans la file se fait via la boucle de l'abonné. Seules les
+    publications de ce processus arrivent : les notifications créées ailleurs
+    (worker process_notifications, autre processus serveur) sont lues en base
+    par les vues quand la version en cache des notifications de l'utilisateur
+    change (vérifiée toutes les NOTIFICATION_DB_CHECK_INTERVAL secondes). Un broker
+    partagé exposant la même interface (NOTIFICATION_BROKER) les pousse sans délai.
+    """
+
+    queue_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def has_subscribers(self, user_id):
+        return bool(self._subscribers.get(user_id))
+
+    def publish(self, user_id, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._put, queue, (event, data))
+            except RuntimeError:
+                # Boucle fermée : l'abonné est parti
+                pass
+
+    @staticmethod
+    def _put(queue, message):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Client trop lent : on perd le message, le prochain "count" resynchronise
+            pass
+
+    @asynccontextmanager
+    async def subscribe(self, user_id):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(maxsize=self.queue_size))
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(user_id)
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[user_id]
+
+
+_broker = None
+
+
+def push_available(request):
+    """
+    SSE et long-polling gardent la connexion ouverte : seulement en ASGI (ex :
+    uvicorn togoestate.asgi:application). En WSGI chaque connexion bloquerait un
+    worker ; la barre de navigation interroge alors notification_count périodiquement.
+    """
+    return isinstance(request, ASGIRequest)
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(
+            getattr(settings, "NOTIFICATION_BROKER", "notifications.pubsub.InProcessBroker")
+        )()
+    return _broker
+
+
+def publish_notification(notification):
+    """Pousse une nouvelle notification (et le compteur) aux abonnés, après commit."""
+    def send():
+        broker = get_broker()
+        if broker.has_subscribers(notification.user_id):
+            broker.publish(notification.user_id, "notification", notification.to_dict())
+            _send_count(broker, notification.user_id)
+    transaction.on_commit(send)
+
+
+def publish_count(user_ids):
+    """Pousse le nombre de non-lues à jour aux abonnés concernés, après commit."""
+    user_ids = set(user_ids)
+
+    def send():
+        broker = get_broker()
+        for user_id in user_ids:
+            if broker.has_subscribers(user_id):
+                _send_count(broker, user_id)
+    transaction.on_commit(send)
+
+
+def _send_count(broker, user_id):
+    from .counters import get_unread_count
+
+    broker.publish(user_id, "count", {"count": get_unread_count(user_id)})
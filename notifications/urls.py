@@ -10,6 +10,9 @@ urlpatterns = [
     # AJAX endpoints
     path('api/count/', views.notification_count, name='notification_count'),
     path('api/list/', views.notification_list_ajax, name='notification_list_ajax'),
+    path('api/stream/', views.notification_stream, name='notification_stream'),
+    path('api/poll/', views.notification_poll, name='notification_poll'),
+    path('api/sync/', views.notification_sync, name='notification_sync'),
 
     # Actions
     path('<int:notification_id>/read/', views.mark_as_read, name='mark_as_read'),
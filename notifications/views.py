@@ -1,11 +1,22 @@
+import asyncio
+import json
+from datetime import timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
 from django.contrib import messages
 from django.core.paginator import Paginator
 from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .counters import get_unread_count, notifications_version
 from .models import Notification
+from .pubsub import get_broker, push_available
 
 
 @login_required
@@ -95,13 +106,255 @@ def delete_notification(request, notification_id):
     return redirect('notifications:notification_list')
 
 
-def notification_count(request):
-    """API endpoint to get unread notification count"""
+def _unread_count(request):
     if request.user.is_authenticated:
-        count = Notification.get_unread_count(request.user)
+        return Notification.get_unread_count(request.user)
+    return 0
+
+
+def _notification_count_etag(request):
+    return f"{request.user.pk or 'anon'}-{_unread_count(request)}"
+
+
+@condition(etag_func=_notification_count_etag)
+@cache_control(private=True, no_cache=True)
+def notification_count(request):
+    """
+    API endpoint to get unread notification count.
+    Polled by the navbar: the count comes from a cached counter, and a client sending
+    back the ETag gets an empty 304 while the count is unchanged.
+    """
+    return JsonResponse({'count': _unread_count(request)})
+
+
+# === Push : Server-Sent Events + long-polling (ASGI seulement, ex: uvicorn togoestate.asgi:application) ===
+async def _notifications_since(user_id, since_id, limit=50):
+    queryset = Notification.objects.filter(user_id=user_id, id__gt=since_id).order_by('id')[:limit]
+    return [notification.to_dict() async for notification in queryset]
+
+
+async def _latest_notification_id(user_id):
+    return await (
+        Notification.objects.filter(user_id=user_id).order_by('-id')
+        .values_list('id', flat=True).afirst()
+    ) or 0
+
+
+def _db_check_interval():
+    return getattr(settings, 'NOTIFICATION_DB_CHECK_INTERVAL', 5)
+
+
+class _ChangeWatcher:
+    """
+    Dit s'il faut relire la base : seulement quand la version des notifications de
+    l'utilisateur (une lecture de cache, voir counters.py) a changé depuis le
+    dernier appel. Sans cache partagé, la base est relue à chaque fois.
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.version = None
+
+    async def changed(self):
+        version = await sync_to_async(notifications_version)(self.user_id)
+        changed = version is None or version != self.version
+        self.version = version
+        return changed
+
+
+def _parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _sse(event, data, event_id=None):
+    message = f"event: {event}\ndata: {json.dumps(data)}\n"
+    if event_id is not None:
+        message = f"id: {event_id}\n" + message
+    return message + "\n"
+
+
+async def _event_stream(user_id, last_event_id):
+    heartbeat = getattr(settings, 'NOTIFICATION_SSE_HEARTBEAT', 15)
+    interval = min(heartbeat, _db_check_interval())
+    watcher = _ChangeWatcher(user_id)
+    # Abonnement (et version) avant la lecture du rattrapage : aucun message ne peut se perdre entre les deux
+    async with get_broker().subscribe(user_id) as queue:
+        await watcher.changed()
+        yield "retry: 5000\n\n"
+        if last_event_id is None:
+            last_id = await _latest_notification_id(user_id)
+        else:
+            last_id = last_event_id
+            for data in await _notifications_since(user_id, last_id):
+                last_id = data['id']
+                yield _sse('notification', data, data['id'])
+        count = await sync_to_async(get_unread_count)(user_id)
+        yield _sse('count', {'count': count})
+
+        idle = 0
+        while True:
+            try:
+                event, data = await asyncio.wait_for(queue.get(), timeout=interval)
+            except asyncio.TimeoutError:
+                # Le broker ne voit que ce processus : la base fait foi pour le worker et les autres
+                # processus, relue seulement si la version en cache a changé
+                changed = False
+                if await watcher.changed():
+                    for data in await _notifications_since(user_id, last_id):
+                        last_id = data['id']
+                        changed = True
+                        yield _sse('notification', data, data['id'])
+                    current = await sync_to_async(get_unread_count)(user_id)
+                    if current != count:
+                        count = current
+                        changed = True
+                        yield _sse('count', {'count': count})
+                idle = 0 if changed else idle + interval
+                if idle >= heartbeat:
+                    # Commentaire SSE : garde la connexion ouverte à travers les proxys
+                    idle = 0
+                    yield ": ping\n\n"
+                continue
+
+            if event == 'notification':
+                if data['id'] <= last_id:
+                    continue  # déjà lue en base
+                last_id = data['id']
+            elif event == 'count':
+                count = data['count']
+            idle = 0
+            yield _sse(event, data, data['id'] if event == 'notification' else None)
+
+
+async def notification_stream(request):
+    """
+    SSE endpoint: one connection per tab, pushes `notification` and `count` events.
+    A reconnecting browser sends Last-Event-ID and receives what it missed.
+    Under WSGI, answers 204 so that EventSource stops reconnecting.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+    if not push_available(request):
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(
+        _event_stream(user.pk, _parse_id(request.headers.get('Last-Event-ID'))),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # pas de mise en tampon par nginx
+    return response
+
+
+async def notification_poll(request):
+    """
+    Long-polling fallback for clients without SSE.
+    Returns notifications newer than `since_id` at once, otherwise waits until
+    something changes for the user (or the timeout) before answering. Meanwhile the
+    cached notifications version is checked every NOTIFICATION_DB_CHECK_INTERVAL
+    seconds, and the database is read again only when it changed.
+    Without `since_id`, or under WSGI, answers immediately.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'notifications': [], 'count': 0, 'last_id': None})
+
+    since_id = _parse_id(request.GET.get('since_id'))
+    notifications = []
+    if since_id is None:
+        since_id = await _latest_notification_id(user.pk)
+    elif not push_available(request):
+        notifications = await _notifications_since(user.pk, since_id)
+    else:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + getattr(settings, 'NOTIFICATION_LONG_POLL_TIMEOUT', 25)
+        watcher = _ChangeWatcher(user.pk)
+        async with get_broker().subscribe(user.pk) as queue:
+            await watcher.changed()
+            notifications = await _notifications_since(user.pk, since_id)
+            while not notifications:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(queue.get(), timeout=min(remaining, _db_check_interval()))
+                except asyncio.TimeoutError:
+                    if not await watcher.changed():
+                        continue
+                notifications = await _notifications_since(user.pk, since_id)
+
+    return JsonResponse({
+        'notifications': notifications,
+        'count': await sync_to_async(get_unread_count)(user.pk),
+        'last_id': notifications[-1]['id'] if notifications else since_id,
+    })
+
+
+SYNC_PAGE_SIZE = 100
+
+
+def notification_sync(request):
+    """
+    Delta sync API: `?since_id=<id>&since=<ISO datetime>` (both optional).
+
+    Returns only notifications newer than `since_id` (or created after `since`),
+    the ids marked as read since `since`, the unread count and the cursor to send
+    back next time. New rows are read through the (user, -created_at) index:
+    `since_id` is turned into its created_at before filtering.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({'detail': 'Authentification requise.'}, status=401)
+
+    since_id = _parse_id(request.GET.get('since_id'))
+    since = None
+    if request.GET.get('since'):
+        since = parse_datetime(request.GET['since'])
+        if since is None:
+            return JsonResponse({'detail': 'Paramètre since invalide (ISO 8601 attendu).'}, status=400)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since, dt_timezone.utc)
+    synced_at = timezone.now()
+
+    notifications = Notification.objects.filter(user=request.user)
+    new = notifications
+    if since_id is not None:
+        anchor = notifications.filter(id=since_id).values_list('created_at', flat=True).first()
+        new = new.filter(id__gt=since_id)
+        if anchor is not None:
+            new = new.filter(created_at__gte=anchor)
+    elif since is not None:
+        new = new.filter(created_at__gt=since)
+
+    if since_id is None and since is None:
+        # Première synchro : les plus récentes seulement
+        new = list(new.order_by('-created_at', '-id')[:SYNC_PAGE_SIZE])[::-1]
+        has_more = False
     else:
-        count = 0
-    return JsonResponse({'count': count})
+        new = list(new.order_by('created_at', 'id')[:SYNC_PAGE_SIZE + 1])
+        has_more = len(new) > SYNC_PAGE_SIZE
+        new = new[:SYNC_PAGE_SIZE]
+
+    read = []
+    if since is not None:
+        read = list(
+            notifications.filter(is_read=True, read_at__gt=since, read_at__lte=synced_at)
+            .values_list('id', flat=True)
+        )
+
+    return JsonResponse({
+        'notifications': [notification.to_dict() for notification in new],
+        'read': read,
+        'unread_count': Notification.get_unread_count(request.user),
+        'has_more': has_more,
+        'cursor': {
+            'since_id': new[-1].id if new else since_id,
+            'since': synced_at.isoformat(),
+        },
+    })
 
 
 def notification_list_ajax(request):
@@ -127,8 +380,8 @@ def notification_list_ajax(request):
 
 
 # Utility functions for creating notifications
-def create_appointment_notification(appointment, notification_type, recipient):
-    """Create notification for appointment events"""
+def appointment_notification_data(appointment, notification_type, recipient):
+    """Title, message and action URL of a notification for appointment events"""
     from django.urls import reverse
 
     # Personnaliser les messages selon le rôle du destinataire
@@ -171,22 +424,31 @@ def create_appointment_notification(appointment, notification_type, recipient):
             }
         }
 
-    if notification_type in type_messages:
-        data = type_messages[notification_type]
-        action_url = reverse('appointment_detail', args=[appointment.id])
+    if notification_type not in type_messages:
+        return None
+
+    data = type_messages[notification_type]
+    return {
+        'title': data['title'],
+        'message': data['message'],
+        'action_url': reverse('appointment_detail', args=[appointment.id]),
+    }
+
 
+def create_appointment_notification(appointment, notification_type, recipient):
+    """Create notification for appointment events"""
+    data = appointment_notification_data(appointment, notification_type, recipient)
+    if data:
         Notification.create_notification(
             user=recipient,
             notification_type=notification_type,
-            title=data['title'],
-            message=data['message'],
             content_object=appointment,
-            action_url=action_url
+            **data
         )
 
 
-def create_listing_notification(listing, notification_type, recipient):
-    """Create notification for listing events"""
+def listing_notification_data(listing, notification_type, recipient):
+    """Title, message and action URL of a notification for listing events"""
     from django.urls import reverse
 
     type_messages = {
@@ -205,25 +467,63 @@ def create_listing_notification(listing, notification_type, recipient):
         'listing_featured': {
             'title': 'Annonce mise en avant',
             'message': f'Votre annonce "{listing.title}" a été mise en avant et bénéficie d\'une meilleure visibilité.'
+        },
+        'saved_search_match': {
+            'title': 'Nouvelle annonce pour votre recherche',
+            'message': f'"{listing.title}" ({listing.get_listing_type_display()}, {format(listing.price, ",.0f").replace(",", " ")} {listing.currency}) correspond à l\'une de vos recherches sauvegardées.'
         }
     }
 
-    if notification_type in type_messages:
-        data = type_messages[notification_type]
-        action_url = reverse('listing_detail', args=[listing.slug])
+    if notification_type not in type_messages:
+        return None
+
+    data = type_messages[notification_type]
+    return {
+        'title': data['title'],
+        'message': data['message'],
+        'action_url': reverse('listing_detail', args=[listing.slug]),
+    }
+
 
+def create_listing_notification(listing, notification_type, recipient):
+    """Create notification for listing events"""
+    data = listing_notification_data(listing, notification_type, recipient)
+    if data:
         Notification.create_notification(
             user=recipient,
             notification_type=notification_type,
-            title=data['title'],
-            message=data['message'],
             content_object=listing,
-            action_url=action_url
+            **data
         )
 
 
-def create_agency_notification(agency, notification_type, recipient):
-    """Create notification for agency events"""
+def listing_import_notification_data(listing_import, notification_type, recipient):
+    """Title, message and action URL of the summary notification of a bulk listing import"""
+    from django.urls import reverse
+
+    if notification_type != 'listing_import_done':
+        return None
+
+    if listing_import.status == listing_import.Status.FAILED:
+        title = 'Import d\'annonces interrompu'
+    else:
+        title = 'Import d\'annonces terminé'
+    message = (
+        f'{listing_import.source_name or "Import"} : {listing_import.created_count} annonce(s) importée(s) '
+        f'pour {listing_import.agency.name}, {listing_import.error_count} ligne(s) refusée(s) '
+        f'sur {listing_import.total_rows}.'
+    )
+    if listing_import.error_report:
+        message += ' Le rapport d\'erreurs est disponible.'
+    return {
+        'title': title,
+        'message': message,
+        'action_url': reverse('cockpit_admin:listings_listingimport_change', args=[listing_import.pk]),
+    }
+
+
+def agency_notification_data(agency, notification_type, recipient):
+    """Title, message and action URL of a notification for agency events"""
     from django.urls import reverse
 
     type_messages = {
@@ -241,22 +541,31 @@ def create_agency_notification(agency, notification_type, recipient):
         }
     }
 
-    if notification_type in type_messages:
-        data = type_messages[notification_type]
-        action_url = reverse('agency_detail', args=[agency.id]) if hasattr(agency, 'id') else None
+    if notification_type not in type_messages:
+        return None
+
+    data = type_messages[notification_type]
+    return {
+        'title': data['title'],
+        'message': data['message'],
+        'action_url': reverse('agency_detail', args=[agency.id]) if hasattr(agency, 'id') else None,
+    }
+
 
+def create_agency_notification(agency, notification_type, recipient):
+    """Create notification for agency events"""
+    data = agency_notification_data(agency, notification_type, recipient)
+    if data:
         Notification.create_notification(
             user=recipient,
             notification_type=notification_type,
-            title=data['title'],
-            message=data['message'],
             content_object=agency,
-            action_url=action_url
+            **data
         )
 
 
-def create_user_notification(user, notification_type, recipient):
-    """Create notification for user-related events"""
+def user_notification_data(user, notification_type, recipient):
+    """Title, message and action URL of a notification for user-related events"""
     from django.urls import reverse
 
     type_messages = {
@@ -270,15 +579,24 @@ def create_user_notification(user, notification_type, recipient):
         }
     }
 
-    if notification_type in type_messages:
-        data = type_messages[notification_type]
-        action_url = reverse('user_detail', args=[user.id]) if hasattr(user, 'id') else None
+    if notification_type not in type_messages:
+        return None
+
+    data = type_messages[notification_type]
+    return {
+        'title': data['title'],
+        'message': data['message'],
+        'action_url': reverse('user_detail', args=[user.id]) if hasattr(user, 'id') else None,
+    }
+
 
+def create_user_notification(user, notification_type, recipient):
+    """Create notification for user-related events"""
+    data = user_notification_data(user, notification_type, recipient)
+    if data:
         Notification.create_notification(
             user=recipient,
             notification_type=notification_type,
-            title=data['title'],
-            message=data['message'],
             content_object=user,
-            action_url=action_url
+            **data
         )
@@ -1,18 +1,26 @@
 from django.contrib import admin
-from .models import SavedSearch, SearchHistory
+from .models import SavedSearch, SearchDailyStat, SearchHistory
 
 
 @admin.register(SavedSearch)
 class SavedSearchAdmin(admin.ModelAdmin):
-    list_display = ('user', 'name', 'query', 'created_at', 'updated_at')
-    list_filter = ('created_at', 'updated_at')
+    list_display = ('user', 'name', 'query', 'city', 'category', 'listing_type', 'max_price', 'created_at', 'updated_at')
+    list_filter = ('category', 'listing_type', 'created_at', 'updated_at')
     search_fields = ('user__username', 'name', 'query')
     readonly_fields = ('created_at', 'updated_at')
 
 
 @admin.register(SearchHistory)
 class SearchHistoryAdmin(admin.ModelAdmin):
-    list_display = ('user', 'query', 'results_count', 'searched_at')
-    list_filter = ('searched_at',)
+    list_display = ('user', 'query', 'city', 'category', 'listing_type', 'results_count', 'searched_at')
+    list_filter = ('category', 'listing_type', 'searched_at')
     search_fields = ('user__username', 'query')
     readonly_fields = ('searched_at',)
+
+
+@admin.register(SearchDailyStat)
+class SearchDailyStatAdmin(admin.ModelAdmin):
+    list_display = ('day', 'keywords', 'city', 'category', 'searches', 'zero_results', 'results_total')
+    list_filter = ('day', 'category')
+    search_fields = ('keywords',)
+    date_hierarchy = 'day'
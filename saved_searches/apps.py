@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SavedSearchesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'saved_searches'
+
+    def ready(self):
+        import saved_searches.signals
@@ -0,0 +1,84 @@
+# saved_searches/criteria.py
+"""
+Forme normalisée des critères de recherche (SavedSearch, SearchHistory).
+
+Les paramètres JSON envoyés par le front (mêmes noms que les filtres de
+listing_list) sont convertis en valeurs typées, puis en une forme canonique
+dont le hash identifie la recherche : deux JSON équivalents (ordre des clés,
+casse, espaces, "200000" / 200000) ont le même `query_hash`.
+
+Fonctions pures : aussi utilisées par la migration de rétro-remplissage.
+"""
+import hashlib
+import json
+from decimal import Decimal, InvalidOperation
+
+CRITERIA_FIELDS = ("city_id", "category", "listing_type", "min_price", "max_price", "bedrooms", "keywords")
+
+
+# Bornes des colonnes de SearchCriteria : au-delà, MySQL lève DataError
+MAX_PRICE = Decimal("9999999999.99")  # DecimalField(max_digits=12, decimal_places=2)
+MAX_BEDROOMS = 32767  # PositiveSmallIntegerField
+MAX_ID = 2147483647
+
+
+def _number(value, cast=Decimal, maximum=None):
+    """Nombre positif ou nul ramené à `maximum` ; None si vide, invalide, NaN / infini ou négatif."""
+    if value in (None, "") or isinstance(value, bool):
+        return None
+    try:
+        number = cast(str(value).strip())
+    except (InvalidOperation, ValueError):
+        return None
+    if isinstance(number, Decimal) and not number.is_finite():
+        return None
+    if number < 0:
+        return None
+    # Trop grand : aucune annonce n'atteint la borne, le critère garde son sens
+    return min(number, maximum) if maximum is not None else number
+
+
+def _price(value):
+    price = _number(value, maximum=MAX_PRICE)
+    return price.quantize(Decimal("0.01")) if price is not None else None
+
+
+def _text(value, max_length):
+    return " ".join(str(value or "").lower().split())[:max_length]
+
+
+def parse_query(query):
+    """
+    Texte JSON d'une recherche → {champ: valeur} pour CRITERIA_FIELDS.
+    Un texte non JSON est traité comme des mots-clés.
+    """
+    try:
+        params = json.loads(query) if query else {}
+    except (TypeError, ValueError):
+        params = {"q": query}
+    if not isinstance(params, dict):
+        params = {"q": str(params)}
+
+    return {
+        "city_id": _number(params.get("city") or params.get("city_id"), int, MAX_ID),
+        "category": _text(params.get("category"), 20),
+        "listing_type": _text(params.get("listing_type"), 10),
+        "min_price": _price(params.get("min_price")),
+        "max_price": _price(params.get("max_price")),
+        "bedrooms": _number(params.get("bedrooms"), int, MAX_BEDROOMS),
+        "keywords": _text(params.get("q") or params.get("keywords"), 200),
+    }
+
+
+def canonical_query(criteria):
+    """JSON canonique (clés triées, critères vides omis)."""
+    values = {
+        field: str(value) if isinstance(value, Decimal) else value
+        for field, value in criteria.items()
+        if value not in (None, "")
+    }
+    return json.dumps(values, sort_keys=True, separators=(",", ":"))
+
+
+def query_hash(criteria):
+    return hashlib.sha256(canonical_query(criteria).encode()).hexdigest()
@@ -0,0 +1,96 @@
+import json
+import random
+import statistics
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from listings.models import Listing
+from saved_searches.criteria import parse_query
+from saved_searches.matching import build_index
+
+WORDS = ["piscine", "jardin", "meublé", "climatisé", "garage", "terrasse", "forage", "plage", "duplex", "neuf"]
+PRICES = [25_000, 50_000, 75_000, 100_000, 150_000, 250_000, 500_000, 1_000_000, 5_000_000, 20_000_000, 60_000_000]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark du moteur d'alertes : indexe N recherches sauvegardées synthétiques "
+        "(100 000 par défaut) et mesure le temps de correspondance par annonce publiée"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--searches", type=int, default=100_000, help="Nombre de recherches sauvegardées")
+        parser.add_argument("--listings", type=int, default=2_000, help="Nombre d'annonces à faire correspondre")
+        parser.add_argument("--cities", type=int, default=40, help="Nombre de villes distinctes")
+        parser.add_argument("--users", type=int, default=50_000, help="Nombre d'utilisateurs distincts")
+        parser.add_argument("--target-ms", type=float, default=50.0, help="Objectif p95 (ms)")
+        parser.add_argument("--seed", type=int, default=42, help="Graine aléatoire")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        cities = options["cities"]
+        self.stdout.write(self.style.NOTICE(f"=== BENCHMARK ALERTES ({options['searches']} recherches) ==="))
+
+        rows = [
+            {"id": pk, "user_id": rng.randrange(options["users"]), **parse_query(json.dumps(self.random_query(rng, cities)))}
+            for pk in range(1, options["searches"] + 1)
+        ]
+        started = time.perf_counter()
+        index = build_index(rows)
+        self.stdout.write(f" - construction de l'index : {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        timings, matched, candidates = [], 0, 0
+        for _ in range(options["listings"]):
+            listing = self.random_listing(rng, cities)
+            start = time.perf_counter()
+            matches = index.match(listing)
+            timings.append((time.perf_counter() - start) * 1000)
+            matched += len(matches)
+            candidates += sum(1 for _ in index.candidates(listing))
+
+        p50 = statistics.median(timings)
+        p95 = statistics.quantiles(timings, n=100, method="inclusive")[94]
+        count = options["listings"]
+        self.stdout.write(
+            f" - {count} annonces : p50={p50:.3f} ms  p95={p95:.3f} ms  max={max(timings):.3f} ms\n"
+            f" - en moyenne {candidates / count:.0f} candidates vérifiées, {matched / count:.1f} correspondances"
+        )
+        style = self.style.SUCCESS if p95 <= options["target_ms"] else self.style.ERROR
+        self.stdout.write(style(f"Objectif p95 ≤ {options['target_ms']:.0f} ms : {'atteint' if p95 <= options['target_ms'] else 'NON atteint'}"))
+        self.stdout.write(self.style.NOTICE("=== FIN BENCHMARK ==="))
+
+    @staticmethod
+    def random_query(rng, cities):
+        """Recherche plausible : la plupart précisent ville et type, beaucoup une fourchette de prix."""
+        query = {}
+        if rng.random() < 0.8:
+            query["city"] = rng.randint(1, cities)
+        if rng.random() < 0.6:
+            query["category"] = rng.choice(Listing.Category.values)
+        if rng.random() < 0.85:
+            query["listing_type"] = rng.choice(Listing.ListingType.values)
+        if rng.random() < 0.4:
+            query["min_price"] = rng.choice(PRICES[:6])
+        if rng.random() < 0.7:
+            query["max_price"] = rng.choice(PRICES[3:])
+        if rng.random() < 0.2:
+            query["bedrooms"] = rng.randint(1, 4)
+        if rng.random() < 0.15:
+            query["q"] = rng.choice(WORDS)
+        return query
+
+    @staticmethod
+    def random_listing(rng, cities):
+        return SimpleNamespace(
+            city_id=rng.randint(1, cities),
+            category=rng.choice(Listing.Category.values),
+            listing_type=rng.choice(Listing.ListingType.values),
+            price=Decimal(rng.choice(PRICES) + rng.randrange(0, 20_000)),
+            bedrooms=rng.randint(0, 5),
+            title=f"Annonce {' '.join(rng.sample(WORDS, 2))}",
+            description=" ".join(rng.sample(WORDS, 4)),
+            address="",
+        )
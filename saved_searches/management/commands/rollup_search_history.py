@@ -0,0 +1,41 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from saved_searches.rollup import prune_search_history, rollup_search_history
+
+
+class Command(BaseCommand):
+    help = (
+        "Agrège l'historique de recherche en statistiques quotidiennes (SearchDailyStat) "
+        "puis purge les recherches brutes au-delà de la fenêtre de conservation"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="Recalcule à partir de ce jour (AAAA-MM-JJ) au lieu du dernier jour agrégé")
+        parser.add_argument("--keep-days", type=int, help="Jours de recherches brutes conservés (défaut : settings.SEARCH_HISTORY_RAW_DAYS)")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Lignes supprimées par requête")
+        parser.add_argument("--no-prune", action="store_true", help="Agrège sans purger")
+
+    def handle(self, *args, **options):
+        keep_days = options["keep_days"] if options["keep_days"] is not None else getattr(settings, "SEARCH_HISTORY_RAW_DAYS", 30)
+        since = None
+        if options["since"]:
+            try:
+                since = date.fromisoformat(options["since"])
+            except ValueError:
+                raise CommandError("--since attend une date AAAA-MM-JJ.")
+            if since < timezone.localdate() - timedelta(days=keep_days):
+                raise CommandError(f"Les recherches brutes antérieures à {keep_days} jours sont purgées : recalcul impossible.")
+
+        self.stdout.write(self.style.NOTICE("=== AGRÉGATION DE L'HISTORIQUE DE RECHERCHE ==="))
+        days, rows = rollup_search_history(since=since)
+        self.stdout.write(f" - {days} jour(s) agrégé(s), {rows} ligne(s) de statistiques")
+
+        if not options["no_prune"]:
+            deleted = prune_search_history(keep_days, batch_size=options["batch_size"])
+            self.stdout.write(f" - {deleted} recherche(s) brute(s) de plus de {keep_days} jours supprimée(s)")
+
+        self.stdout.write(self.style.SUCCESS("\n✅ Agrégation terminée."))
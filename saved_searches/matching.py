@@ -0,0 +1,127 @@
+# saved_searches/matching.py
+"""
+Correspondance annonce → recherches sauvegardées (« percolateur »).
+
+Plutôt que d'exécuter chaque recherche sauvegardée à la publication d'une annonce,
+on indexe les recherches en mémoire par critères discrets :
+(ville, catégorie, type, tranche de prix), où None signifie « n'importe lequel ».
+Une annonce ne consulte que les 8 combinaisons (valeur | None)³ de sa tranche de
+prix, puis vérifie les critères exacts (bornes de prix, chambres, mots-clés) sur
+ces seules candidates.
+
+L'index est construit une fois par processus et reconstruit quand sa version
+change. La version est lue en base (nombre de recherches, dernier updated_at) :
+une création, modification ou suppression faite par n'importe quel processus
+est vue par le worker, sans dépendre d'un cache partagé. Elle est vérifiée une
+fois par lot d'événements (RecipientResolver, notifications/outbox.py).
+Une mise à jour en masse doit donc renseigner updated_at.
+"""
+import threading
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import product
+
+from django.db.models import Count, Max
+
+from listings.search import tokenize
+from .criteria import CRITERIA_FIELDS
+
+# Bornes basses des tranches de prix (XOF)
+PRICE_BUCKETS = (
+    0, 25_000, 50_000, 100_000, 200_000, 350_000, 500_000, 1_000_000, 2_000_000,
+    5_000_000, 10_000_000, 25_000_000, 50_000_000, 100_000_000, 250_000_000,
+)
+
+
+def price_bucket(price):
+    return max(bisect_right(PRICE_BUCKETS, price) - 1, 0)
+
+
+class SavedSearchIndex:
+    """Index inversé en mémoire des recherches sauvegardées."""
+
+    def __init__(self):
+        self._buckets = defaultdict(list)
+        self.size = 0
+
+    def add(self, search_id, user_id, criteria):
+        """`criteria` : colonnes de SearchCriteria (saved_searches/criteria.py)."""
+        min_price, max_price = criteria["min_price"], criteria["max_price"]
+        if min_price is not None and max_price is not None and min_price > max_price:
+            return  # fourchette vide : ne peut rien trouver
+        terms = frozenset(tokenize(criteria["keywords"]))
+        entry = (search_id, user_id, min_price, max_price, criteria["bedrooms"], terms)
+        low = price_bucket(min_price or 0)
+        high = price_bucket(max_price) if max_price is not None else len(PRICE_BUCKETS) - 1
+        key = (criteria["city_id"], criteria["category"] or None, criteria["listing_type"] or None)
+        # Une entrée par tranche couverte par la fourchette de prix
+        for bucket in range(low, high + 1):
+            self._buckets[(*key, bucket)].append(entry)
+        self.size += 1
+
+    def candidates(self, listing):
+        bucket = price_bucket(listing.price)
+        for key in product((listing.city_id, None), (listing.category, None), (listing.listing_type, None)):
+            yield from self._buckets.get((*key, bucket), ())
+
+    def match(self, listing):
+        """[(search_id, user_id)] des recherches dont tous les critères acceptent l'annonce."""
+        matches, words = [], None
+        for search_id, user_id, min_price, max_price, bedrooms, terms in self.candidates(listing):
+            if min_price is not None and listing.price < min_price:
+                continue
+            if max_price is not None and listing.price > max_price:
+                continue
+            if bedrooms is not None and (listing.bedrooms or 0) < bedrooms:
+                continue
+            if terms:
+                if words is None:
+                    words = set(tokenize(f"{listing.title} {listing.description} {listing.address}"))
+                if not terms <= words:
+                    continue
+            matches.append((search_id, user_id))
+        return matches
+
+
+def build_index(rows):
+    """rows : itérable de dicts {id, user_id, <CRITERIA_FIELDS>}."""
+    index = SavedSearchIndex()
+    for row in rows:
+        index.add(row["id"], row["user_id"], row)
+    return index
+
+
+def matcher_version():
+    """(nombre de recherches, dernière modification) : change à chaque ajout, modification ou suppression."""
+    from .models import SavedSearch
+
+    version = SavedSearch.objects.aggregate(count=Count("id"), updated=Max("updated_at"))
+    return version["count"], version["updated"]
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def get_matcher():
+    """Index à jour des recherches sauvegardées (reconstruit si la version a changé)."""
+    global _index, _index_version
+    from .models import SavedSearch
+
+    version = matcher_version()
+    if _index is None or _index_version != version:
+        with _index_lock:
+            if _index is None or _index_version != version:
+                # Colonnes de critères uniquement : pas de JSON à réinterpréter
+                rows = SavedSearch.objects.values("id", "user_id", *CRITERIA_FIELDS).iterator(chunk_size=5000)
+                _index, _index_version = build_index(rows), version
+    return _index
+
+
+def match_listing(listing, matcher=None):
+    """
+    Identifiants des utilisateurs dont une recherche sauvegardée correspond à l'annonce.
+    `matcher` : index déjà vérifié pour le lot en cours (sinon get_matcher()).
+    """
+    return {user_id for _, user_id in (matcher or get_matcher()).match(listing)}
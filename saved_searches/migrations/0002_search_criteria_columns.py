@@ -0,0 +1,141 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from saved_searches.criteria import CRITERIA_FIELDS, parse_query, query_hash
+
+
+def backfill_criteria(apps, schema_editor):
+    """Colonnes de critères et hash calculés depuis `query`, par lots de clés primaires."""
+    for model_name in ("SavedSearch", "SearchHistory"):
+        model = apps.get_model("saved_searches", model_name)
+        last_pk = 0
+        while True:
+            rows = list(model.objects.filter(pk__gt=last_pk).order_by("pk").only("pk", "query")[:1000])
+            if not rows:
+                break
+            for row in rows:
+                criteria = parse_query(row.query)
+                for field, value in criteria.items():
+                    setattr(row, field, value)
+                row.query_hash = query_hash(criteria)
+            model.objects.bulk_update(rows, ["query_hash", *CRITERIA_FIELDS])
+            last_pk = rows[-1].pk
+
+
+def dedupe_saved_searches(apps, schema_editor):
+    """Avant la contrainte unique (user, query_hash) : garde la recherche modifiée en dernier."""
+    SavedSearch = apps.get_model("saved_searches", "SavedSearch")
+    seen, duplicates = set(), []
+    rows = SavedSearch.objects.order_by("user_id", "query_hash", "-updated_at", "-pk")
+    for pk, user_id, hash_ in rows.values_list("pk", "user_id", "query_hash").iterator(chunk_size=2000):
+        if (user_id, hash_) in seen:
+            duplicates.append(pk)
+        else:
+            seen.add((user_id, hash_))
+    for start in range(0, len(duplicates), 1000):
+        SavedSearch.objects.filter(pk__in=duplicates[start:start + 1000]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agencies', '0003_agencystats'),
+        ('saved_searches', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='savedsearch',
+            name='bedrooms',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='savedsearch',
+            name='category',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='savedsearch',
+            name='city',
+            field=models.ForeignKey(blank=True, db_constraint=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='agencies.city'),
+        ),
+        migrations.AddField(
+            model_name='savedsearch',
+            name='keywords',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='savedsearch',
+            name='listing_type',
+            field=models.CharField(blank=True, default='', editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='savedsearch',
+            name='max_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='savedsearch',
+            name='min_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='savedsearch',
+            name='query_hash',
+            field=models.CharField(default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='searchhistory',
+            name='bedrooms',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='searchhistory',
+            name='category',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='searchhistory',
+            name='city',
+            field=models.ForeignKey(blank=True, db_constraint=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='agencies.city'),
+        ),
+        migrations.AddField(
+            model_name='searchhistory',
+            name='keywords',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='searchhistory',
+            name='listing_type',
+            field=models.CharField(blank=True, default='', editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='searchhistory',
+            name='max_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='searchhistory',
+            name='min_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='searchhistory',
+            name='query_hash',
+            field=models.CharField(default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(backfill_criteria, migrations.RunPython.noop),
+        migrations.RunPython(dedupe_saved_searches, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='searchhistory',
+            index=models.Index(fields=['user', 'query_hash'], name='search_history_user_query'),
+        ),
+        migrations.AddConstraint(
+            model_name='savedsearch',
+            constraint=models.UniqueConstraint(fields=('user', 'query_hash'), name='saved_search_user_query_unique'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agencies', '0003_agencystats'),
+        ('saved_searches', '0002_search_criteria_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('keywords', models.CharField(blank=True, default='', max_length=200)),
+                ('category', models.CharField(blank=True, default='', max_length=20)),
+                ('searches', models.PositiveIntegerField(default=0)),
+                ('results_total', models.PositiveBigIntegerField(default=0)),
+                ('zero_results', models.PositiveIntegerField(default=0)),
+                ('city', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='agencies.city')),
+            ],
+            options={
+                'ordering': ['-day', '-searches'],
+                'indexes': [models.Index(fields=['day', 'city', 'category'], name='search_stat_day_city_cat')],
+            },
+        ),
+    ]
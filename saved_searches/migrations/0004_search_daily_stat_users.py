@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('saved_searches', '0003_search_daily_stat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchdailystat',
+            name='users',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,37 +1,127 @@
 from django.db import models
 from django.conf import settings
 
+from .criteria import CRITERIA_FIELDS, parse_query, query_hash
 
-class SavedSearch(models.Model):
+
+class SearchCriteria(models.Model):
+    """
+    Critères typés extraits de `query` (JSON) à chaque sauvegarde, filtrables en SQL.
+    `query_hash` identifie la forme canonique des critères (saved_searches/criteria.py).
+    """
+    query = models.TextField()  # JSON string containing search parameters
+    query_hash = models.CharField(max_length=64, default="", editable=False)
+
+    # 🔑 Ville sans contrainte en base : un identifiant inconnu ne correspond simplement à rien.
+    # Supprimer une ville ne supprime ni les recherches sauvegardées ni l'historique.
+    city = models.ForeignKey(
+        "agencies.City",
+        on_delete=models.DO_NOTHING,
+        null=True,
+        blank=True,
+        db_constraint=False,
+        related_name="+",
+        editable=False,
+    )
+    category = models.CharField(max_length=20, blank=True, default="", editable=False)
+    listing_type = models.CharField(max_length=10, blank=True, default="", editable=False)
+    min_price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, editable=False)
+    max_price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, editable=False)
+    bedrooms = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    keywords = models.CharField(max_length=200, blank=True, default="", editable=False)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def criteria(self):
+        return {field: getattr(self, field) for field in CRITERIA_FIELDS}
+
+    def apply_query(self):
+        """Recalcule les colonnes de critères et le hash depuis `query`."""
+        criteria = parse_query(self.query)
+        for field, value in criteria.items():
+            setattr(self, field, value)
+        self.query_hash = query_hash(criteria)
+
+    def save(self, *args, **kwargs):
+        self.apply_query()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "query" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "query_hash", *CRITERIA_FIELDS}
+        super().save(*args, **kwargs)
+
+
+class SavedSearch(SearchCriteria):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name='saved_searches'
     )
     name = models.CharField(max_length=100, blank=True)
-    query = models.TextField()  # JSON string containing search parameters
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'query_hash'], name='saved_search_user_query_unique'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.name or self.query[:50]}"
 
 
-class SearchHistory(models.Model):
+class SearchHistory(SearchCriteria):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name='search_history'
     )
-    query = models.TextField()
     results_count = models.PositiveIntegerField(default=0)
     searched_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-searched_at']
+        indexes = [
+            models.Index(fields=['user', 'query_hash'], name='search_history_user_query'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.query[:50]}"
+
+
+class SearchDailyStat(models.Model):
+    """
+    Agrégat quotidien de SearchHistory par (mots-clés normalisés, ville, catégorie),
+    alimenté par `rollup_search_history` ; sert les tendances sans lire la table brute.
+    """
+    day = models.DateField()
+    keywords = models.CharField(max_length=200, blank=True, default="")
+    city = models.ForeignKey(
+        "agencies.City",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        db_constraint=False,
+        related_name="+",
+    )
+    category = models.CharField(max_length=20, blank=True, default="")
+    searches = models.PositiveIntegerField(default=0)
+    # Utilisateurs distincts ce jour-là : seuil d'affichage public des tendances
+    users = models.PositiveIntegerField(default=0)
+    results_total = models.PositiveBigIntegerField(default=0)
+    zero_results = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-day', '-searches']
+        indexes = [
+            models.Index(fields=['day', 'city', 'category'], name='search_stat_day_city_cat'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} - {self.keywords or '*'} ({self.searches})"
+
+    @property
+    def avg_results(self):
+        return self.results_total / self.searches if self.searches else 0
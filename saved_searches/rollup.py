@@ -0,0 +1,113 @@
+# saved_searches/rollup.py
+"""
+Agrégation de SearchHistory en statistiques quotidiennes (SearchDailyStat).
+
+Un jour n'est agrégé qu'une fois complet ; le recalcul d'un jour remplace ses
+lignes (suppression + insertion dans la même transaction), ce qui rend le job
+rejouable. Les lignes brutes ne sont purgées que pour des jours déjà agrégés.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import SearchDailyStat, SearchHistory
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def last_rolled_day():
+    return SearchDailyStat.objects.aggregate(last=Max("day"))["last"]
+
+
+def rollup_search_history(since=None, until=None):
+    """
+    Agrège les jours [since, until[ (par défaut : du lendemain du dernier jour
+    agrégé jusqu'à hier inclus). Retourne (jours agrégés, lignes de stats écrites).
+    """
+    until = until or timezone.localdate()
+    if since is None:
+        last = last_rolled_day()
+        if last is not None:
+            since = last + timedelta(days=1)
+        else:
+            first = SearchHistory.objects.order_by("searched_at").values_list("searched_at", flat=True).first()
+            if first is None:
+                return 0, 0
+            since = timezone.localtime(first).date()
+    if since >= until:
+        return 0, 0
+
+    # Une seule requête groupée pour toute la période
+    rows = (
+        SearchHistory.objects.filter(searched_at__gte=_day_start(since), searched_at__lt=_day_start(until))
+        .annotate(day=TruncDate("searched_at"))
+        .values("day", "keywords", "city_id", "category")
+        .annotate(
+            searches=Count("id"),
+            users=Count("user", distinct=True),
+            results_total=Sum("results_count"),
+            zero_results=Count("id", filter=Q(results_count=0)),
+        )
+        .order_by()
+    )
+    stats = [SearchDailyStat(**row) for row in rows]
+    with transaction.atomic():
+        SearchDailyStat.objects.filter(day__gte=since, day__lt=until).delete()
+        SearchDailyStat.objects.bulk_create(stats, batch_size=1000)
+    return (until - since).days, len(stats)
+
+
+def prune_search_history(keep_days, batch_size=1000):
+    """
+    Supprime les recherches brutes de plus de `keep_days` jours, uniquement pour
+    les jours déjà agrégés, par lots de clés primaires. Retourne le nombre supprimé.
+    """
+    last = last_rolled_day()
+    if last is None:
+        return 0
+    cutoff = min(_day_start(timezone.localdate() - timedelta(days=keep_days)), _day_start(last + timedelta(days=1)))
+    expired = SearchHistory.objects.filter(searched_at__lt=cutoff)
+    deleted = 0
+    while True:
+        ids = list(expired.order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += SearchHistory.objects.filter(pk__in=ids).delete()[0]
+
+
+def trending_searches(days=7, city_id=None, category=None, zero_results=False, limit=10, min_users=None):
+    """
+    Recherches les plus fréquentes des `days` derniers jours agrégés
+    (ou les plus fréquentes sans résultat si `zero_results`).
+
+    Les mots-clés sont saisis librement : une ligne n'apparaît que si, au moins
+    un jour, `min_users` utilisateurs distincts (défaut : SEARCH_TRENDS_MIN_USERS)
+    l'ont recherchée. Une recherche rare, propre à une personne, reste cachée.
+    """
+    if min_users is None:
+        min_users = getattr(settings, "SEARCH_TRENDS_MIN_USERS", 5)
+    stats = SearchDailyStat.objects.filter(day__gte=timezone.localdate() - timedelta(days=days))
+    if city_id:
+        stats = stats.filter(city_id=city_id)
+    if category:
+        stats = stats.filter(category=category)
+    if zero_results:
+        stats = stats.filter(zero_results__gt=0)
+    # Recherche sans aucun critère : rien à montrer
+    stats = stats.exclude(keywords="", city__isnull=True, category="")
+    order = "-zero_results" if zero_results else "-searches"
+    return list(
+        stats.values("keywords", "city_id", "city__name", "category")
+        .annotate(
+            searches=Sum("searches"), results_total=Sum("results_total"),
+            zero_results=Sum("zero_results"), users=Max("users"),
+        )
+        .filter(users__gte=min_users)
+        .order_by(order, "keywords")[:limit]
+    )
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from listings.models import Listing
+
+
+@receiver(post_save, sender=Listing)
+def alert_saved_searches(sender, instance, created, **kwargs):
+    """
+    Annonce qui vient d'être publiée : alerte des recherches sauvegardées
+    (mise en file ; le worker process_notifications calcule les correspondances)
+    """
+    from notifications.outbox import enqueue_notification
+
+    # post_save est émis avant la mise à jour de _loaded_published par Listing.save()
+    if instance.published and not instance.was_published:
+        enqueue_notification(instance, 'saved_search_match')
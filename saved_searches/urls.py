@@ -9,4 +9,6 @@ urlpatterns = [
     path('delete/<int:search_id>/', views.delete_saved_search, name='delete_saved_search'),
     path('history/', views.search_history, name='search_history'),
     path('record/', views.record_search, name='record_search'),
+    path('popular/', views.popular_searches, name='popular_searches'),
+    path('zero-results/', views.zero_result_searches, name='zero_result_searches'),
 ]
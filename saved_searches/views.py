@@ -1,10 +1,22 @@
 from django.shortcuts import render
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 from django.contrib import messages
 import json
+from accounts.models import UserActivity
+from core.permissions import require_role
+from .criteria import parse_query, query_hash
 from .models import SavedSearch, SearchHistory
+from .rollup import trending_searches
+
+
+def criteria_data(search):
+    """Critères normalisés d'une recherche, sérialisables en JSON."""
+    return {
+        field: str(value) if value is not None and field.endswith('_price') else value
+        for field, value in search.criteria.items()
+    }
 
 
 @login_required
@@ -18,15 +30,24 @@ def save_search(request):
         if not query:
             return JsonResponse({'error': 'Query is required'}, status=400)
 
+        if not isinstance(query, str):
+            query = json.dumps(query)
+
+        # Dédoublonnage sur l'index unique (user, query_hash) : critères équivalents = même recherche
         saved_search, created = SavedSearch.objects.get_or_create(
             user=request.user,
-            query=query,
-            defaults={'name': name}
+            query_hash=query_hash(parse_query(query)),
+            defaults={'name': name, 'query': query}
         )
 
         if not created:
             saved_search.name = name
-            saved_search.save()
+            saved_search.save(update_fields=['name', 'updated_at'])
+        activity_type = UserActivity.ActivityType.SEARCH_SAVE if created else UserActivity.ActivityType.SEARCH_UPDATE
+        UserActivity.log_activity(
+            request.user, activity_type, f"Recherche sauvegardée : {name or query}"[:200],
+            content_object=saved_search, request=request,
+        )
 
         return JsonResponse({
             'status': 'saved',
@@ -47,6 +68,7 @@ def saved_searches_list(request):
                 'id': search.id,
                 'name': search.name,
                 'query': search.query,
+                'criteria': criteria_data(search),
                 'created_at': search.created_at.isoformat(),
                 'updated_at': search.updated_at.isoformat()
             }
@@ -60,6 +82,10 @@ def saved_searches_list(request):
 def delete_saved_search(request, search_id):
     try:
         search = SavedSearch.objects.get(id=search_id, user=request.user)
+        UserActivity.log_activity(
+            request.user, UserActivity.ActivityType.SEARCH_DELETE, f"Recherche supprimée : {search.name or search.query}"[:200],
+            metadata={"search_id": search.id}, request=request,
+        )
         search.delete()
         return JsonResponse({'status': 'deleted', 'message': 'Recherche supprimée'})
     except SavedSearch.DoesNotExist:
@@ -74,6 +100,7 @@ def search_history(request):
             {
                 'id': item.id,
                 'query': item.query,
+                'criteria': criteria_data(item),
                 'results_count': item.results_count,
                 'searched_at': item.searched_at.isoformat()
             }
@@ -91,6 +118,8 @@ def record_search(request):
         results_count = data.get('results_count', 0)
 
         if query:
+            if not isinstance(query, str):
+                query = json.dumps(query)
             SearchHistory.objects.create(
                 user=request.user,
                 query=query,
@@ -101,3 +130,47 @@ def record_search(request):
 
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON'}, status=400)
+
+
+# 📈 Tendances (servies par l'agrégat quotidien SearchDailyStat, jamais par la table brute)
+def _trend_params(request):
+    try:
+        days = min(max(int(request.GET.get('days', 7)), 1), 90)
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 50)
+        city_id = int(request.GET['city']) if request.GET.get('city') else None
+    except ValueError:
+        return None
+    return {'days': days, 'limit': limit, 'city_id': city_id, 'category': request.GET.get('category') or None}
+
+
+def _trend_response(request, zero_results):
+    params = _trend_params(request)
+    if params is None:
+        return JsonResponse({'error': 'Paramètres invalides'}, status=400)
+    rows = trending_searches(zero_results=zero_results, **params)
+    return JsonResponse({
+        'days': params['days'],
+        'searches': [
+            {
+                'keywords': row['keywords'],
+                'city': {'id': row['city_id'], 'name': row['city__name']} if row['city_id'] else None,
+                'category': row['category'],
+                'count': row['searches'],
+                'avg_results': round(row['results_total'] / row['searches'], 1) if row['searches'] else 0,
+                'zero_results': row['zero_results'],
+            }
+            for row in rows
+        ]
+    })
+
+
+@require_GET
+def popular_searches(request):
+    return _trend_response(request, zero_results=False)
+
+
+@require_GET
+@require_role('agency_admin')
+def zero_result_searches(request):
+    """Recherches restées sans résultat : demande non couverte par l'offre."""
+    return _trend_response(request, zero_results=True)
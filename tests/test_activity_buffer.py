@@ -0,0 +1,86 @@
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from accounts.activity import ActivityBuffer, shared_stats
+from accounts.models import UserActivity
+
+User = get_user_model()
+
+
+class ActivityBufferTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="actif", password="pass")
+        self.buffer = ActivityBuffer(max_size=5, batch_size=3, flush_interval=None)
+        patcher = mock.patch("accounts.activity.get_activity_buffer", return_value=self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def log(self, activity_type=UserActivity.ActivityType.LOGIN):
+        return UserActivity.log_activity(self.user, activity_type, "Connexion")
+
+    def test_activities_are_written_in_batches(self):
+        self.log()
+        self.log()
+        self.assertFalse(UserActivity.objects.exists())
+        with self.assertNumQueries(1):
+            self.log()  # 3e activité : lot plein, un seul INSERT
+        self.assertEqual(UserActivity.objects.count(), 3)
+
+        self.log()
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self.buffer.stats()["flushed"], 4)
+
+    def test_full_queue_drops_and_counts(self):
+        self.buffer.batch_size = 100
+        for _ in range(7):
+            self.log()
+        self.assertEqual(self.buffer.stats(), {"backlog": 5, "dropped": 2, "sampled_out": 0, "flushed": 0, "failed": 0})
+
+    @override_settings(ACTIVITY_LOG_SAMPLING={"listing_view": 0})
+    def test_sampling_per_activity_type(self):
+        self.log(UserActivity.ActivityType.LISTING_VIEW)
+        self.assertEqual(self.buffer.stats()["sampled_out"], 1)
+        self.assertEqual(self.buffer.stats()["backlog"], 0)
+
+    @override_settings(ACTIVITY_LOG_SYNC=True)
+    def test_sync_mode_writes_immediately(self):
+        activity = self.log()
+        self.assertIsNotNone(activity.pk)
+        self.assertEqual(self.buffer.stats()["backlog"], 0)
+
+    def test_nothing_is_sampled_out_by_default(self):
+        self.assertEqual(settings.ACTIVITY_LOG_SAMPLING, {})
+        self.log(UserActivity.ActivityType.LISTING_VIEW)
+        self.assertEqual(self.buffer.stats()["sampled_out"], 0)
+
+    def test_stats_are_shared_through_the_cache(self):
+        self.buffer.max_size = 2
+        self.buffer.queue.maxsize = 2
+        for _ in range(3):
+            self.log()
+        self.buffer.flush()
+        self.assertEqual(shared_stats(), {"dropped": 1, "sampled_out": 0, "flushed": 2, "failed": 0})
+        self.buffer.flush()  # rien de nouveau : pas de double comptage
+        self.assertEqual(shared_stats()["flushed"], 2)
+
+        out = StringIO()
+        call_command("activity_log_stats", "--reset", stdout=out)
+        self.assertIn("2", out.getvalue())
+        self.assertEqual(shared_stats()["flushed"], 0)
+
+    @override_settings(ACTIVITY_LOG_SYNC=True)
+    def test_views_log_activities(self):
+        self.client.post(reverse("login"), {"username": "actif", "password": "pass"})
+        self.client.get(reverse("logout"))
+        self.assertEqual(
+            list(UserActivity.objects.filter(user=self.user).order_by("id").values_list("activity_type", flat=True)),
+            [UserActivity.ActivityType.LOGIN, UserActivity.ActivityType.LOGOUT],
+        )
@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from accounts.models import Appointment
+from agencies.models import Agency, AgencyStats
+from listings.models import Listing
+
+User = get_user_model()
+
+COUNTERS = (
+    "total_listings", "published_listings", "users_count",
+    "appointments_pending", "appointments_confirmed",
+    "appointments_completed", "appointments_cancelled",
+)
+
+
+class AgencyStatsTests(TestCase):
+    def setUp(self):
+        self.alpha = Agency.objects.create(name="Alpha")
+        self.beta = Agency.objects.create(name="Beta")
+        self.agent = User.objects.create_user(
+            username="agent", password="pass", role=User.Roles.AGENT, agency=self.alpha
+        )
+        self.customer = User.objects.create_user(username="client", password="pass")
+
+    def create_listing(self, agency, published=False):
+        return Listing.objects.create(
+            title=f"Annonce {Listing.objects.count()}", category="house", listing_type="rent",
+            price=1000, agency=agency, owner=self.agent, published=published,
+        )
+
+    def snapshot(self, agency):
+        stats = AgencyStats.objects.get(agency=agency)
+        return {field: getattr(stats, field) for field in COUNTERS}
+
+    def assert_matches_rebuild(self):
+        incremental = {agency.pk: self.snapshot(agency) for agency in (self.alpha, self.beta)}
+        call_command("rebuild_agency_stats", verbosity=0)
+        rebuilt = {agency.pk: self.snapshot(agency) for agency in (self.alpha, self.beta)}
+        self.assertEqual(incremental, rebuilt)
+
+    def test_listing_lifecycle_updates_counters(self):
+        listing = self.create_listing(self.alpha)
+        self.create_listing(self.alpha, published=True)
+        self.create_listing(self.beta, published=True)
+
+        listing.published = True
+        listing.save()
+        self.assertEqual(self.snapshot(self.alpha)["published_listings"], 2)
+
+        listing.agency = self.beta
+        listing.save()
+        listing.delete()
+        alpha = AgencyStats.objects.get(agency=self.alpha)
+        self.assertEqual((alpha.total_listings, alpha.published_listings, alpha.draft_listings), (1, 1, 0))
+        self.assertEqual(self.snapshot(self.beta)["total_listings"], 1)
+        self.assert_matches_rebuild()
+
+    def test_users_and_appointments_update_counters(self):
+        listing = self.create_listing(self.alpha, published=True)
+        User.objects.create_user(username="agent2", password="pass", role=User.Roles.AGENT, agency=self.alpha)
+        self.agent.agency = self.beta
+        self.agent.save()
+
+        appointment = Appointment.objects.create(
+            listing=listing, agent=self.agent, customer=self.customer,
+            scheduled_date=timezone.now() + timedelta(days=2),
+        )
+        appointment.status = Appointment.Status.CONFIRMED
+        appointment.save()
+
+        stats = self.snapshot(self.alpha)
+        self.assertEqual(stats["users_count"], 1)
+        self.assertEqual((stats["appointments_pending"], stats["appointments_confirmed"]), (0, 1))
+        self.assertEqual(self.snapshot(self.beta)["users_count"], 1)
+        self.assert_matches_rebuild()
+
+    def test_rebuild_repairs_drift(self):
+        self.create_listing(self.alpha, published=True)
+        AgencyStats.objects.filter(agency=self.alpha).update(total_listings=42, published_listings=7)
+        call_command("rebuild_agency_stats", "--agency", str(self.alpha.pk), verbosity=0)
+        stats = self.snapshot(self.alpha)
+        self.assertEqual((stats["total_listings"], stats["published_listings"]), (1, 1))
@@ -0,0 +1,56 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from listings.models import Listing, ListingPhoto
+from listings.serializers import ListingReadSerializer
+from agencies.models import Agency, City, District, Region
+
+User = get_user_model()
+
+
+class ListingApiQueryCountTests(TestCase):
+    """Le nombre de requêtes ne doit pas dépendre de la taille de la page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(name="Maritime")
+        district = District.objects.create(name="Golfe", region=region)
+        city = City.objects.create(name="Lomé", district=district)
+        agency = Agency.objects.create(name="Agence API", city=city)
+        cls.admin = User.objects.create_user(
+            username="platform", password="pass", role=User.Roles.ADMIN_PLATFORM
+        )
+        for i in range(30):
+            listing = Listing.objects.create(
+                title=f"Annonce {i}", category="house", listing_type="rent", price=1000 + i,
+                city=city, agency=agency, owner=cls.admin, published=True,
+            )
+            ListingPhoto.objects.create(listing=listing, image=f"listings/photos/{i}-a.jpg", order=0)
+            ListingPhoto.objects.create(listing=listing, image=f"listings/photos/{i}-b.jpg", order=1, is_cover=True)
+            ListingPhoto.objects.create(listing=listing, image=f"listings/photos/{i}-c.jpg", order=2)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_list_query_count_is_independent_of_page_size(self):
+        for page_size in (1, 10, 30):
+            with self.subTest(page_size=page_size), self.assertNumQueries(3):
+                response = self.client.get("/api/listings/", {"page_size": page_size})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data["results"]), page_size)
+
+    def test_cover_and_gallery_are_computed_from_prefetched_photos(self):
+        response = self.client.get("/api/listings/", {"page_size": 1})
+        item = response.data["results"][0]
+        self.assertTrue(item["cover_photo"].endswith("-b.jpg"))
+        self.assertEqual(len(item["gallery_photos"]), 2)
+        self.assertNotIn(item["cover_photo"], item["gallery_photos"])
+
+    def test_read_serializer_query_count(self):
+        queryset = Listing.objects.select_related("city", "district__region", "agency", "owner").with_photos()
+        with self.assertNumQueries(2):
+            data = ListingReadSerializer(queryset, many=True).data
+        self.assertEqual(len(data), 30)
+        self.assertEqual(data[0]["district"], "Golfe (Maritime)")
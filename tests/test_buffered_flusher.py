@@ -0,0 +1,44 @@
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.buffered import BufferedFlusher, process_flusher
+
+
+class RecordingFlusher(BufferedFlusher):
+    thread_name = "test-flusher"
+
+    def __init__(self, flush_interval=None):
+        super().__init__(flush_interval)
+        self.flushed = threading.Event()
+        self.calls = 0
+
+    def flush(self):
+        self.calls += 1
+        self.flushed.set()
+
+
+class BufferedFlusherTests(SimpleTestCase):
+    def test_full_batch_is_flushed_in_the_caller_without_thread(self):
+        flusher = RecordingFlusher()
+        flusher.after_add(False)
+        self.assertEqual(flusher.calls, 0)
+        flusher.after_add(True)
+        self.assertEqual(flusher.calls, 1)
+        self.assertIsNone(flusher._thread)
+
+    def test_full_batch_wakes_the_background_thread(self):
+        flusher = RecordingFlusher(flush_interval=60)
+        flusher.after_add(True)
+        self.assertTrue(flusher.flushed.wait(2))
+        self.assertEqual(flusher._thread.name, "test-flusher")
+        self.assertTrue(flusher._thread.daemon)
+
+    def test_process_flusher_is_created_once_and_flushed_at_exit(self):
+        factory = mock.Mock(side_effect=RecordingFlusher)
+        with mock.patch("core.buffered.atexit.register") as register:
+            get = process_flusher(factory)
+            self.assertIs(get(), get())
+        factory.assert_called_once_with()
+        register.assert_called_once_with(get().flush)
@@ -0,0 +1,49 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from agencies.models import Agency
+from notifications.models import Notification
+
+User = get_user_model()
+
+
+class BulkNotifyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create([User(username=f"user{i}") for i in range(25)])
+        User.objects.bulk_create([User(username=f"agent{i}", role=User.Roles.AGENT) for i in range(5)])
+
+    def test_streams_recipients_by_chunks(self):
+        # 30 destinataires, blocs de 10 : 4 lectures (dont la dernière vide) + 3 INSERT
+        with self.assertNumQueries(7):
+            sent = Notification.bulk_notify(
+                User.objects.all(), Notification.NotificationType.MAINTENANCE,
+                "Maintenance", "Coupure ce soir", chunk_size=10, batch_size=10,
+            )
+        self.assertEqual(sent, 30)
+        self.assertEqual(Notification.objects.filter(notification_type="maintenance").count(), 30)
+
+    def test_content_object_is_attached(self):
+        agency = Agency.objects.create(name="Agence Diffusion")
+        Notification.bulk_notify(User.objects.filter(role=User.Roles.AGENT), "system_alert", "t", "m", content_object=agency)
+        self.assertEqual(
+            {n.content_object for n in Notification.objects.all()}, {agency}
+        )
+
+    def test_broadcast_command_can_resume(self):
+        out = StringIO()
+        call_command("broadcast_notification", "Alerte", "Message", "--role", "agent", stdout=out)
+        event_id = Notification.objects.values_list("event_id", flat=True).first()
+        self.assertIn(str(event_id), out.getvalue())
+
+        self.assertIn("5 notification(s) créée(s)", out.getvalue())
+
+        Notification.objects.filter(event_id=event_id, user__username="agent0").delete()
+        out = StringIO()
+        call_command("broadcast_notification", "Alerte", "Message", "--event-id", str(event_id), stdout=out)
+        self.assertEqual(Notification.objects.filter(event_id=event_id).count(), 30)
+        # Seuls les destinataires manquants (25 utilisateurs + agent0) sont comptés
+        self.assertIn("26 notification(s) créée(s)", out.getvalue())
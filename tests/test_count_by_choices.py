@@ -0,0 +1,49 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from accounts.models import Appointment
+from agencies.models import Agency
+from core.aggregates import count_by_choices
+from listings.models import Listing
+
+User = get_user_model()
+
+
+class CountByChoicesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        agency = Agency.objects.create(name="Agence Compteurs")
+        cls.agent = User.objects.create_user(
+            username="agent", password="pass", role=User.Roles.AGENT, agency=agency
+        )
+        for i, published in enumerate([True, True, False]):
+            Listing.objects.create(
+                title=f"Annonce {i}", category="house", listing_type="rent", price=1000,
+                agency=agency, owner=cls.agent, published=published,
+            )
+
+    def test_boolean_breakdown_in_one_query(self):
+        with self.assertNumQueries(1):
+            counts = count_by_choices(Listing.objects.all(), "published", {"published": True, "draft": False})
+        self.assertEqual(counts, {"published": 2, "draft": 1, "total": 3})
+
+    def test_choices_enum_breakdown(self):
+        with self.assertNumQueries(1):
+            counts = count_by_choices(Appointment.objects.all(), "status", Appointment.Status)
+        self.assertEqual(counts, {"pending": 0, "confirmed": 0, "cancelled": 0, "completed": 0, "total": 0})
+
+    def test_manage_listings_uses_single_count_query(self):
+        self.client.force_login(self.agent)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("manage_listings"))
+        self.assertEqual(response.status_code, 200)
+        # Publiées et brouillons comptés ensemble : une seule requête COUNT sur les annonces
+        count_queries = [
+            query["sql"] for query in queries.captured_queries
+            if "COUNT(" in query["sql"] and "listings_listing" in query["sql"]
+        ]
+        self.assertEqual(len(count_queries), 1, count_queries)
+        self.assertEqual((response.context["published_count"], response.context["draft_count"]), (2, 1))
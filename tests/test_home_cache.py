@@ -0,0 +1,83 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from accounts.models import UserActivity
+from agencies.models import Agency
+from core.checks import check_shared_cache
+from core.fragment_cache import FragmentCache
+from core.fragments import HOME_STATS, HOME_TIMELINE
+from listings.models import Listing
+
+User = get_user_model()
+
+
+class HomeFragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for fragment in FragmentCache.registry.values():
+            fragment.reset_stats()
+        self.agency = Agency.objects.create(name="Agence Accueil")
+
+    def create_listing(self, title):
+        return Listing.objects.create(
+            title=title, category="house", listing_type="rent", price=1000,
+            agency=self.agency, published=True,
+        )
+
+    def test_second_hit_is_served_from_cache(self):
+        self.create_listing("Villa cache")
+        self.client.get(reverse("home"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("home"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["stats"]["listings_count"], 1)
+        self.assertEqual(HOME_STATS.stats()["hits"], 1)
+
+    def test_timeline_hides_private_activity(self):
+        user = User.objects.create_user(username="alice", password="pass")
+        self.client.get(reverse("home"))
+        UserActivity.objects.create(user=user, activity_type="login", title="Connexion par alice")
+        UserActivity.objects.create(user=user, activity_type="search_save", title="Villa à Lomé < 50M")
+        response = self.client.get(reverse("home"))
+        # Le journal d'activité n'apparaît pas et ne périme pas le bloc
+        self.assertNotContains(response, "Connexion par alice")
+        self.assertNotContains(response, "Villa à Lomé")
+        self.assertEqual(HOME_TIMELINE.stats()["hits"], 1)
+
+    def test_saving_a_model_bumps_dependent_fragments(self):
+        self.client.get(reverse("home"))
+        self.create_listing("Nouvelle villa")
+        response = self.client.get(reverse("home"))
+        self.assertEqual(response.context["stats"]["listings_count"], 1)
+        self.assertEqual([l.title for l in response.context["recent_listings"]], ["Nouvelle villa"])
+
+        Listing.objects.get().delete()
+        response = self.client.get(reverse("home"))
+        self.assertEqual(response.context["stats"]["listings_count"], 0)
+        self.assertEqual(HOME_STATS.stats()["misses"], 3)
+
+    def test_stats_command_reports_and_resets_counters(self):
+        self.client.get(reverse("home"))
+        out = StringIO()
+        call_command("fragment_cache_stats", "--reset", stdout=out)
+        self.assertIn("home:stats", out.getvalue())
+        self.assertEqual(HOME_STATS.stats()["misses"], 0)
+
+    def test_counters_stay_in_process_without_atomic_incr(self):
+        # FileBasedCache : incr() = lecture + écriture de fichier, pas de compteur dans le cache
+        self.assertFalse(HOME_STATS.shared_stats)
+        self.client.get(reverse("home"))
+        self.client.get(reverse("home"))
+        self.assertIsNone(cache.get(HOME_STATS._key("hits")))
+        self.assertEqual((HOME_STATS.stats()["hits"], HOME_STATS.stats()["misses"]), (1, 1))
+
+    def test_process_local_cache_is_reported_by_system_check(self):
+        self.assertEqual(check_shared_cache(None), [])
+        locmem = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        with override_settings(CACHES=locmem):
+            self.assertEqual([warning.id for warning in check_shared_cache(None)], ["core.W001"])
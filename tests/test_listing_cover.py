@@ -0,0 +1,64 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from listings.models import Listing, ListingPhoto
+from agencies.models import Agency, City, District, Region
+
+User = get_user_model()
+
+
+class ListingWithCoverTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(name="Maritime")
+        district = District.objects.create(name="Golfe", region=region)
+        cls.city = City.objects.create(name="Lomé", district=district)
+        cls.agency = Agency.objects.create(name="Agence Cover", city=cls.city)
+        cls.owner = User.objects.create_user(
+            username="agent_cover", password="pass", role=User.Roles.AGENT, agency=cls.agency
+        )
+
+        cls.with_flag = cls._listing("Avec couverture")
+        ListingPhoto.objects.create(listing=cls.with_flag, image="listings/photos/a.jpg", order=0)
+        cls.flagged = ListingPhoto.objects.create(
+            listing=cls.with_flag, image="listings/photos/b.jpg", order=1, is_cover=True
+        )
+
+        cls.without_flag = cls._listing("Sans couverture")
+        cls.first = ListingPhoto.objects.create(listing=cls.without_flag, image="listings/photos/c.jpg", order=0)
+        ListingPhoto.objects.create(listing=cls.without_flag, image="listings/photos/d.jpg", order=3)
+
+        cls.no_photo = cls._listing("Sans photo")
+
+    @classmethod
+    def _listing(cls, title):
+        return Listing.objects.create(
+            title=title, category="house", listing_type="sale", price=1000,
+            city=cls.city, agency=cls.agency, owner=cls.owner, published=True,
+        )
+
+    def test_with_cover_resolves_cover_and_fallback(self):
+        listings = {l.pk: l for l in Listing.objects.with_cover()}
+        self.assertEqual(listings[self.with_flag.pk].cover, self.flagged)
+        self.assertEqual(listings[self.without_flag.pk].cover, self.first)
+        self.assertIsNone(listings[self.no_photo.pk].cover)
+
+    def test_with_cover_uses_fixed_number_of_queries(self):
+        with self.assertNumQueries(2):
+            covers = [l.cover for l in Listing.objects.with_cover()]
+        self.assertEqual(len(covers), 3)
+
+    def test_cover_without_prefetch(self):
+        listing = Listing.objects.get(pk=self.with_flag.pk)
+        self.assertEqual(listing.cover, self.flagged)
+
+    def test_listing_list_does_not_query_per_listing(self):
+        self.client.get(reverse("listing_list"))
+        for i in range(5):
+            listing = self._listing(f"Extra {i}")
+            ListingPhoto.objects.create(listing=listing, image=f"listings/photos/x{i}.jpg")
+
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse("listing_list"))
+        self.assertEqual(response.status_code, 200)
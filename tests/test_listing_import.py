@@ -0,0 +1,201 @@
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from agencies.models import Agency, AgencyStats, City, District, Region
+from listings.importer import run_import
+from listings.models import Listing, ListingImport
+from listings.search import search_listings
+from notifications.models import Notification, NotificationEvent
+from notifications.outbox import deliver_pending
+
+User = get_user_model()
+
+TMP_DIR = tempfile.mkdtemp()
+MEDIA_ROOT = os.path.join(TMP_DIR, "media")
+
+FIELDS = ["title", "category", "listing_type", "price", "city", "district", "bedrooms", "published", "description"]
+
+
+def csv_bytes(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def row(title, city="Lomé", price="150000", **extra):
+    return {"title": title, "category": "house", "listing_type": "rent", "price": price, "city": city, **extra}
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, LISTING_SEARCH_INDEX=Path(TMP_DIR) / "index.sqlite3")
+class ListingImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agency = Agency.objects.create(name="Agence Import")
+        cls.admin = User.objects.create_user(
+            username="admin_agence", password="pass", role=User.Roles.AGENCY_ADMIN, agency=cls.agency
+        )
+        cls.agent = User.objects.create_user(
+            username="agent", password="pass", role=User.Roles.AGENT, agency=cls.agency
+        )
+        maritime = Region.objects.create(name="Maritime")
+        golfe = District.objects.create(name="Golfe", region=maritime)
+        lacs = District.objects.create(name="Lacs", region=maritime)
+        cls.lome = City.objects.create(name="Lomé", district=golfe)
+        cls.agoe_golfe = City.objects.create(name="Agoè", district=golfe)
+        cls.agoe_lacs = City.objects.create(name="Agoè", district=lacs)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+    def run_csv(self, rows, batch_size=500, user=None):
+        listing_import = ListingImport.objects.create(
+            agency=self.agency, user=user or self.agent, source_name="annonces.csv"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            run_import(listing_import, io.BytesIO(csv_bytes(rows)), batch_size=batch_size)
+        return listing_import
+
+    def test_csv_rows_are_validated_resolved_and_bulk_created(self):
+        listing_import = self.run_csv([
+            row("Villa avec piscine", city="lome", published="true", bedrooms="4"),
+            row("Villa avec piscine"),
+            row("Studio Agoè", city="Agoè", district="Lacs"),
+            row("Prix invalide", price="beaucoup"),
+            row("Ville inconnue", city="Atlantis"),
+            row("Ville ambiguë", city="Agoè"),
+        ])
+
+        self.assertEqual(listing_import.status, ListingImport.Status.DONE)
+        self.assertEqual(
+            (listing_import.total_rows, listing_import.created_count, listing_import.error_count), (6, 3, 3)
+        )
+        listings = Listing.objects.filter(agency=self.agency).order_by("pk")
+        villa, copy, studio = listings
+        self.assertEqual((villa.city, villa.district_id, villa.region_id), (self.lome, self.lome.district_id,
+                                                                           self.lome.district.region_id))
+        self.assertTrue(villa.published)
+        self.assertEqual(villa.bedrooms, 4)
+        self.assertEqual(villa.owner, self.agent)
+        self.assertEqual(studio.city, self.agoe_lacs)
+        self.assertEqual(len({listing.slug for listing in listings}), 3)
+        self.assertEqual(copy.slug, f"{villa.slug}-2")
+
+        # Signaux de Listing.save non déclenchés : aucune notification par annonce
+        self.assertFalse(NotificationEvent.objects.filter(notification_type="listing_created").exists())
+        stats = AgencyStats.objects.get(agency=self.agency)
+        self.assertEqual((stats.total_listings, stats.published_listings), (3, 1))
+        self.assertEqual(list(search_listings(Listing.objects.all(), "piscine")), [villa, copy])
+
+        with listing_import.error_report.open("rb") as handle:
+            report = list(csv.DictReader(io.TextIOWrapper(handle, encoding="utf-8")))
+        self.assertEqual([line["ligne"] for line in report], ["5", "6", "7"])
+        self.assertIn("price", json.loads(report[0]["erreurs"]))
+        self.assertIn("Atlantis", report[1]["erreurs"])
+        self.assertIn("ambiguë", report[2]["erreurs"])
+        self.assertEqual(json.loads(report[0]["donnees"])["title"], "Prix invalide")
+
+    def test_imported_listings_are_indexed_without_returned_pks(self):
+        bulk_create = QuerySet.bulk_create
+
+        def without_pks(queryset, objs, *args, **kwargs):
+            # MySQL : bulk_create ne renseigne pas les clés primaires
+            created = bulk_create(queryset, objs, *args, **kwargs)
+            for obj in created:
+                obj.pk = None
+            return created
+
+        with mock.patch.object(QuerySet, "bulk_create", without_pks):
+            self.run_csv([row("Duplex vue mer"), row("Duplex vue mer"), row("Terrain nu")])
+
+        duplexes = list(Listing.objects.filter(title="Duplex vue mer").order_by("pk"))
+        self.assertEqual(len(duplexes), 2)
+        self.assertEqual(list(search_listings(Listing.objects.all(), "duplex")), duplexes)
+
+    def test_queries_do_not_grow_with_rows(self):
+        def count_queries(rows):
+            with CaptureQueriesContext(connection) as queries:
+                self.run_csv(rows, batch_size=1000)
+            return len(queries)
+
+        small = count_queries([row(f"Petit lot {i}") for i in range(5)])
+        large = count_queries([row(f"Grand lot {i}") for i in range(40)])
+        self.assertEqual(small, large)
+
+    def test_one_summary_notification(self):
+        listing_import = self.run_csv([row("Maison récapitulatif"), row("Sans prix", price="")])
+        events = NotificationEvent.objects.filter(notification_type="listing_import_done")
+        self.assertEqual(events.count(), 1)
+
+        deliver_pending()
+        notifications = Notification.objects.filter(notification_type="listing_import_done")
+        self.assertEqual({n.user for n in notifications}, {self.agent, self.admin})
+        message = notifications.first().message
+        self.assertIn("1 annonce(s) importée(s)", message)
+        self.assertIn("1 ligne(s) refusée(s) sur 2", message)
+        self.assertEqual(
+            notifications.first().action_url,
+            reverse("cockpit_admin:listings_listingimport_change", args=[listing_import.pk]),
+        )
+
+    def test_command_imports_jsonl(self):
+        path = Path(TMP_DIR) / "annonces.jsonl"
+        path.write_text("\n".join([
+            json.dumps({"title": "Terrain JSON", "category": "land", "listing_type": "sale",
+                        "price": 5000000, "city": self.lome.pk}),
+            "{pas du json",
+            "",
+            json.dumps({"title": "Bureau JSON", "category": "office", "listing_type": "rent", "price": 300000}),
+        ]), encoding="utf-8")
+
+        out = StringIO()
+        call_command("import_listings", str(path), "--agency", str(self.agency.pk), "--owner", "agent", stdout=out)
+
+        listing_import = ListingImport.objects.get()
+        self.assertEqual((listing_import.created_count, listing_import.error_count), (2, 1))
+        self.assertEqual(Listing.objects.get(title="Terrain JSON").region_id, self.lome.district.region_id)
+        self.assertIn("2 annonce(s) importée(s), 1 ligne(s) refusée(s)", out.getvalue())
+        self.assertIn(listing_import.error_report.path, out.getvalue())
+
+    def test_admin_upload_runs_the_import(self):
+        self.admin.is_staff = True
+        self.admin.save()
+        self.client.force_login(self.admin)
+        upload = SimpleUploadedFile("agence.csv", csv_bytes([row("Maison admin"), row("Appartement admin")]))
+
+        response = self.client.post(
+            reverse("cockpit_admin:listings_listingimport_add"),
+            {"agency": self.agency.pk, "source": upload},
+        )
+
+        self.assertEqual(response.status_code, 302)
+        listing_import = ListingImport.objects.get()
+        self.assertEqual((listing_import.user, listing_import.created_count), (self.admin, 2))
+        self.assertEqual(listing_import.source_name, "agence.csv")
+        self.assertEqual(Listing.objects.filter(owner=self.admin).count(), 2)
+
+        bad = SimpleUploadedFile("agence.xlsx", b"binaire")
+        response = self.client.post(
+            reverse("cockpit_admin:listings_listingimport_add"), {"agency": self.agency.pk, "source": bad}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ListingImport.objects.count(), 1)
@@ -0,0 +1,72 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from listings.models import Listing
+from agencies.models import Agency, City, District, Region
+
+User = get_user_model()
+
+
+class ListingDenormalizedLocationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.maritime = Region.objects.create(name="Maritime")
+        cls.kara = Region.objects.create(name="Kara")
+        cls.golfe = District.objects.create(name="Golfe", region=cls.maritime)
+        cls.kozah = District.objects.create(name="Kozah", region=cls.kara)
+        cls.lome = City.objects.create(name="Lomé", district=cls.golfe)
+        cls.kara_city = City.objects.create(name="Kara", district=cls.kozah)
+        cls.agency = Agency.objects.create(name="Agence Régions")
+
+    def create_listing(self, city, **kwargs):
+        return Listing.objects.create(
+            title=f"Maison {Listing.objects.count()}", category="house", listing_type="rent", price=1000,
+            city=city, agency=self.agency, published=True, **kwargs,
+        )
+
+    def test_save_copies_district_and_region_from_city(self):
+        listing = self.create_listing(self.lome)
+        self.assertEqual((listing.district_id, listing.region_id), (self.golfe.id, self.maritime.id))
+
+        listing = Listing.objects.get(pk=listing.pk)
+        listing.city = self.kara_city
+        listing.save()
+        listing.refresh_from_db()
+        self.assertEqual((listing.district_id, listing.region_id), (self.kozah.id, self.kara.id))
+
+    def test_moving_city_or_district_updates_listings(self):
+        listing = self.create_listing(self.lome)
+
+        self.lome.district = self.kozah
+        self.lome.save()
+        listing.refresh_from_db()
+        self.assertEqual((listing.district_id, listing.region_id), (self.kozah.id, self.kara.id))
+
+        self.kozah.region = self.maritime
+        self.kozah.save()
+        listing.refresh_from_db()
+        self.assertEqual(listing.region_id, self.maritime.id)
+
+    def test_sync_command_repairs_bulk_updates(self):
+        listings = [self.create_listing(self.lome) for _ in range(3)]
+        Listing.objects.filter(pk=listings[0].pk).update(city=self.kara_city)
+        Listing.objects.filter(pk=listings[1].pk).update(district=None, region=None)
+
+        out = StringIO()
+        call_command("sync_listing_locations", "--batch-size", "2", stdout=out)
+        self.assertIn("2 annonce(s) corrigée(s)", out.getvalue())
+        self.assertEqual(
+            set(Listing.objects.values_list("region_id", flat=True)), {self.kara.id, self.maritime.id}
+        )
+        self.assertEqual(Listing.objects.get(pk=listings[0].pk).region_id, self.kara.id)
+
+    def test_region_page_filters_on_denormalized_region(self):
+        self.create_listing(self.lome)
+        self.create_listing(self.kara_city)
+        response = self.client.get(reverse("region_listings", args=[self.kara.slug]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["stats"]["total"], 1)
@@ -0,0 +1,143 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from agencies.models import Agency, City, District, Region
+from listings.filters import ListingFilter
+from listings.models import Listing
+from listings.search import build_match, get_search_index, search_listings, tokenize
+
+User = get_user_model()
+
+
+class TokenizeTests(TestCase):
+    def test_accents_case_and_stopwords(self):
+        self.assertEqual(tokenize("Villa MEUBLÉE avec piscine à Lomé"), ["villa", "meubl", "piscin", "lome"])
+
+    def test_plural_and_singular_share_a_stem(self):
+        self.assertEqual(tokenize("appartements"), tokenize("Appartement"))
+        self.assertEqual(tokenize("chambres"), tokenize("chambre"))
+        self.assertEqual(tokenize("meublées"), tokenize("meublé"))
+
+    def test_build_match_prefixes_last_term(self):
+        self.assertEqual(build_match("maison jardin"), '"maison" "jardin"*')
+        self.assertIsNone(build_match("de la"))
+
+
+class ListingSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agency = Agency.objects.create(name="Agence Recherche")
+        cls.owner = User.objects.create_user(
+            username="owner", password="pass", role=User.Roles.AGENCY_ADMIN, agency=cls.agency
+        )
+        region = Region.objects.create(name="Maritime")
+        district = District.objects.create(name="Golfe", region=region)
+        cls.lome = City.objects.create(name="Lomé", district=district)
+        cls.kara = City.objects.create(
+            name="Kara", district=District.objects.create(name="Kozah", region=Region.objects.create(name="Kara"))
+        )
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        settings_override = override_settings(LISTING_SEARCH_INDEX=Path(directory) / "index.sqlite3")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(lambda: get_search_index().close())
+
+    def create(self, title, description="", city=None, **extra):
+        values = dict(category="house", listing_type="rent", price=100000, published=True)
+        values.update(extra)
+        with self.captureOnCommitCallbacks(execute=True):
+            return Listing.objects.create(
+                title=title, description=description, city=city or self.lome,
+                agency=self.agency, owner=self.owner, **values
+            )
+
+    def test_title_match_ranks_above_description_match(self):
+        in_description = self.create("Maison familiale", "Grande maison avec piscine et jardin")
+        in_title = self.create("Villa avec piscine", "Belle villa")
+        self.create("Studio meublé", "Centre-ville")
+
+        results = list(search_listings(Listing.objects.all(), "piscine"))
+
+        self.assertEqual(results, [in_title, in_description])
+
+    def test_accents_and_plurals_are_ignored(self):
+        listing = self.create("Appartements meublés climatisés")
+
+        self.assertEqual(list(search_listings(Listing.objects.all(), "appartement meuble")), [listing])
+        self.assertEqual(list(search_listings(Listing.objects.all(), "CLIMATISE")), [listing])
+
+    def test_location_names_are_searchable(self):
+        listing = self.create("Terrain titré", city=self.kara)
+        self.create("Terrain loti")
+
+        self.assertEqual(list(search_listings(Listing.objects.all(), "terrain kara")), [listing])
+
+    def test_structured_filters_are_applied_in_the_index(self):
+        cheap = self.create("Villa piscine", price=50000)
+        self.create("Villa piscine de luxe", price=900000)
+        self.create("Villa piscine à vendre", listing_type="sale", price=60000)
+        self.create("Villa piscine Kara", city=self.kara, price=40000)
+
+        results = search_listings(
+            Listing.objects.all(), "villa", listing_type="rent", city_id=self.lome.pk, max_price=100000
+        )
+
+        self.assertEqual(list(results), [cheap])
+
+    def test_index_follows_updates_and_deletes(self):
+        listing = self.create("Bureau moderne")
+        with self.captureOnCommitCallbacks(execute=True):
+            listing.title = "Magasin moderne"
+            listing.save()
+        self.assertFalse(search_listings(Listing.objects.all(), "bureau").exists())
+        self.assertTrue(search_listings(Listing.objects.all(), "magasin").exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            listing.delete()
+        self.assertEqual(get_search_index().count("magasin"), 0)
+
+    def test_city_rename_reindexes_its_listings(self):
+        listing = self.create("Duplex neuf")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lome.name = "Lomé Centre"
+            self.lome.save()
+
+        self.assertEqual(list(search_listings(Listing.objects.all(), "duplex centre")), [listing])
+
+    def test_rebuild_replaces_index_content(self):
+        listing = self.create("Maison jardin")
+        index = get_search_index()
+        index.remove([listing.pk])
+        self.assertEqual(index.count("jardin"), 0)
+
+        total = index.rebuild([Listing.objects.select_related("city", "district", "region")])
+
+        self.assertEqual(total, 1)
+        self.assertEqual(index.count("jardin"), 1)
+
+    def test_listing_list_keyword_search(self):
+        match = self.create("Villa avec piscine")
+        self.create("Studio meublé")
+        self.create("Villa piscine brouillon", published=False)
+
+        response = self.client.get(reverse("listing_list"), {"q": "piscine"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["page_obj"]), [match])
+        self.assertEqual(response.context["filters"]["q"], "piscine")
+
+    def test_listing_filter_q(self):
+        match = self.create("Villa piscine", price=50000)
+        self.create("Villa piscine de standing", price=500000)
+
+        queryset = ListingFilter({"q": "villa", "max_price": 100000}, queryset=Listing.objects.all()).qs
+
+        self.assertEqual(list(queryset), [match])
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from agencies.models import Agency
+from listings.models import Listing, ListingViewCount
+from listings.view_counter import ViewCounter, flush_view_counts
+
+User = get_user_model()
+
+BROWSER = "Mozilla/5.0 (X11; Linux x86_64) Firefox/120.0"
+
+
+class ListingViewCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agency = Agency.objects.create(name="Agence Vues")
+        cls.admin = User.objects.create_user(
+            username="chef", password="pass", role=User.Roles.AGENCY_ADMIN, agency=cls.agency
+        )
+        cls.listings = [
+            Listing.objects.create(
+                title=f"Villa {i}", category="house", listing_type="rent", price=1000,
+                agency=cls.agency, owner=cls.admin, published=True,
+            )
+            for i in range(2)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.counter = ViewCounter(flush_threshold=100, flush_interval=None)
+        patcher = mock.patch("listings.view_counter.get_view_counter", return_value=self.counter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def visit(self, listing, user_agent=BROWSER, ip="10.0.0.1"):
+        return self.client.get(
+            reverse("listing_detail", args=[listing.slug]), HTTP_USER_AGENT=user_agent, REMOTE_ADDR=ip
+        )
+
+    def test_views_are_coalesced_in_memory(self):
+        for i in range(3):
+            self.visit(self.listings[0], ip=f"10.0.0.{i}")
+        self.visit(self.listings[0], ip="10.0.0.1")  # rechargement : ignoré
+        self.visit(self.listings[0], user_agent="Googlebot/2.1")
+        self.visit(self.listings[0], user_agent="")
+        self.assertFalse(ListingViewCount.objects.exists())
+
+        self.assertEqual(self.counter.flush(), 3)
+        self.assertEqual(ListingViewCount.objects.get(listing=self.listings[0]).views, 3)
+
+    def test_flush_adds_to_existing_buckets_in_one_update(self):
+        today = timezone.localdate()
+        flush_view_counts({(self.listings[0].pk, today): 2})
+        counts = {(self.listings[0].pk, today): 5, (self.listings[1].pk, today): 1}
+        with self.assertNumQueries(4):  # SAVEPOINT, INSERT IGNORE, UPDATE ... CASE, RELEASE
+            flush_view_counts(counts)
+        self.assertEqual(
+            dict(ListingViewCount.objects.values_list("listing_id", "views")),
+            {self.listings[0].pk: 7, self.listings[1].pk: 1},
+        )
+
+    def test_agency_statistics_shows_daily_views(self):
+        today = timezone.localdate()
+        flush_view_counts({
+            (self.listings[0].pk, today): 4,
+            (self.listings[1].pk, today - timedelta(days=1)): 2,
+            (self.listings[1].pk, today - timedelta(days=40)): 9,
+        })
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse("agency_statistics", args=[self.agency.pk]))
+        self.assertEqual(response.context["views_total"], 6)
+        self.assertEqual(len(response.context["views_by_day"]), 30)
+        self.assertEqual(response.context["views_by_day"][-1], {"day": today, "views": 4})
+        self.assertEqual(response.context["top_viewed"][0]["listing__title"], "Villa 0")
@@ -0,0 +1,103 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from accounts.models import Appointment
+from agencies.models import Agency
+from listings.models import Listing
+from notifications.models import Notification, NotificationEvent
+from notifications.outbox import HANDLERS, deliver_pending
+
+User = get_user_model()
+
+
+def failing_listing_handler():
+    loader, recipients, _ = HANDLERS[Listing]
+    return mock.patch.dict(HANDLERS, {Listing: (loader, recipients, mock.Mock(side_effect=RuntimeError("boom")))})
+
+
+class NotificationOutboxTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agency = Agency.objects.create(name="Agence Outbox")
+        cls.agency_admin = User.objects.create_user(
+            username="chef", password="pass", role=User.Roles.AGENCY_ADMIN, agency=cls.agency
+        )
+        cls.platform_admins = [
+            User.objects.create_user(username=f"admin{i}", password="pass", role=User.Roles.ADMIN_PLATFORM)
+            for i in range(3)
+        ]
+        cls.agent = User.objects.create_user(username="agent", password="pass", role=User.Roles.AGENT)
+        cls.customer = User.objects.create_user(username="client", password="pass")
+
+    def create_listing(self):
+        return Listing.objects.create(
+            title=f"Annonce {Listing.objects.count()}", category="house", listing_type="rent",
+            price=1000, agency=self.agency, owner=self.agent,
+        )
+
+    def test_saving_only_enqueues(self):
+        listing = self.create_listing()
+        self.assertFalse(Notification.objects.exists())
+        event = NotificationEvent.objects.get(object_id=listing.pk)
+        self.assertEqual(event.notification_type, "listing_created")
+
+    def test_worker_delivers_in_batches(self):
+        for _ in range(3):
+            self.create_listing()
+        call_command("process_notifications", verbosity=0)
+        # 3 annonces × (admin d'agence + 3 admins plateforme)
+        self.assertEqual(Notification.objects.filter(notification_type="listing_created").count(), 12)
+        self.assertFalse(NotificationEvent.objects.exclude(status=NotificationEvent.Status.DONE).exists())
+
+    def test_appointment_recipients(self):
+        listing = self.create_listing()
+        self.agent.agency = self.agency
+        self.agent.save()
+        appointment = Appointment.objects.create(
+            listing=listing, agent=self.agent, customer=self.customer,
+            scheduled_date=timezone.now() + timedelta(days=1),
+        )
+        appointment.status = Appointment.Status.CONFIRMED
+        appointment.save()
+        deliver_pending()
+        self.assertEqual(
+            set(Notification.objects.filter(notification_type="appointment_request").values_list("user__username", flat=True)),
+            {"agent", "chef"},
+        )
+        self.assertEqual(
+            set(Notification.objects.filter(notification_type="appointment_confirmed").values_list("user__username", flat=True)),
+            {"client", "chef"},
+        )
+
+    def test_retry_with_backoff_is_idempotent(self):
+        listing = self.create_listing()
+        event = NotificationEvent.objects.get(object_id=listing.pk)
+        # Notification déjà livrée lors d'un essai précédent interrompu
+        Notification.objects.create(
+            user=self.agency_admin, notification_type="listing_created", title="t", message="m",
+            event_id=event.event_id,
+        )
+
+        with failing_listing_handler():
+            deliver_pending()
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), (NotificationEvent.Status.PENDING, 1))
+        self.assertIn("boom", event.last_error)
+        self.assertGreater(event.next_attempt_at, timezone.now())
+
+        NotificationEvent.objects.filter(pk=event.pk).update(next_attempt_at=timezone.now())
+        deliver_pending()
+        self.assertEqual(Notification.objects.filter(event_id=event.event_id).count(), 4)
+
+    def test_event_fails_after_max_attempts(self):
+        listing = self.create_listing()
+        with failing_listing_handler():
+            deliver_pending(max_attempts=1)
+        self.assertEqual(
+            NotificationEvent.objects.get(object_id=listing.pk).status, NotificationEvent.Status.FAILED
+        )
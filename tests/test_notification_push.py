@@ -0,0 +1,140 @@
+import asyncio
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from notifications import views
+from notifications.models import Notification
+from notifications.pubsub import get_broker
+
+User = get_user_model()
+
+
+@override_settings(
+    NOTIFICATION_LONG_POLL_TIMEOUT=0.2, NOTIFICATION_SSE_HEARTBEAT=0.2, NOTIFICATION_DB_CHECK_INTERVAL=0.2
+)
+class NotificationPushTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="abonne", password="pass")
+        self.first = Notification.create_notification(self.user, "system_alert", "Première", "Message")
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+
+    def notify(self, title):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Notification.create_notification(self.user, "system_alert", title, "Message")
+
+    def notify_elsewhere(self, title):
+        # Créée par un autre processus (worker) : seul le compteur partagé est mis à jour,
+        # rien n'est publié sur le broker de celui-ci
+        with mock.patch("notifications.models.publish_notification"), \
+                self.captureOnCommitCallbacks(execute=True):
+            return Notification.create_notification(self.user, "system_alert", title, "Message")
+
+    async def test_poll_returns_newer_notifications_at_once(self):
+        second = await sync_to_async(self.notify)("Deuxième")
+        response = await self.async_client.get(reverse("notifications:notification_poll"), {"since_id": self.first.id})
+        data = response.json()
+        self.assertEqual([n["title"] for n in data["notifications"]], ["Deuxième"])
+        self.assertEqual((data["count"], data["last_id"]), (2, second.id))
+
+    async def test_poll_waits_for_a_publication(self):
+        url = reverse("notifications:notification_poll")
+        cursor = (await self.async_client.get(url)).json()["last_id"]
+        self.assertEqual(cursor, self.first.id)
+
+        async def publish_later():
+            await asyncio.sleep(0.05)
+            await sync_to_async(self.notify)("Poussée")
+
+        response, _ = await asyncio.gather(
+            self.async_client.get(url, {"since_id": cursor}), publish_later()
+        )
+        self.assertEqual([n["title"] for n in response.json()["notifications"]], ["Poussée"])
+
+    async def test_poll_times_out_empty(self):
+        response = await self.async_client.get(reverse("notifications:notification_poll"), {"since_id": self.first.id})
+        self.assertEqual(response.json()["notifications"], [])
+
+    @override_settings(NOTIFICATION_LONG_POLL_TIMEOUT=2, NOTIFICATION_DB_CHECK_INTERVAL=0.05)
+    async def test_poll_reads_notifications_from_other_processes(self):
+        async def create_later():
+            await asyncio.sleep(0.1)
+            await sync_to_async(self.notify_elsewhere)("Depuis le worker")
+
+        response, _ = await asyncio.gather(
+            self.async_client.get(reverse("notifications:notification_poll"), {"since_id": self.first.id}),
+            create_later(),
+        )
+        self.assertEqual([n["title"] for n in response.json()["notifications"]], ["Depuis le worker"])
+
+    @override_settings(NOTIFICATION_LONG_POLL_TIMEOUT=0.3, NOTIFICATION_DB_CHECK_INTERVAL=0.05)
+    async def test_idle_poll_reads_database_only_when_version_changes(self):
+        url = reverse("notifications:notification_poll")
+        with mock.patch.object(views, "_notifications_since", wraps=views._notifications_since) as since:
+            response = await self.async_client.get(url, {"since_id": self.first.id})
+        self.assertEqual(response.json()["notifications"], [])
+        # Seule la lecture initiale : les vérifications suivantes ne lisent que le cache
+        self.assertEqual(since.await_count, 1)
+
+    async def test_stream_reads_notifications_from_other_processes(self):
+        response = await self.async_client.get(reverse("notifications:notification_stream"))
+        stream = aiter(response.streaming_content)
+        await anext(stream)  # retry
+        self.assertIn('"count": 1', (await anext(stream)).decode())
+
+        second = await sync_to_async(self.notify_elsewhere)("Depuis le worker")
+        self.assertIn(f"id: {second.id}", (await anext(stream)).decode())
+        self.assertIn('"count": 2', (await anext(stream)).decode())
+        # Publiée ensuite sur le broker : déjà envoyée, pas de doublon
+        get_broker().publish(self.user.pk, "notification", second.to_dict())
+        self.assertEqual((await anext(stream)).decode(), ": ping\n\n")
+
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0.05)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+
+    def test_wsgi_falls_back_to_counter_polling(self):
+        response = self.client.get(reverse("notifications:notification_list"))
+        self.assertFalse(response.context["notification_push"])
+        self.assertContains(response, "pollNotificationBadge();")
+        self.assertEqual(self.client.get(reverse("notifications:notification_stream")).status_code, 204)
+
+        # Long-poll en WSGI : réponse immédiate, sans attendre le délai
+        with override_settings(NOTIFICATION_LONG_POLL_TIMEOUT=30):
+            response = self.client.get(reverse("notifications:notification_poll"), {"since_id": self.first.id})
+        self.assertEqual(response.json()["notifications"], [])
+
+    async def test_stream_replays_and_pushes(self):
+        response = await self.async_client.get(
+            reverse("notifications:notification_stream"), headers={"Last-Event-ID": "0"}
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).decode().startswith("retry:"))
+        replayed = (await anext(stream)).decode()
+        self.assertIn(f"id: {self.first.id}", replayed)
+        self.assertIn('"count": 1', (await anext(stream)).decode())
+
+        self.assertEqual((await anext(stream)).decode(), ": ping\n\n")
+        get_broker().publish(self.user.pk, "count", {"count": 7})
+        self.assertIn('"count": 7', (await anext(stream)).decode())
+
+        # Déconnexion du client : le serveur ASGI annule la lecture en cours
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0.05)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertFalse(get_broker().has_subscribers(self.user.pk))
+
+    def test_stream_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse("notifications:notification_stream")).status_code, 401)
@@ -0,0 +1,56 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from notifications import views
+from notifications.models import Notification
+
+User = get_user_model()
+
+
+class NotificationSyncTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="mobile", password="pass")
+        self.other = User.objects.create_user(username="autre", password="pass")
+        self.old = [
+            Notification.create_notification(self.user, "system_alert", f"Ancienne {i}", "Message")
+            for i in range(3)
+        ]
+        Notification.create_notification(self.other, "system_alert", "Pas pour moi", "Message")
+        self.client.force_login(self.user)
+        self.url = reverse("notifications:notification_sync")
+
+    def test_first_sync_then_delta(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual([n["title"] for n in data["notifications"]], ["Ancienne 0", "Ancienne 1", "Ancienne 2"])
+        cursor = data["cursor"]
+        self.assertEqual(cursor["since_id"], self.old[-1].id)
+
+        new = Notification.create_notification(self.user, "maintenance", "Nouvelle", "Message")
+        self.old[0].mark_as_read()
+        data = self.client.get(self.url, cursor).json()
+        self.assertEqual([n["id"] for n in data["notifications"]], [new.id])
+        self.assertEqual(data["read"], [self.old[0].id])
+        self.assertEqual(data["unread_count"], 3)
+        self.assertEqual(data["notifications"][0]["created_at"], new.created_at.isoformat())
+
+        data = self.client.get(self.url, data["cursor"]).json()
+        self.assertEqual((data["notifications"], data["read"]), ([], []))
+
+    def test_since_timestamp_and_paging(self):
+        since = (timezone.now() - timedelta(minutes=1)).isoformat()
+        with mock.patch.object(views, "SYNC_PAGE_SIZE", 2):
+            data = self.client.get(self.url, {"since": since}).json()
+        self.assertEqual(len(data["notifications"]), 2)
+        self.assertTrue(data["has_more"])
+
+    def test_invalid_since_and_anonymous(self):
+        self.assertEqual(self.client.get(self.url, {"since": "hier"}).status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from listings.models import Listing
+from agencies.models import Agency
+
+User = get_user_model()
+
+
+class MixedPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        agency = Agency.objects.create(name="Agence Pagination")
+        cls.admin = User.objects.create_user(
+            username="platform", password="pass", role=User.Roles.ADMIN_PLATFORM
+        )
+        Listing.objects.bulk_create([
+            Listing(
+                title=f"Annonce {i}", slug=f"annonce-{i}", category="house", listing_type="rent",
+                price=1000, agency=agency, owner=cls.admin, published=True,
+            )
+            for i in range(25)
+        ])
+        # Deux annonces partagent la même date pour vérifier le départage par id
+        now = timezone.now()
+        for i, listing in enumerate(Listing.objects.order_by("id")):
+            Listing.objects.filter(pk=listing.pk).update(created_at=now - timedelta(minutes=i // 2))
+        cls.expected = list(Listing.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_page_number_mode_unchanged(self):
+        response = self.client.get("/api/listings/", {"page": 2, "page_size": 10})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 25)
+        self.assertEqual(len(response.data["results"]), 10)
+
+    def test_limit_offset_mode(self):
+        response = self.client.get("/api/listings/", {"limit": 5, "offset": 20})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 25)
+        self.assertCountEqual([r["id"] for r in response.data["results"]], self.expected[20:])
+        self.assertIsNone(response.data["next"])
+
+    def test_cursor_mode_walks_forward_and_back_without_count(self):
+        seen = []
+        url, params = "/api/listings/", {"cursor": "", "page_size": 10}
+        pages = []
+        while url:
+            with self.assertNumQueries(2):  # page + photos, jamais de COUNT(*)
+                response = self.client.get(url, params)
+            self.assertNotIn("count", response.data)
+            pages.append(response.data)
+            seen += [r["id"] for r in response.data["results"]]
+            url, params = response.data["next"], None
+        self.assertEqual(seen, self.expected)
+        self.assertIsNone(pages[0]["previous"])
+
+        response = self.client.get(pages[-1]["previous"])
+        self.assertEqual([r["id"] for r in response.data["results"]], self.expected[10:20])
+
+    def test_cursor_is_signed(self):
+        response = self.client.get("/api/listings/", {"cursor": "", "page_size": 10})
+        cursor = response.data["next"].split("cursor=")[1].split("&")[0]
+        response = self.client.get("/api/listings/", {"cursor": cursor[:-2] + "xx"})
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,165 @@
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from agencies.models import Agency
+from listings.images import PLACEHOLDER_URL
+from listings.models import Listing, ListingPhoto
+from listings.photo_queue import enqueue_uploads, process_batch, queue_stats
+
+User = get_user_model()
+
+TMP_DIR = tempfile.mkdtemp()
+MEDIA_ROOT = os.path.join(TMP_DIR, "media")
+SPOOL_DIR = os.path.join(TMP_DIR, "spool")
+
+
+def jpeg(name="photo.jpg", size=(1200, 900)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (30, 90, 160)).save(buffer, "JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/jpeg")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, LISTING_PHOTO_SPOOL_DIR=SPOOL_DIR, LISTING_PHOTO_MAX_ATTEMPTS=2)
+class PhotoQueueTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.pool = ProcessPoolExecutor(max_workers=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+        super().tearDownClass()
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agency = Agency.objects.create(name="Agence File")
+        cls.agent = User.objects.create_user(
+            username="agent", password="pass", role=User.Roles.AGENT, agency=cls.agency
+        )
+        cls.listing = Listing.objects.create(
+            title="Villa file", category="house", listing_type="rent", price=1000,
+            agency=cls.agency, owner=cls.agent, published=True,
+        )
+
+    def test_listing_create_only_spools_uploads(self):
+        stored_before = sorted(Path(MEDIA_ROOT).rglob("*"))
+        self.client.force_login(self.agent)
+        response = self.client.post(reverse("listing_create"), {
+            "title": "Maison neuve", "category": "house", "listing_type": "sale", "price": 5000,
+            "currency": "XOF", "photos": [jpeg("a.jpg"), jpeg("b.jpg"), jpeg("c.jpg")],
+        })
+
+        self.assertRedirects(response, reverse("manage_listings"), fetch_redirect_response=False)
+        photos = list(Listing.objects.get(title="Maison neuve").photos.order_by("order"))
+        self.assertEqual([p.status for p in photos], [ListingPhoto.Status.PENDING] * 3)
+        self.assertEqual([p.is_cover for p in photos], [True, False, False])
+        self.assertTrue(all(Path(p.spool_path).exists() and not p.image for p in photos))
+        # Rien n'est encore écrit dans le stockage
+        self.assertEqual(sorted(Path(MEDIA_ROOT).rglob("*")), stored_before)
+
+    def test_pending_photos_show_a_placeholder(self):
+        enqueue_uploads(self.listing, [jpeg()])
+
+        response = self.client.get(reverse("listing_list"))
+
+        self.assertContains(response, PLACEHOLDER_URL)
+        cover = Listing.objects.with_cover().get(pk=self.listing.pk).cover
+        self.assertTrue(cover.is_pending)
+        self.assertIsNone(self.listing.cover_photo())
+
+    def test_worker_stores_originals_and_renditions(self):
+        photos = enqueue_uploads(self.listing, [jpeg("a.jpg"), jpeg("b.jpg")])
+        spooled = [p.spool_path for p in photos]
+        self.assertEqual(queue_stats()["pending"], 2)
+
+        self.assertEqual(process_batch(self.pool, batch_size=10), (2, 0))
+
+        for photo in ListingPhoto.objects.filter(listing=self.listing):
+            self.assertEqual(photo.status, ListingPhoto.Status.READY)
+            self.assertTrue(photo.has_renditions)
+            self.assertTrue(Path(MEDIA_ROOT, photo.image.name).exists())
+            self.assertEqual((photo.width, photo.height), (1200, 900))
+        self.assertFalse(any(Path(path).exists() for path in spooled))
+        self.assertEqual(queue_stats()["pending"], 0)
+        self.assertEqual(process_batch(self.pool), (0, 0))
+
+    def test_broken_upload_is_retried_then_failed(self):
+        [photo] = enqueue_uploads(self.listing, [SimpleUploadedFile("x.jpg", b"pas une image")])
+
+        self.assertEqual(process_batch(self.pool), (0, 1))
+        photo.refresh_from_db()
+        self.assertEqual((photo.status, photo.attempts), (ListingPhoto.Status.PENDING, 1))
+
+        spooled = photo.spool_path
+        process_batch(self.pool)
+        photo.refresh_from_db()
+        self.assertEqual(photo.status, ListingPhoto.Status.FAILED)
+        self.assertIn("UnidentifiedImageError", photo.last_error)
+        self.assertEqual(queue_stats()["failed"], 1)
+        # Échec définitif : le fichier en attente est supprimé
+        self.assertEqual(photo.spool_path, "")
+        self.assertFalse(Path(spooled).exists())
+
+    def test_cleanup_sweeps_unreferenced_spool_files(self):
+        [queued] = enqueue_uploads(self.listing, [jpeg()])
+        stray = Path(SPOOL_DIR, "orphelin.jpg")
+        stray.write_bytes(b"reste d'un envoi")
+
+        call_command("cleanup_photo_files", grace=0, stdout=StringIO())
+
+        self.assertFalse(stray.exists())
+        self.assertTrue(Path(queued.spool_path).exists())
+
+    def test_detail_shows_ready_photos_while_the_cover_is_pending(self):
+        ready = ListingPhoto.objects.create(listing=self.listing, image=jpeg("jardin.jpg"), order=5)
+        process_batch(self.pool)
+        ready.refresh_from_db()
+        enqueue_uploads(self.listing, [jpeg()])  # nouvelle couverture, pas encore traitée
+
+        response = self.client.get(reverse("listing_detail", args=[self.listing.slug]))
+
+        self.assertContains(response, ready.detail_url)
+        self.assertContains(response, "1 photo en cours de traitement")
+        self.assertNotContains(response, PLACEHOLDER_URL)
+
+    def test_stale_claims_are_taken_over(self):
+        [photo] = enqueue_uploads(self.listing, [jpeg()])
+        ListingPhoto.objects.filter(pk=photo.pk).update(
+            status=ListingPhoto.Status.PROCESSING, claimed_at=timezone.now() - timedelta(hours=1)
+        )
+
+        self.assertEqual(process_batch(self.pool), (1, 0))
+
+    def test_admin_uploads_are_queued_too(self):
+        photo = ListingPhoto.objects.create(listing=self.listing, image=jpeg())
+        self.assertEqual(photo.status, ListingPhoto.Status.PENDING)
+
+        self.assertEqual(process_batch(self.pool), (1, 0))
+        photo.refresh_from_db()
+        self.assertTrue(photo.has_renditions)
+
+    def test_command_reports_throughput_and_queue(self):
+        enqueue_uploads(self.listing, [jpeg()])
+        out = StringIO()
+
+        call_command("process_photo_uploads", workers=1, stdout=out)
+
+        self.assertIn("1 photo(s) prête(s)", out.getvalue())
+        self.assertIn("photos/s", out.getvalue())
+        self.assertIn("0 en attente", out.getvalue())
@@ -0,0 +1,163 @@
+import io
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from agencies.models import Agency
+from listings.images import PLACEHOLDER_URL, RENDITIONS, process_photo, render_renditions
+from listings.models import Listing, ListingPhoto
+from listings.serializers import ListingReadSerializer
+from listings.storage import is_content_addressed
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def phone_photo(size=(2400, 1800), orientation=6):
+    """JPEG « de téléphone » : EXIF avec orientation et position GPS."""
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    exif[0x010F] = "PhoneMaker"
+    exif[0x8825] = {1: "N", 2: (6.0, 8.0, 0.0)}
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 120, 40)).save(buffer, "JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class PhotoRenditionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agency = Agency.objects.create(name="Agence Photos")
+        cls.owner = User.objects.create_user(username="agent", password="pass", role=User.Roles.AGENT)
+        cls.listing = Listing.objects.create(
+            title="Villa photos", category="house", listing_type="rent", price=1000,
+            agency=cls.agency, owner=cls.owner, published=True,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def upload(self, data=None, name="photo.jpg"):
+        photo = ListingPhoto.objects.create(
+            listing=self.listing, image=SimpleUploadedFile(name, data or phone_photo(), "image/jpeg"), is_cover=True
+        )
+        process_photo(photo)
+        photo.refresh_from_db()
+        return photo
+
+    def test_render_renditions_orients_resizes_and_strips_exif(self):
+        rendered = render_renditions(phone_photo())
+
+        # Orientation 6 : la photo paysage stockée est en réalité en portrait
+        self.assertEqual((rendered["width"], rendered["height"]), (1800, 2400))
+        for name, (max_width, max_height) in RENDITIONS.items():
+            rendition = rendered["renditions"][name]
+            self.assertLessEqual(rendition["width"], max_width)
+            self.assertLessEqual(rendition["height"], max_height)
+            self.assertLess(rendition["width"], rendition["height"])
+            for fmt, pil_format in (("jpeg", "JPEG"), ("webp", "WEBP")):
+                with Image.open(io.BytesIO(rendition[fmt])) as image:
+                    self.assertEqual(image.format, pil_format)
+                    self.assertEqual(image.size, (rendition["width"], rendition["height"]))
+                    self.assertEqual(len(image.getexif()), 0)
+
+    def test_small_and_transparent_images_are_not_upscaled(self):
+        buffer = io.BytesIO()
+        Image.new("RGBA", (100, 80), (0, 0, 0, 0)).save(buffer, "PNG")
+
+        rendered = render_renditions(buffer.getvalue())
+
+        self.assertEqual(rendered["renditions"]["detail"]["width"], 100)
+
+    def test_upload_stores_renditions_and_metadata(self):
+        photo = self.upload()
+
+        self.assertTrue(photo.has_renditions)
+        self.assertEqual((photo.width, photo.height), (1800, 2400))
+        self.assertEqual(photo.file_size, photo.image.size)
+        for name in RENDITIONS:
+            for fmt in ("jpeg", "webp"):
+                entry = photo.renditions[name][fmt]
+                self.assertTrue((Path(MEDIA_ROOT) / entry["name"]).exists())
+                self.assertGreater(entry["bytes"], 0)
+        self.assertTrue(photo.card_url.endswith(".jpeg"))
+        self.assertTrue(is_content_addressed(photo.renditions["card"]["jpeg"]["name"]))
+        self.assertEqual(photo.srcset("webp").count("w, "), len(RENDITIONS) - 1)
+        self.assertIn(f'{photo.thumb_url} {photo.renditions["thumb"]["width"]}w', photo.srcset_jpeg)
+
+    def test_placeholder_until_processed_then_original_fallback(self):
+        photo = ListingPhoto.objects.create(listing=self.listing, image="listings/photos/brut.jpg")
+        self.assertEqual(photo.status, ListingPhoto.Status.PENDING)
+        self.assertEqual(photo.card_url, PLACEHOLDER_URL)
+        self.assertEqual(photo.srcset_jpeg, "")
+
+        # Photo ancienne sans renditions (avant rétro-remplissage) : l'original
+        photo.status = ListingPhoto.Status.READY
+        self.assertFalse(photo.has_renditions)
+        self.assertEqual(photo.card_url, photo.image.url)
+
+    def test_serializer_and_templates_expose_renditions(self):
+        photo = self.upload()
+
+        data = ListingReadSerializer(Listing.objects.with_photos().get(pk=self.listing.pk)).data
+        self.assertEqual(data["cover_photo"], photo.image.url)
+        self.assertEqual(data["cover_image"]["url"], photo.card_url)
+        self.assertEqual(data["cover_image"]["srcset"]["webp"], photo.srcset_webp)
+        self.assertEqual(data["cover_image"]["renditions"]["detail"]["width"], photo.renditions["detail"]["width"])
+
+        response = self.client.get(reverse("listing_list"))
+        self.assertContains(response, photo.card_url)
+        self.assertContains(response, 'type="image/webp"')
+        self.assertNotContains(response, photo.image.url)
+
+    def test_routed_api_exposes_renditions(self):
+        cover = self.upload()
+        gallery = ListingPhoto.objects.create(
+            listing=self.listing, image=SimpleUploadedFile("jardin.jpg", phone_photo((800, 600)), "image/jpeg"), order=1
+        )
+        process_photo(gallery)
+        gallery.refresh_from_db()
+        self.client.force_login(self.owner)
+
+        data = self.client.get(reverse("listing-detail", args=[self.listing.pk])).json()
+        self.assertEqual(data["cover_image"]["url"], cover.card_url)
+        self.assertEqual(data["cover_image"]["srcset"]["webp"], cover.srcset_webp)
+        self.assertEqual([image["id"] for image in data["gallery_images"]], [gallery.pk])
+        self.assertEqual(data["gallery_images"][0]["renditions"]["card"]["width"], gallery.renditions["card"]["width"])
+
+        listed = self.client.get(reverse("listing-list")).json()["results"]
+        self.assertEqual(listed[0]["cover_image"]["id"], cover.pk)
+
+    @override_settings(LISTING_PHOTO_ORPHAN_GRACE=0)
+    def test_delete_removes_rendition_files(self):
+        photo = self.upload()
+        paths = [Path(MEDIA_ROOT) / photo.renditions[name]["jpeg"]["name"] for name in RENDITIONS]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            photo.delete()
+
+        self.assertFalse(any(path.exists() for path in paths))
+
+    def test_backfill_command(self):
+        photo = self.upload()
+        ListingPhoto.objects.filter(pk=photo.pk).update(renditions={}, width=None)
+
+        out = StringIO()
+        call_command("build_photo_renditions", workers=1, stdout=out)
+
+        photo.refresh_from_db()
+        self.assertTrue(photo.has_renditions)
+        self.assertEqual(photo.width, 1800)
+        self.assertIn("1 photo(s) traitée(s)", out.getvalue())
@@ -0,0 +1,139 @@
+import io
+import os
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+
+from agencies.models import Agency
+from listings.images import process_photo, rendition_names
+from listings.models import Listing, ListingPhoto
+from listings.storage import IMMUTABLE_CACHE_CONTROL, is_content_addressed, photo_storage
+from togoestate.views import media
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def jpeg_bytes(color=(30, 90, 160)):
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 600), color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, LISTING_PHOTO_ORPHAN_GRACE=0)
+class ContentAddressedStorageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agency = Agency.objects.create(name="Agence Stockage")
+        cls.owner = User.objects.create_user(username="agent", password="pass", role=User.Roles.AGENT)
+        cls.villa = Listing.objects.create(
+            title="Villa stockage", category="house", listing_type="rent", price=1000,
+            agency=cls.agency, owner=cls.owner, published=True,
+        )
+        cls.studio = Listing.objects.create(
+            title="Studio stockage", category="apartment", listing_type="rent", price=500,
+            agency=cls.agency, owner=cls.owner, published=True,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def upload(self, listing, data, name="photo.jpg"):
+        photo = ListingPhoto.objects.create(listing=listing, image=SimpleUploadedFile(name, data, "image/jpeg"))
+        process_photo(photo)
+        photo.refresh_from_db()
+        return photo
+
+    def photo_files(self):
+        return sorted(path for path in Path(MEDIA_ROOT, "listings").rglob("*") if path.is_file())
+
+    def test_identical_bytes_share_one_file(self):
+        data = jpeg_bytes()
+        first = self.upload(self.villa, data, "IMG_0001.JPG")
+        second = self.upload(self.studio, data, "copie.jpg")
+        other = self.upload(self.studio, jpeg_bytes((200, 10, 10)))
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertNotEqual(first.image.name, other.image.name)
+        self.assertTrue(first.image.name.startswith("listings/photos/"))
+        self.assertTrue(first.image.name.endswith(".jpg"))
+        self.assertTrue(is_content_addressed(first.image.name))
+        self.assertEqual(rendition_names(first.renditions), rendition_names(second.renditions))
+        # 2 originaux + 2 jeux de renditions (3 tailles × 2 formats)
+        self.assertEqual(len(self.photo_files()), 2 + 2 * 6)
+
+    def test_shared_files_are_deleted_with_the_last_reference(self):
+        data = jpeg_bytes()
+        first = self.upload(self.villa, data)
+        second = self.upload(self.studio, data)
+        files = [Path(MEDIA_ROOT, name) for name in [first.image.name, *rendition_names(first.renditions)]]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(all(path.exists() for path in files))
+        self.assertEqual(second.image.read(), data)
+
+        # Suppression de l'annonce : ses photos partent en cascade, fichiers compris
+        with self.captureOnCommitCallbacks(execute=True):
+            self.studio.delete()
+        self.assertFalse(any(path.exists() for path in files))
+
+    def test_identical_pixels_do_not_share_renditions(self):
+        data = jpeg_bytes()
+        # Octets différents (données après la fin de l'image), pixels identiques
+        first = self.upload(self.villa, data)
+        second = self.upload(self.studio, data + b"\0")
+        self.assertNotEqual(first.image.name, second.image.name)
+        self.assertTrue(set(rendition_names(first.renditions)).isdisjoint(rendition_names(second.renditions)))
+        self.assertTrue(all(is_content_addressed(name) for name in rendition_names(second.renditions)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(all(Path(MEDIA_ROOT, name).exists() for name in rendition_names(second.renditions)))
+
+    def test_recent_orphans_are_left_to_the_cleanup_command(self):
+        photo = self.upload(self.villa, jpeg_bytes())
+        original = Path(MEDIA_ROOT, photo.image.name)
+        with override_settings(LISTING_PHOTO_ORPHAN_GRACE=600), self.captureOnCommitCallbacks(execute=True):
+            photo.delete()
+        self.assertTrue(original.exists())
+
+        kept = self.upload(self.studio, jpeg_bytes((10, 200, 10)))
+        out = StringIO()
+        call_command("cleanup_photo_files", "--dry-run", stdout=out)
+        self.assertIn(photo.image.name, out.getvalue())
+        self.assertTrue(original.exists())
+
+        call_command("cleanup_photo_files", stdout=StringIO())
+        self.assertFalse(original.exists())
+        expected = sorted(Path(MEDIA_ROOT, name) for name in [kept.image.name, *rendition_names(kept.renditions)])
+        self.assertEqual(self.photo_files(), expected)
+
+    def test_media_view_marks_hashed_files_immutable(self):
+        photo = self.upload(self.villa, jpeg_bytes())
+        Path(MEDIA_ROOT, "notes.txt").write_text("modifiable")
+        request = RequestFactory().get("/media/")
+
+        response = media(request, photo.image.name, document_root=MEDIA_ROOT)
+        self.assertEqual(response["Cache-Control"], IMMUTABLE_CACHE_CONTROL)
+        response = media(request, "notes.txt", document_root=MEDIA_ROOT)
+        self.assertNotIn("Cache-Control", response)
+
+    def test_save_streams_into_place_without_leftovers(self):
+        storage = photo_storage()
+        data = jpeg_bytes()
+        name = storage.save("listings/photos/Photo.JPEG", SimpleUploadedFile("Photo.JPEG", data))
+        self.assertTrue(is_content_addressed(name))
+        self.assertTrue(name.endswith(".jpeg"))
+        self.assertEqual(storage.save("listings/photos/autre.jpeg", SimpleUploadedFile("autre.jpeg", data)), name)
+        self.assertEqual(os.listdir(storage.path(".incoming")), [])
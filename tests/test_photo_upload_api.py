@@ -0,0 +1,192 @@
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.test import APIClient
+
+from agencies.models import Agency
+from listings.models import Listing, ListingPhoto, PhotoUpload
+from listings.uploads import abort_upload, append_chunk
+
+User = get_user_model()
+
+TMP_DIR = tempfile.mkdtemp()
+UPLOAD_DIR = os.path.join(TMP_DIR, "uploads")
+SPOOL_DIR = os.path.join(TMP_DIR, "spool")
+
+OCTETS = "application/offset+octet-stream"
+
+
+def jpeg_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGB", (900, 600), (40, 120, 200)).save(buffer, "JPEG", quality=95)
+    return buffer.getvalue()
+
+
+@override_settings(
+    LISTING_UPLOAD_DIR=UPLOAD_DIR, LISTING_PHOTO_SPOOL_DIR=SPOOL_DIR,
+    LISTING_UPLOAD_MAX_ACTIVE=2, LISTING_UPLOAD_MAX_BYTES=1024 * 1024,
+)
+class ResumablePhotoUploadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agency = Agency.objects.create(name="Agence Envois")
+        cls.agent = User.objects.create_user(
+            username="agent", password="pass", role=User.Roles.AGENT, agency=cls.agency
+        )
+        cls.other_agent = User.objects.create_user(
+            username="autre", password="pass", role=User.Roles.AGENT, agency=cls.agency
+        )
+        cls.listing = Listing.objects.create(
+            title="Villa envois", category="house", listing_type="rent", price=1000,
+            agency=cls.agency, owner=cls.agent, published=True,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.agent)
+        self.data = jpeg_bytes()
+
+    def start(self, length=None, filename="salon.jpg"):
+        return self.client.post(
+            reverse("listing-uploads", kwargs={"pk": self.listing.pk}),
+            {"filename": filename, "length": len(self.data) if length is None else length},
+            format="json",
+        )
+
+    def url(self, upload_id, finalize=False):
+        name = "listing-upload-finalize" if finalize else "listing-upload"
+        return reverse(name, kwargs={"pk": self.listing.pk, "upload_id": upload_id})
+
+    def patch(self, upload_id, offset, chunk):
+        return self.client.generic(
+            "PATCH", self.url(upload_id), chunk, content_type=OCTETS, HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def test_chunks_are_appended_then_finalized_into_the_photo_queue(self):
+        response = self.start()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response["Upload-Offset"], "0")
+        upload_id = response.data["id"]
+        self.assertTrue(response["Location"].endswith(self.url(upload_id)))
+
+        middle = len(self.data) // 2
+        response = self.patch(upload_id, 0, self.data[:middle])
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response["Upload-Offset"], str(middle))
+        # Reprise après coupure : le client relit le décalage
+        response = self.client.head(self.url(upload_id))
+        self.assertEqual(response["Upload-Offset"], str(middle))
+        self.assertEqual(self.patch(upload_id, middle, self.data[middle:]).status_code, 204)
+
+        temp_path = PhotoUpload.objects.get(pk=upload_id).temp_path
+        response = self.client.post(self.url(upload_id, finalize=True))
+        self.assertEqual(response.status_code, 201)
+        photo = ListingPhoto.objects.get(pk=response.data["id"])
+        self.assertEqual(photo.status, ListingPhoto.Status.PENDING)
+        self.assertTrue(photo.is_cover)
+        self.assertEqual(Path(photo.spool_path).read_bytes(), self.data)
+        self.assertFalse(PhotoUpload.objects.exists())
+        self.assertFalse(os.path.exists(temp_path))
+
+    def test_wrong_offset_is_a_conflict(self):
+        upload_id = self.start().data["id"]
+        self.patch(upload_id, 0, self.data[:100])
+
+        response = self.patch(upload_id, 0, self.data[:100])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(PhotoUpload.objects.get(pk=upload_id).offset, 100)
+
+        response = self.client.post(self.url(upload_id, finalize=True))
+        self.assertEqual(response.status_code, 409)
+
+    def test_body_beyond_declared_length_is_rejected(self):
+        upload_id = self.start(length=100).data["id"]
+        response = self.patch(upload_id, 0, self.data[:150])
+        self.assertEqual(response.status_code, 413)
+        upload = PhotoUpload.objects.get(pk=upload_id)
+        self.assertEqual(upload.offset, 0)
+        self.assertEqual(os.path.getsize(upload.temp_path), 0)
+
+        self.assertEqual(self.start(length=2 * 1024 * 1024).status_code, 413)
+        self.assertEqual(self.start(filename="script.sh").status_code, 400)
+
+    def test_patch_requires_offset_stream_content_type(self):
+        upload_id = self.start().data["id"]
+        response = self.client.patch(self.url(upload_id), {"chunk": "x"}, format="json", HTTP_UPLOAD_OFFSET="0")
+        self.assertEqual(response.status_code, 415)
+
+    def test_invalid_image_is_discarded_on_finalize(self):
+        self.data = b"pas une image" * 10
+        upload_id = self.start().data["id"]
+        self.patch(upload_id, 0, self.data)
+
+        response = self.client.post(self.url(upload_id, finalize=True))
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(PhotoUpload.objects.exists())
+        self.assertFalse(self.listing.photos.exists())
+
+    def test_concurrent_uploads_are_limited_per_user(self):
+        first = self.start().data["id"]
+        self.start()
+        self.assertEqual(self.start().status_code, 429)
+
+        # Un envoi abandonné (expiré) ne compte plus
+        PhotoUpload.objects.filter(pk=first).update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.start().status_code, 201)
+        self.assertEqual(self.client.head(self.url(first)).status_code, 404)
+
+        # L'annulation libère aussi une place
+        other = PhotoUpload.objects.exclude(pk=first).first()
+        self.assertEqual(self.client.delete(self.url(other.pk)).status_code, 204)
+        self.assertFalse(os.path.exists(other.temp_path))
+        self.assertEqual(self.start().status_code, 201)
+
+    def test_patch_of_an_upload_deleted_meanwhile_is_not_found(self):
+        upload_id = self.start().data["id"]
+        upload = PhotoUpload.objects.get(pk=upload_id)
+
+        class AbortingStream(io.BytesIO):
+            # Le DELETE arrive pendant la lecture du corps
+            def read(self, size=-1):
+                abort_upload(upload)
+                return super().read(size)
+
+        with self.assertRaises(NotFound):
+            append_chunk(upload, 0, AbortingStream(self.data[:1000]))
+        self.assertFalse(PhotoUpload.objects.filter(pk=upload_id).exists())
+
+    def test_purge_command_removes_expired_uploads(self):
+        upload_id = self.start().data["id"]
+        self.patch(upload_id, 0, self.data[:100])
+        upload = PhotoUpload.objects.get(pk=upload_id)
+        PhotoUpload.objects.filter(pk=upload_id).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        out = StringIO()
+        call_command("purge_photo_uploads", stdout=out)
+        self.assertIn("1 envoi(s) expiré(s)", out.getvalue())
+        self.assertFalse(PhotoUpload.objects.exists())
+        self.assertFalse(os.path.exists(upload.temp_path))
+
+    def test_uploads_belong_to_their_user(self):
+        upload_id = self.start().data["id"]
+        self.client.force_authenticate(self.other_agent)
+        # Agent sans droit sur l'annonce, ni sur l'envoi
+        self.assertEqual(self.start().status_code, 404)
+        self.assertEqual(self.patch(upload_id, 0, self.data).status_code, 404)
@@ -0,0 +1,84 @@
+import gzip
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models.signals import post_delete
+from django.test import TestCase
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from accounts.models import UserActivity
+from core.retention import get_policies
+from notifications.models import Notification
+
+User = get_user_model()
+
+
+class RetentionTests(TestCase):
+    def setUp(self):
+        self.archive_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+        self.user = User.objects.create_user(username="ancien", password="pass")
+        now = timezone.now()
+        for notification_type, age in [
+            ("maintenance", 40), ("maintenance", 10), ("system_alert", 100),
+            ("appointment_request", 100), ("appointment_request", 400),
+        ]:
+            notification = Notification.create_notification(self.user, notification_type, f"{notification_type} {age}j", "Message")
+            Notification.objects.filter(pk=notification.pk).update(created_at=now - timedelta(days=age))
+        for activity_type, age in [("login", 100), ("listing_create", 100)]:
+            activity = UserActivity.objects.create(user=self.user, activity_type=activity_type, title=activity_type)
+            UserActivity.objects.filter(pk=activity.pk).update(created_at=now - timedelta(days=age))
+
+    def purge(self, *args):
+        out = StringIO()
+        call_command("purge_expired", "--archive-dir", str(self.archive_dir), "--batch-size", "2", *args, stdout=out)
+        return out.getvalue()
+
+    def test_policy_applies_ttl_per_type(self):
+        policy = get_policies(["notifications.Notification"])[0]
+        expired = Notification.objects.filter(policy.expired_q()).values_list("title", flat=True)
+        self.assertCountEqual(expired, ["maintenance 40j", "system_alert 100j", "appointment_request 400j"])
+
+    def test_dry_run_counts_without_deleting(self):
+        output = self.purge("--dry-run")
+        self.assertIn("notifications.Notification : 3 ligne(s) expirée(s)", output)
+        self.assertEqual(Notification.objects.count(), 5)
+
+    def test_purge_archives_then_deletes(self):
+        output = self.purge("--archive")
+        self.assertIn("lignes/s", output)
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertEqual(list(UserActivity.objects.values_list("activity_type", flat=True)), ["listing_create"])
+
+        archive = next(self.archive_dir.glob("notifications_notification-*.jsonl.gz"))
+        with gzip.open(archive, "rt") as lines:
+            titles = [json.loads(line)["title"] for line in lines]
+        self.assertCountEqual(titles, ["maintenance 40j", "system_alert 100j", "appointment_request 400j"])
+        self.assertEqual(json.loads((self.archive_dir / ".purge_state.json").read_text()), {})
+
+    def test_purge_refreshes_unread_counter_without_row_signals(self):
+        cache.clear()
+        self.assertEqual(Notification.get_unread_count(self.user), 5)
+        receiver = mock.Mock()
+        post_delete.connect(receiver, dispatch_uid="test-purge")
+        self.addCleanup(post_delete.disconnect, dispatch_uid="test-purge")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.purge()
+        receiver.assert_not_called()
+        self.assertEqual(Notification.get_unread_count(self.user), 2)
+
+    def test_interrupted_run_resumes_from_checkpoint(self):
+        last_pk = Notification.objects.order_by("-pk").values_list("pk", flat=True).first()
+        (self.archive_dir / ".purge_state.json").write_text(json.dumps({"notifications.Notification": last_pk}))
+        self.purge("--model", "notifications.Notification")
+        # Seules les lignes à partir du point de reprise sont traitées
+        self.assertEqual(Notification.objects.count(), 4)
@@ -0,0 +1,140 @@
+import json
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.contrib.auth import get_user_model
+
+from agencies.models import Agency, City, District, Region
+from listings.models import Listing
+from notifications.models import Notification, NotificationEvent
+from notifications.outbox import deliver_pending
+from saved_searches.criteria import parse_query
+from saved_searches.matching import SavedSearchIndex, get_matcher, match_listing, price_bucket
+from saved_searches.models import SavedSearch
+
+User = get_user_model()
+
+
+def listing(**values):
+    defaults = dict(city_id=1, category="house", listing_type="rent", price=Decimal(150000),
+                    bedrooms=3, title="Villa", description="", address="")
+    defaults.update(values)
+    return SimpleNamespace(**defaults)
+
+
+class SavedSearchIndexTests(SimpleTestCase):
+    def index(self, *queries):
+        index = SavedSearchIndex()
+        for pk, query in enumerate(queries, start=1):
+            index.add(pk, pk * 10, parse_query(json.dumps(query)))
+        return index
+
+    def matched(self, index, **values):
+        return sorted(search_id for search_id, _ in index.match(listing(**values)))
+
+    def test_unset_criteria_match_any_value(self):
+        index = self.index({}, {"city": 1}, {"city": 2}, {"category": "land"}, {"listing_type": "rent"})
+        self.assertEqual(self.matched(index), [1, 2, 5])
+
+    def test_price_range_across_buckets(self):
+        index = self.index(
+            {"min_price": 100000, "max_price": 200000},
+            {"max_price": 120000},
+            {"min_price": 160000},
+            {"min_price": 300000, "max_price": 100000},
+        )
+        self.assertNotEqual(price_bucket(100000), price_bucket(200000))
+        self.assertEqual(self.matched(index, price=Decimal(150000)), [1])
+        self.assertEqual(self.matched(index, price=Decimal(110000)), [1, 2])
+        self.assertEqual(self.matched(index, price=Decimal(5000000)), [3])
+
+    def test_bedrooms_and_keywords(self):
+        index = self.index({"bedrooms": 4}, {"q": "piscine"}, {"q": "piscine jardin"})
+        self.assertEqual(self.matched(index, bedrooms=4, description="Villa avec piscines"), [1, 2])
+        self.assertEqual(self.matched(index, bedrooms=None, title="Jardin et piscine"), [2, 3])
+
+    def test_only_candidates_of_the_listing_bucket_are_checked(self):
+        index = self.index(*[{"city": city, "listing_type": "sale"} for city in range(1, 50)], {"city": 1})
+        self.assertEqual(len(list(index.candidates(listing(city_id=1)))), 1)
+
+
+class SavedSearchAlertTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agency = Agency.objects.create(name="Agence Alertes")
+        cls.agent = User.objects.create_user(username="agent", password="pass", role=User.Roles.AGENT)
+        cls.city = City.objects.create(
+            name="Lomé", district=District.objects.create(name="Golfe", region=Region.objects.create(name="Maritime"))
+        )
+        cls.alice = User.objects.create_user(username="alice", password="pass")
+        cls.bob = User.objects.create_user(username="bob", password="pass")
+        cls.carol = User.objects.create_user(username="carol", password="pass")
+
+    def setUp(self):
+        cache.clear()
+
+    def save_search(self, user, **query):
+        with self.captureOnCommitCallbacks(execute=True):
+            return SavedSearch.objects.create(user=user, query=json.dumps(query))
+
+    def create_listing(self, **values):
+        defaults = dict(title="Villa", category="house", listing_type="rent", price=150000, city=self.city)
+        defaults.update(values)
+        return Listing.objects.create(agency=self.agency, owner=self.agent, **defaults)
+
+    def alerts(self):
+        return Notification.objects.filter(notification_type="saved_search_match")
+
+    def test_publishing_notifies_matching_users_once(self):
+        self.save_search(self.alice, city=self.city.pk, listing_type="rent")
+        self.save_search(self.alice, max_price=200000)
+        self.save_search(self.bob, category="house", max_price=100000)
+        self.save_search(self.carol, listing_type="sale")
+
+        listing = self.create_listing()
+        self.assertFalse(NotificationEvent.objects.filter(notification_type="saved_search_match").exists())
+
+        listing.published = True
+        listing.save()
+        listing.save()  # déjà publiée : pas de nouvelle alerte
+        deliver_pending()
+
+        self.assertEqual(list(self.alerts().values_list("user__username", flat=True)), ["alice"])
+        self.assertEqual(self.alerts().get().object_id, listing.pk)
+
+    def test_new_saved_search_is_seen_by_the_matcher(self):
+        self.save_search(self.alice, listing_type="sale")
+        self.create_listing(title="Premier", published=True)
+        deliver_pending()
+        self.assertFalse(self.alerts().exists())
+
+        self.save_search(self.bob, listing_type="rent")
+        self.create_listing(title="Second", published=True)
+        deliver_pending()
+        self.assertEqual(list(self.alerts().values_list("user__username", flat=True)), ["bob"])
+
+    def test_matcher_version_is_read_from_the_database(self):
+        # Écritures d'un autre processus : ni signal ni cache partagé côté worker
+        alice = SavedSearch.objects.create(user=self.alice, query=json.dumps({"listing_type": "rent"}))
+        listing = self.create_listing()
+        self.assertEqual(match_listing(listing), {self.alice.pk})
+        with self.assertNumQueries(1):
+            matcher = get_matcher()  # version inchangée : pas de reconstruction
+        self.assertEqual(match_listing(listing, matcher), {self.alice.pk})
+
+        SavedSearch.objects.create(user=self.bob, query=json.dumps({"category": "house"}))
+        self.assertEqual(match_listing(listing), {self.alice.pk, self.bob.pk})
+
+        alice.delete()
+        self.assertEqual(match_listing(listing), {self.bob.pk})
+
+    def test_unpublished_before_delivery_is_not_alerted(self):
+        self.save_search(self.alice)
+        listing = self.create_listing(published=True)
+        Listing.objects.filter(pk=listing.pk).update(published=False)
+
+        deliver_pending()
+
+        self.assertFalse(self.alerts().exists())
@@ -0,0 +1,112 @@
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from agencies.models import City, District, Region
+from saved_searches.criteria import MAX_BEDROOMS, MAX_PRICE, parse_query, query_hash
+from saved_searches.models import SavedSearch, SearchHistory
+
+User = get_user_model()
+
+
+class ParseQueryTests(SimpleTestCase):
+    def test_typed_columns(self):
+        criteria = parse_query(
+            '{"city": "3", "category": "House", "listing_type": "rent", "min_price": "50000",'
+            ' "max_price": 200000, "bedrooms": "2", "q": "  Villa   Piscine "}'
+        )
+        self.assertEqual(criteria, {
+            "city_id": 3, "category": "house", "listing_type": "rent",
+            "min_price": Decimal("50000.00"), "max_price": Decimal("200000.00"),
+            "bedrooms": 2, "keywords": "villa piscine",
+        })
+
+    def test_invalid_values_are_dropped(self):
+        criteria = parse_query('{"city": "lome", "max_price": "-5", "bedrooms": true}')
+        self.assertIsNone(criteria["city_id"])
+        self.assertIsNone(criteria["max_price"])
+        self.assertIsNone(criteria["bedrooms"])
+
+    def test_non_finite_and_out_of_range_values(self):
+        for value in ("NaN", "Infinity", "-Infinity", "sNaN"):
+            criteria = parse_query(json.dumps({"min_price": value, "bedrooms": value, "city": value}))
+            self.assertEqual((criteria["min_price"], criteria["bedrooms"], criteria["city_id"]), (None, None, None))
+        self.assertIsNone(parse_query('{"max_price": NaN}')["max_price"])
+
+        # Au-delà des colonnes : ramené à la borne (aucune annonce ne l'atteint)
+        criteria = parse_query('{"min_price": "1e30", "max_price": 1234567890123456, "bedrooms": 99999999}')
+        self.assertEqual(criteria["min_price"], MAX_PRICE)
+        self.assertEqual(criteria["max_price"], MAX_PRICE)
+        self.assertEqual(criteria["bedrooms"], MAX_BEDROOMS)
+
+    def test_plain_text_is_keywords(self):
+        self.assertEqual(parse_query("Villa Lomé")["keywords"], "villa lomé")
+
+    def test_equivalent_queries_share_a_hash(self):
+        self.assertEqual(
+            query_hash(parse_query('{"city": 3, "max_price": "200000", "category": ""}')),
+            query_hash(parse_query('{"max_price":200000.0,"city":"3"}')),
+        )
+        self.assertNotEqual(
+            query_hash(parse_query('{"city": 3}')), query_hash(parse_query('{"city": 4}'))
+        )
+
+
+class SearchCriteriaModelTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="client", password="pass")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def post(self, name, payload):
+        return self.client.post(reverse(name), json.dumps(payload), content_type="application/json")
+
+    def test_columns_follow_query_on_save(self):
+        search = SavedSearch.objects.create(user=self.user, query='{"category": "land"}')
+        search.query = '{"category": "house", "max_price": 100000}'
+        search.save(update_fields=["query"])
+
+        search.refresh_from_db()
+        self.assertEqual(search.category, "house")
+        self.assertEqual(search.max_price, Decimal("100000"))
+        self.assertEqual(SavedSearch.objects.filter(category="house", max_price__lte=150000).get(), search)
+
+    def test_save_search_dedupes_equivalent_queries(self):
+        first = self.post("saved_searches:save_search", {"query": '{"city": 3, "max_price": 200000}', "name": "A"})
+        second = self.post("saved_searches:save_search", {"query": '{"max_price": "200000", "city": "3"}', "name": "B"})
+
+        self.assertEqual(first.json()["id"], second.json()["id"])
+        search = SavedSearch.objects.get()
+        self.assertEqual(search.name, "B")
+        self.assertEqual(search.city_id, 3)
+
+    def test_invalid_numbers_are_saved_without_error(self):
+        payload = {"query": '{"min_price": "NaN", "max_price": "Infinity", "bedrooms": 99999999}'}
+        self.assertEqual(self.post("saved_searches:save_search", payload).status_code, 200)
+        self.assertEqual(self.post("saved_searches:record_search", payload).status_code, 200)
+        self.assertEqual(SearchHistory.objects.get().bedrooms, MAX_BEDROOMS)
+
+    def test_deleting_a_city_keeps_searches(self):
+        district = District.objects.create(name="Kozah", region=Region.objects.create(name="Kara"))
+        city = City.objects.create(name="Kara", district=district)
+        SavedSearch.objects.create(user=self.user, query=json.dumps({"city": city.pk}))
+        SearchHistory.objects.create(user=self.user, query=json.dumps({"city": city.pk}))
+        city.delete()
+        self.assertEqual((SavedSearch.objects.count(), SearchHistory.objects.count()), (1, 1))
+
+    def test_lists_expose_criteria(self):
+        self.post("saved_searches:save_search", {"query": '{"listing_type": "sale", "min_price": 5000}'})
+        self.post("saved_searches:record_search", {"query": '{"q": "Terrain"}', "results_count": 4})
+
+        saved = self.client.get(reverse("saved_searches:saved_searches_list")).json()["searches"][0]
+        history = self.client.get(reverse("saved_searches:search_history")).json()["history"][0]
+
+        self.assertEqual(saved["criteria"]["listing_type"], "sale")
+        self.assertEqual(saved["criteria"]["min_price"], "5000.00")
+        self.assertEqual(history["criteria"]["keywords"], "terrain")
+        self.assertEqual(SearchHistory.objects.get().keywords, "terrain")
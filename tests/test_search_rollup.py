@@ -0,0 +1,105 @@
+import json
+from io import StringIO
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from agencies.models import City, District, Region
+from saved_searches.models import SearchDailyStat, SearchHistory
+from saved_searches.rollup import prune_search_history, rollup_search_history
+
+User = get_user_model()
+
+
+class SearchRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="client", password="pass")
+        cls.admin = User.objects.create_user(username="admin", password="pass", role=User.Roles.ADMIN_PLATFORM)
+        cls.city = City.objects.create(
+            name="Lomé", district=District.objects.create(name="Golfe", region=Region.objects.create(name="Maritime"))
+        )
+
+    def search(self, days_ago, results=3, user=None, **query):
+        history = SearchHistory.objects.create(user=user or self.user, query=json.dumps(query), results_count=results)
+        SearchHistory.objects.filter(pk=history.pk).update(searched_at=timezone.now() - timedelta(days=days_ago))
+
+    def test_rollup_groups_by_day_and_criteria(self):
+        for _ in range(3):
+            self.search(1, results=4, q="Villa  Piscine", city=self.city.pk)
+        self.search(1, results=0, q="villa piscine", city=self.city.pk)
+        self.search(1, q="terrain")
+        self.search(2, q="terrain")
+        self.search(0, q="terrain")  # aujourd'hui : jour incomplet, pas encore agrégé
+
+        days, rows = rollup_search_history()
+
+        self.assertEqual((days, rows), (2, 3))
+        stat = SearchDailyStat.objects.get(keywords="villa piscine")
+        self.assertEqual((stat.searches, stat.zero_results, stat.results_total), (4, 1, 12))
+        self.assertEqual(stat.city_id, self.city.pk)
+        self.assertEqual(stat.avg_results, 3)
+        # Relancé : rien de nouveau, pas de doublon
+        self.assertEqual(rollup_search_history(), (0, 0))
+        self.assertEqual(SearchDailyStat.objects.count(), 3)
+
+    def test_recomputing_a_day_replaces_its_rows(self):
+        self.search(1, q="duplex")
+        rollup_search_history()
+        self.search(1, q="duplex")
+
+        yesterday = timezone.localdate() - timedelta(days=1)
+        rollup_search_history(since=yesterday)
+
+        self.assertEqual(SearchDailyStat.objects.get().searches, 2)
+
+    def test_prune_only_removes_rolled_up_days(self):
+        self.search(40, q="ancien")
+        self.search(5, q="recent")
+        self.assertEqual(prune_search_history(keep_days=30), 0)
+
+        call_command("rollup_search_history", keep_days=30, stdout=StringIO())
+
+        self.assertEqual(list(SearchHistory.objects.values_list("keywords", flat=True)), ["recent"])
+        self.assertEqual(SearchDailyStat.objects.count(), 2)
+
+    @override_settings(SEARCH_TRENDS_MIN_USERS=1)
+    def test_popular_and_zero_result_apis(self):
+        for _ in range(3):
+            self.search(1, results=5, q="villa")
+        self.search(1, results=0, q="chateau", city=self.city.pk)
+        self.search(1, results=0, q="chateau", city=self.city.pk)
+        self.search(1)  # sans critère : ignorée
+        rollup_search_history()
+
+        popular = self.client.get(reverse("saved_searches:popular_searches")).json()["searches"]
+        self.assertEqual([row["keywords"] for row in popular], ["villa", "chateau"])
+        self.assertEqual(popular[0]["avg_results"], 5)
+        self.assertEqual(popular[1]["city"], {"id": self.city.pk, "name": "Lomé"})
+
+        url = reverse("saved_searches:zero_result_searches")
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(self.admin)
+        zero = self.client.get(url, {"city": self.city.pk}).json()["searches"]
+        self.assertEqual([(row["keywords"], row["zero_results"]) for row in zero], [("chateau", 2)])
+        self.assertEqual(self.client.get(url, {"days": "x"}).status_code, 400)
+
+    @override_settings(SEARCH_TRENDS_MIN_USERS=3)
+    def test_rare_searches_are_not_published(self):
+        others = [User.objects.create_user(username=f"visiteur{i}", password="pass") for i in range(3)]
+        for user in others:
+            self.search(1, q="villa", user=user)
+        for _ in range(5):
+            self.search(1, q="maison de jean dupont")  # fréquente, mais une seule personne
+        self.search(1, q="terrain", user=others[0])
+        self.search(2, q="terrain", user=others[1])  # deux utilisateurs, jamais le même jour
+        rollup_search_history()
+        self.assertEqual(SearchDailyStat.objects.get(keywords="villa").users, 3)
+
+        popular = self.client.get(reverse("saved_searches:popular_searches")).json()["searches"]
+        self.assertEqual([row["keywords"] for row in popular], ["villa"])
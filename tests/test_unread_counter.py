@@ -0,0 +1,92 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from notifications.counters import unread_key
+from notifications.models import Notification
+
+User = get_user_model()
+
+
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="lecteur", password="pass")
+        self.notifications = [
+            Notification.create_notification(self.user, "system_alert", f"Alerte {i}", "Message")
+            for i in range(3)
+        ]
+
+    def test_counter_is_maintained_without_counting(self):
+        self.assertEqual(Notification.get_unread_count(self.user), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(Notification.get_unread_count(self.user), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.create_notification(self.user, "system_alert", "Nouvelle", "Message")
+            self.notifications[0].mark_as_read()
+            self.notifications[1].delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(Notification.get_unread_count(self.user), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.mark_all_as_read(self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(Notification.get_unread_count(self.user), 0)
+
+    def test_bulk_and_drift_are_reconciled(self):
+        Notification.get_unread_count(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.bulk_notify(User.objects.filter(pk=self.user.pk), "maintenance", "Maintenance", "Ce soir")
+        self.assertEqual(Notification.get_unread_count(self.user), 4)
+
+        cache.set(unread_key(self.user.pk), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notifications[2].mark_as_read()  # passerait à -1 : le compteur est oublié
+        self.assertEqual(Notification.get_unread_count(self.user), 3)
+
+    def test_counter_is_adjusted_only_after_commit(self):
+        self.assertEqual(Notification.get_unread_count(self.user), 3)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.notifications[0].mark_as_read()
+            # Pas encore commité : un recomptage concurrent verrait encore 3
+            self.assertEqual(cache.get(unread_key(self.user.pk)), 3)
+        self.assertTrue(callbacks)
+        self.assertEqual(cache.get(unread_key(self.user.pk)), 2)
+
+        # Rollback : le compteur n'est pas touché
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.notifications[1].mark_as_read()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(cache.get(unread_key(self.user.pk)), 2)
+
+    def test_process_local_cache_falls_back_to_count(self):
+        locmem = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        with override_settings(CACHES=locmem):
+            # Le worker écrit dans un autre processus : rien n'est lu depuis ce cache
+            cache.set(unread_key(self.user.pk), 42)
+            with self.assertNumQueries(1):
+                self.assertEqual(Notification.get_unread_count(self.user), 3)
+            self.notifications[0].mark_as_read()
+            self.assertEqual(cache.get(unread_key(self.user.pk)), 42)
+            self.assertEqual(Notification.get_unread_count(self.user), 2)
+
+    def test_count_endpoint_supports_etag(self):
+        self.client.force_login(self.user)
+        url = reverse("notifications:notification_count")
+        response = self.client.get(url)
+        self.assertEqual(response.json(), {"count": 3})
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notifications[0].mark_as_read()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual((response.status_code, response.json()), (200, {"count": 2}))
@@ -60,6 +60,90 @@ REST_FRAMEWORK = {
 
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend']
 }
+# Cache : doit être partagé entre processus (workers gunicorn, process_notifications,
+# commandes de gestion) : les blocs de la page d'accueil y sont invalidés par version.
+# Par défaut fichiers sur disque (aucun Redis requis) ; Redis par exemple :
+#   CACHE_BACKEND=django.core.cache.backends.redis.RedisCache CACHE_LOCATION=redis://127.0.0.1:6379/1
+# LocMemCache (propre à chaque processus) déclenche l'avertissement core.W001 (core/checks.py).
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", str(BASE_DIR / "cache")),
+    }
+}
+# Durée de vie max (s) des blocs mis en cache ; l'invalidation se fait par signaux
+FRAGMENT_CACHE_TIMEOUT = int(os.getenv("FRAGMENT_CACHE_TIMEOUT", "3600"))
+
+# Outbox des notifications (worker : manage.py process_notifications --loop)
+NOTIFICATION_OUTBOX_MAX_ATTEMPTS = 5
+NOTIFICATION_OUTBOX_BACKOFF = 30  # délai (s) avant le 1er nouvel essai, doublé à chaque échec
+# Durée (s) du compteur de non-lues en cache avant recalcul depuis la base
+NOTIFICATION_UNREAD_COUNT_TTL = 300
+# Push temps réel (SSE / long-polling) : broker pub/sub et délais (s)
+NOTIFICATION_BROKER = "notifications.pubsub.InProcessBroker"
+NOTIFICATION_SSE_HEARTBEAT = 15
+NOTIFICATION_LONG_POLL_TIMEOUT = 25
+# Vérification de la version en cache des notifications pendant un flux / long-poll : la base
+# n'est relue que si un autre processus (worker) a créé / lu / supprimé une notification
+NOTIFICATION_DB_CHECK_INTERVAL = 5
+
+# Rétention (en jours) par type, "default" pour les autres types, None = illimitée.
+# Purge : manage.py purge_expired [--archive]
+RETENTION_POLICIES = {
+    "notifications.Notification": {
+        "type_field": "notification_type",
+        "ttl_days": {"default": 365, "system_alert": 90, "maintenance": 30},
+    },
+    "accounts.UserActivity": {
+        "type_field": "activity_type",
+        "ttl_days": {"default": 365, "login": 90, "logout": 90, "listing_view": 30},
+    },
+}
+RETENTION_ARCHIVE_DIR = BASE_DIR / "archives"
+# Historique de recherche brut conservé N jours, au-delà seul l'agrégat quotidien reste (rollup_search_history)
+SEARCH_HISTORY_RAW_DAYS = 30
+# Tendances de recherche : une recherche n'est affichée que si N utilisateurs distincts l'ont faite le même jour
+SEARCH_TRENDS_MIN_USERS = 5
+
+# Journal d'activité (UserActivity.log_activity) : tampon écrit par lots
+ACTIVITY_LOG_SYNC = False  # True : écriture immédiate (tests)
+ACTIVITY_LOG_QUEUE_SIZE = 10000  # au-delà, les activités sont abandonnées (compteur "dropped")
+ACTIVITY_LOG_BATCH_SIZE = 200
+ACTIVITY_LOG_FLUSH_INTERVAL = 2.0  # secondes
+# Taux d'échantillonnage par type d'activité, 1 (tout garder) par défaut ; ex : {"listing_view": 0.5}
+# Compteurs (écrites, écartées, abandonnées) : manage.py activity_log_stats
+ACTIVITY_LOG_SAMPLING = {}
+
+# Compteur de vues des annonces : agrégé en mémoire puis écrit par lots
+LISTING_VIEWS_FLUSH_THRESHOLD = 500  # couples (annonce, jour) en attente
+LISTING_VIEWS_FLUSH_INTERVAL = 10.0  # secondes
+LISTING_VIEWS_DEDUP_SECONDS = 1800  # une vue par IP et par annonce dans cette fenêtre (0 : désactivé)
+
+# Recherche plein texte des annonces : index SQLite FTS5 local (manage.py rebuild_search_index)
+LISTING_SEARCH_INDEX = BASE_DIR / "search_index" / "listings.sqlite3"
+LISTING_SEARCH_MAX_RESULTS = 1000
+
+# Photos envoyées : dossier local d'attente, traitées par manage.py process_photo_uploads
+LISTING_PHOTO_SPOOL_DIR = BASE_DIR / "spool" / "photos"
+LISTING_PHOTO_CLAIM_TIMEOUT = 600  # secondes avant de reprendre une photo réservée par un worker arrêté
+LISTING_PHOTO_MAX_ATTEMPTS = 3
+# Envois reprenables par l'API (listings/uploads.py), purgés par manage.py purge_photo_uploads
+LISTING_UPLOAD_DIR = BASE_DIR / "spool" / "uploads"
+LISTING_UPLOAD_MAX_BYTES = 20 * 1024 * 1024
+LISTING_UPLOAD_MAX_ACTIVE = 3  # envois en cours par utilisateur
+LISTING_UPLOAD_EXPIRY = 24 * 3600  # secondes sans activité avant abandon
+# Fichiers orphelins plus récents que ce délai (secondes) laissés à manage.py cleanup_photo_files
+LISTING_PHOTO_ORPHAN_GRACE = 600
+
+# Photos d'annonces nommées par le hash de leur contenu (listings/storage.py).
+# En production, servir MEDIA_URL + listings/photos/ et listings/renditions/ avec
+# "Cache-Control: public, max-age=31536000, immutable" (contenu jamais modifié sous un même nom).
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    "listing_photos": {"BACKEND": "listings.storage.ContentAddressedStorage"},
+}
+
 # Configuration spécifique aux tests
 # (pytest-django utilise la DB de test automatiquement)
 TEST_RUNNER = "django.test.runner.DiscoverRunner"
@@ -97,6 +181,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'notifications.context_processors.notification_push',
             ],
         },
     },
@@ -1,7 +1,8 @@
 # togoestate/views.py
 from django.shortcuts import render
-from accounts.models import Agency, User, UserActivity
+from accounts.models import Agency, User
 from listings.models import Listing
+from listings.storage import IMMUTABLE_CACHE_CONTROL, is_content_addressed
 from django.db.models import Count
 from django.db import models
 from django.utils.timezone import now
@@ -11,67 +12,71 @@ from django.db.models.functions import TruncMonth
 from django.db.models import Count
 from itertools import chain
 
-def home(request):
-    stats = {
+from django.views.static import serve
+
+from core.fragments import HOME_MONTHLY_CHART, HOME_RECENT, HOME_STATS, HOME_TIMELINE
+
+def _home_stats():
+    return {
         "agencies_count": Agency.objects.count(),
         "listings_count": Listing.objects.filter(published=True).count(),
         "users_count": User.objects.count(),
     }
 
-    recent_listings = Listing.objects.filter(published=True).order_by('-created_at')[:3]
-    recent_agencies = Agency.objects.order_by('-created_at')[:3]
 
-   # Construire une timeline normalisée avec UserActivity
+def _home_recent():
+    # Listes matérialisées : c'est le résultat des requêtes qui est mis en cache
+    return {
+        "recent_listings": list(
+            Listing.objects.filter(published=True)
+            .select_related("city__district__region").with_cover().order_by('-created_at')[:3]
+        ),
+        "recent_agencies": list(
+            Agency.objects.select_related("city__district__region").order_by('-created_at')[:3]
+        ),
+    }
+
+
+def _home_timeline():
+    # Page publique : seulement des événements publics (annonces publiées, agences,
+    # inscriptions). Le journal UserActivity (connexions, recherches...) reste privé.
     events = []
 
-    # Récupérer les activités récentes
-    recent_activities = UserActivity.objects.select_related('user').order_by('-created_at')[:10]
+    for l in Listing.objects.filter(published=True).select_related("city__district__region").order_by('-created_at')[:5]:
+        events.append({
+            "type": "Annonce",
+            "title": l.title,
+            "city": str(l.city) if l.city else None,
+            "timestamp": l.created_at,
+            "icon": "🏠",
+        })
 
-    for activity in recent_activities:
+    for a in Agency.objects.select_related("city__district__region").order_by('-created_at')[:5]:
         events.append({
-            "type": "Activité",
-            "title": activity.title,
-            "description": activity.description,
-            "user": activity.user.username,
-            "timestamp": activity.created_at,
-            "icon": "📋",
+            "type": "Agence",
+            "title": a.name,
+            "city": str(a.city) if a.city else None,
+            "timestamp": a.created_at,
+            "icon": "🏢",
         })
 
-    # Si pas assez d'activités, ajouter des événements classiques
-    if len(events) < 5:
-        for l in Listing.objects.filter(published=True).order_by('-created_at')[:5]:
-            events.append({
-                "type": "Annonce",
-                "title": l.title,
-                "city": l.city,
-                "timestamp": l.created_at,
-                "icon": "🏠",
-            })
-
-        for a in Agency.objects.order_by('-created_at')[:5]:
-            events.append({
-                "type": "Agence",
-                "title": a.name,
-                "city": a.city,
-                "timestamp": a.created_at,
-                "icon": "🏢",
-            })
-
-        for u in User.objects.order_by('-date_joined')[:5]:
-            events.append({
-                "type": "Utilisateur",
-                "title": u.username,
-                "city": getattr(u.agency, "city", "-") if hasattr(u, "agency") and u.agency else "-",
-                "timestamp": u.date_joined,
-                "icon": "👤",
-            })
+    for u in User.objects.select_related("agency__city__district__region").order_by('-date_joined')[:5]:
+        events.append({
+            "type": "Utilisateur",
+            "title": u.username,
+            "city": str(u.agency.city) if u.agency and u.agency.city else "-",
+            "timestamp": u.date_joined,
+            "icon": "👤",
+        })
 
     # Trier tous les événements par date
-    events = sorted(events, key=lambda x: x["timestamp"], reverse=True)[:10]
+    return sorted(events, key=lambda x: x["timestamp"], reverse=True)[:10]
 
+
+def _home_monthly_chart():
     # Agrégation par mois (6 derniers mois)
     six_months_ago = now() - timedelta(days=180)
-    listings_by_month = (
+    return list(
         Listing.objects.filter(created_at__gte=six_months_ago, published=True)
         .annotate(month=TruncMonth('created_at'))
         .values('month')
@@ -79,12 +84,16 @@ def home(request):
         .order_by('month')
     )
 
+
+def home(request):
+    # Chaque bloc est mis en cache séparément et invalidé par signaux (core/fragments.py)
+    recent = HOME_RECENT.get_or_set(_home_recent)
     return render(request, "home.html", {
-        "stats": stats,
-        "recent_listings": recent_listings,
-        "recent_agencies": recent_agencies,
-        "listings_by_month": list(listings_by_month),
-        "recent_events": events,
+        "stats": HOME_STATS.get_or_set(_home_stats),
+        "recent_listings": recent["recent_listings"],
+        "recent_agencies": recent["recent_agencies"],
+        "listings_by_month": HOME_MONTHLY_CHART.get_or_set(_home_monthly_chart),
+        "recent_events": HOME_TIMELINE.get_or_set(_home_timeline),
     })
 
 
@@ -94,3 +103,11 @@ def about(request):
 
 def contact(request):
     return render(request, "contact.html")
+
+
+def media(request, path, document_root=None):
+    """Fichiers de MEDIA_ROOT (développement) ; photos nommées par leur hash : cache immutable."""
+    response = serve(request, path, document_root=document_root)
+    if response.status_code == 200 and is_content_addressed(path):
+        response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response